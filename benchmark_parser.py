@@ -0,0 +1,574 @@
+"""
+Benchmarks del Mini-Parser
+Mide el rendimiento de las distintas rutas de análisis
+
+Cada caso (tokenizar, parsear, analizar, analizar_lote, visualizar_pasos)
+se mide sobre corpus generados de varios tamaños, con calentamiento, varias
+repeticiones y percentiles del tiempo por oración. Los resultados pueden guardarse como
+línea base en JSON y compararse con ejecuciones posteriores.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from mini_parser import (MiniParser, AnalizadorLexico, AnalizadorLexicoExtendido,
+                         ParserDescendenteRecursivo, ParserLL1, ParserEarley, ResultadoLote)
+from visualizador_arbol import VisualizadorArbol
+from generador_corpus import GeneradorCorpus
+from estadisticas import percentil
+
+
+# Mezcla de oraciones válidas, con errores sintácticos y con errores léxicos
+ORACIONES = [
+    "el perro come un hueso",
+    "la niña lee el libro",
+    "un gato grande ve la casa",
+    "el niño pequeño quiere un libro rojo",
+    "el perro grande",
+    "come el libro",
+    "el grande perro come libro",
+    "el perro muy grande come el libro",
+    "python es genial",
+    "los perros buscan las casas",
+]
+
+# Tamaños de corpus (en oraciones) por defecto
+TAMANOS = (100, 1000, 10000)
+
+# Percentiles reportados del tiempo por oración
+PERCENTILES = (50, 95, 99)
+
+# Oraciones por llamada en el caso analizar_lote
+TAMANO_LOTE_ANALISIS = 1000
+
+# Longitudes (en tokens) de las oraciones extendidas del benchmark de Earley
+LONGITUDES_EARLEY = (5, 10, 25, 50, 100, 200)
+
+# Hilos que comparten un MiniParser en el benchmark de escalado
+HILOS = (1, 2, 4, 8)
+
+
+def medir(funcion: Callable[[str], object], oraciones: List[str],
+          repeticiones: int = 5, vueltas: int = 2000) -> float:
+    """
+    Mide el tiempo por oración de una función de análisis
+    
+    Returns:
+        Mejor tiempo (de todas las repeticiones) en nanosegundos por oración
+    """
+    def ejecutar():
+        for oracion in oraciones:
+            funcion(oracion)
+    
+    tiempos = timeit.repeat(ejecutar, number=vueltas, repeat=repeticiones)
+    return min(tiempos) / (vueltas * len(oraciones)) * 1e9
+
+
+def generar_corpus(tamano: int, semilla: int = 0) -> List[str]:
+    """
+    Genera un corpus reproducible con GeneradorCorpus (proporciones de error
+    y longitudes por defecto: alrededor de un 20% de oraciones inválidas)
+    """
+    return list(GeneradorCorpus(semilla).oraciones(tamano))
+
+
+def _preparar_tokenizar(corpus: List[str]) -> Tuple[Callable, List]:
+    return AnalizadorLexico().tokenizar, corpus
+
+
+def _preparar_parsear(corpus: List[str]) -> Tuple[Callable, List]:
+    # Se mide solo el análisis sintáctico: los tokens se generan antes
+    lexico = AnalizadorLexico()
+    return ParserDescendenteRecursivo().parsear, [lexico.tokenizar(texto) for texto in corpus]
+
+
+def _preparar_parsear_ll1(corpus: List[str]) -> Tuple[Callable, List]:
+    lexico = AnalizadorLexico()
+    return ParserLL1().parsear, [lexico.tokenizar(texto) for texto in corpus]
+
+
+def _preparar_analizar(corpus: List[str]) -> Tuple[Callable, List]:
+    return MiniParser().analizar, corpus
+
+
+def _preparar_analizar_lote(corpus: List[str]) -> Tuple[Callable, List]:
+    # Cada entrada es un lote de oraciones; el ResultadoLote se reutiliza
+    parser = MiniParser()
+    destino = ResultadoLote()
+    
+    def analizar_lote(lote: List[str]) -> ResultadoLote:
+        return parser.analizar_lote(lote, destino)
+    
+    return analizar_lote, [corpus[i:i + TAMANO_LOTE_ANALISIS]
+                           for i in range(0, len(corpus), TAMANO_LOTE_ANALISIS)]
+
+
+def _preparar_visualizar(corpus: List[str]) -> Tuple[Callable, List]:
+    return VisualizadorArbol().visualizar_pasos, corpus
+
+
+# Caso medido -> preparación (función a medir y sus entradas)
+CASOS: Dict[str, Callable[[List[str]], Tuple[Callable, List]]] = {
+    "tokenizar": _preparar_tokenizar,
+    "parsear": _preparar_parsear,
+    "parsear_ll1": _preparar_parsear_ll1,
+    "analizar": _preparar_analizar,
+    "analizar_lote": _preparar_analizar_lote,
+    "visualizar_pasos": _preparar_visualizar,
+}
+
+# Casos cuyas entradas son lotes de oraciones: no tienen latencia por oración
+CASOS_POR_LOTES = frozenset({"analizar_lote"})
+
+
+def medir_caso(funcion: Callable, entradas: List, palabras: int, repeticiones: int = 5,
+               calentamiento: int = 1, tamano_lote: int = 100,
+               oraciones: Optional[int] = None) -> dict:
+    """
+    Mide una función sobre todas sus entradas
+    
+    Para el rendimiento, las entradas se recorren en lotes y cada lote se
+    cronometra con perf_counter_ns, así el costo del reloj no pesa en la
+    media. Para los percentiles, una pasada adicional cronometra cada llamada
+    por separado: cada oración es una muestra, y la cola no se diluye en la
+    media de un lote. El recolector de basura se desactiva durante la
+    medición, igual que en timeit.
+    
+    Args:
+        funcion: Función a medir (recibe una entrada)
+        entradas: Entradas del corpus (textos o tokens)
+        palabras: Total de palabras del corpus, para el tiempo por token
+        repeticiones: Recorridos cronometrados del corpus
+        calentamiento: Recorridos previos sin cronometrar
+        tamano_lote: Entradas por lote cronometrado (rendimiento)
+        oraciones: Total de oraciones de las entradas, si cada entrada es un
+                   lote de oraciones; entonces no se miden percentiles
+    
+    Returns:
+        Diccionario con oraciones por segundo, ns por token y estadísticas
+        del tiempo por oración (media y percentiles, None para lotes)
+    """
+    lotes = [entradas[i:i + tamano_lote] for i in range(0, len(entradas), tamano_lote)]
+    reloj = time.perf_counter_ns
+    
+    for _ in range(calentamiento):
+        for entrada in entradas:
+            funcion(entrada)
+    
+    muestras = []
+    total_ns = 0
+    recolector_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            for lote in lotes:
+                inicio = reloj()
+                for entrada in lote:
+                    funcion(entrada)
+                total_ns += reloj() - inicio
+        
+        for entrada in entradas if oraciones is None else ():
+            inicio = reloj()
+            funcion(entrada)
+            muestras.append(reloj() - inicio)
+    finally:
+        if recolector_activo:
+            gc.enable()
+    
+    medidas = (len(entradas) if oraciones is None else oraciones) * repeticiones
+    resultado = {
+        "oraciones_por_segundo": medidas / total_ns * 1e9 if total_ns else 0.0,
+        "ns_por_token": total_ns / (palabras * repeticiones) if palabras else 0.0,
+        "ns_por_oracion": total_ns / medidas,
+    }
+    for p in PERCENTILES:
+        resultado[f"p{p}_ns"] = percentil(muestras, p) if muestras else None
+    return resultado
+
+
+def ejecutar_suite(tamanos: Sequence[int] = TAMANOS, casos: Optional[Sequence[str]] = None,
+                   repeticiones: int = 5, calentamiento: int = 1, semilla: int = 0) -> dict:
+    """
+    Ejecuta todos los casos sobre corpus de cada tamaño
+    
+    Returns:
+        Diccionario serializable a JSON con los metadatos de la ejecución y
+        un resultado por "caso/tamaño"
+    """
+    resultados = {}
+    for tamano in tamanos:
+        corpus = generar_corpus(tamano, semilla)
+        palabras = sum(len(texto.split()) for texto in corpus)
+        for caso in casos or CASOS:
+            funcion, entradas = CASOS[caso](corpus)
+            resultado = medir_caso(funcion, entradas, palabras, repeticiones, calentamiento,
+                                   tamano_lote=1 if caso in CASOS_POR_LOTES else 100,
+                                   oraciones=len(corpus) if caso in CASOS_POR_LOTES else None)
+            resultados[f"{caso}/{tamano}"] = dict(resultado, caso=caso, tamano=tamano)
+    
+    return {
+        "metadatos": {
+            "python": platform.python_version(),
+            "implementacion": platform.python_implementation(),
+            "plataforma": platform.platform(),
+            "repeticiones": repeticiones,
+            "calentamiento": calentamiento,
+            "semilla": semilla,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(actual: dict, base: dict, tolerancia: float = 0.10) -> List[dict]:
+    """
+    Compara una ejecución con una línea base
+    
+    Args:
+        actual: Resultado de ejecutar_suite()
+        base: Línea base (mismo formato)
+        tolerancia: Aumento relativo de ns por token tolerado antes de
+                    considerar una regresión
+    
+    Returns:
+        Una entrada por caso presente en ambas ejecuciones, con los ns por
+        token de cada una, el cambio relativo y si es una regresión
+    """
+    comparacion = []
+    for clave, resultado in actual["resultados"].items():
+        anterior = base["resultados"].get(clave)
+        if anterior is None or not anterior["ns_por_token"]:
+            continue
+        cambio = resultado["ns_por_token"] / anterior["ns_por_token"] - 1
+        comparacion.append({
+            "clave": clave,
+            "base_ns_por_token": anterior["ns_por_token"],
+            "actual_ns_por_token": resultado["ns_por_token"],
+            "cambio": cambio,
+            "regresion": cambio > tolerancia,
+        })
+    return comparacion
+
+
+def mostrar_resultados(ejecucion: dict):
+    """Imprime una tabla con los resultados de ejecutar_suite()"""
+    print("="*86)
+    print(f"{'CASO':<26} {'oraciones/s':>13} {'ns/token':>10} "
+          f"{'p50 ns':>10} {'p95 ns':>10} {'p99 ns':>10}")
+    print("="*86)
+    for clave, resultado in ejecucion["resultados"].items():
+        percentiles = " ".join("{:>10}".format("—" if resultado[f"p{p}_ns"] is None
+                                               else f"{resultado[f'p{p}_ns']:.0f}")
+                               for p in PERCENTILES)
+        print(f"{clave:<26} {resultado['oraciones_por_segundo']:>13,.0f} "
+              f"{resultado['ns_por_token']:>10.0f} {percentiles}")
+
+
+def mostrar_comparacion(comparacion: List[dict], tolerancia: float):
+    """Imprime la comparación con la línea base"""
+    print("\n" + "="*86)
+    print(f"COMPARACIÓN CON LÍNEA BASE (tolerancia: {tolerancia:.0%})")
+    print("="*86)
+    for entrada in comparacion:
+        marca = "✗ REGRESIÓN" if entrada["regresion"] else "✓"
+        print(f"{entrada['clave']:<26} {entrada['base_ns_por_token']:>10.0f} → "
+              f"{entrada['actual_ns_por_token']:>10.0f} ns/token "
+              f"({entrada['cambio']:+.1%}) {marca}")
+
+
+def benchmark_validez(oraciones: List[str] = ORACIONES):
+    """Compara es_valida() con analizar()["valido"]"""
+    parser = MiniParser()
+    
+    completo = medir(lambda texto: parser.analizar(texto)["valido"], oraciones)
+    rapido = medir(parser.es_valida, oraciones)
+    
+    print("="*60)
+    print("VALIDEZ: analizar()[\"valido\"] vs es_valida()")
+    print("="*60)
+    print(f"  analizar()[\"valido\"]: {completo:10.0f} ns/oración")
+    print(f"  es_valida():          {rapido:10.0f} ns/oración")
+    print(f"  Mejora:               {completo / rapido:10.2f}x")
+
+
+def oracion_extendida(longitud: int, semilla: int = 0) -> str:
+    """
+    Oración válida para GRAMATICA_EXTENDIDA con exactamente longitud palabras
+    
+    A la oración básica de 5 palabras se le agregan grupos de 3 (sintagmas
+    preposicionales o nominales coordinados) y se completa con adjetivos.
+    Cada sintagma preposicional puede modificar a cualquier sintagma
+    anterior, así que la ambigüedad crece muy rápido con la longitud.
+    """
+    if longitud < 5:
+        raise ValueError(f"Una oración extendida tiene al menos 5 palabras, no {longitud}")
+    azar = random.Random(semilla)
+    palabras = ["el", "perro", "come", "un", "hueso"]
+    for _ in range((longitud - 5) // 3):
+        palabras += [azar.choice(("con", "de", "en", "y")), azar.choice(("el", "un")),
+                     azar.choice(("libro", "gato", "hueso", "perro"))]
+    palabras += ["grande", "rojo"][:(longitud - 5) % 3]
+    return " ".join(palabras)
+
+
+def medir_earley(longitudes: Sequence[int] = LONGITUDES_EARLEY,
+                 repeticiones: int = 5) -> List[dict]:
+    """
+    Mide ParserEarley sobre oraciones extendidas de cada longitud
+    
+    Returns:
+        Por longitud, la mediana del tiempo de reconocer la oración y
+        construir el bosque (ms), el número de derivaciones que representa
+        y el número de nodos del bosque
+    """
+    parser = ParserEarley()
+    lexico = AnalizadorLexicoExtendido()
+    resultados = []
+    for longitud in longitudes:
+        tokens = lexico.tokenizar(oracion_extendida(longitud))
+        tiempos = []
+        for _ in range(max(repeticiones, 1)):
+            inicio = time.perf_counter_ns()
+            raiz = parser.bosque(tokens)
+            tiempos.append((time.perf_counter_ns() - inicio) / 1e6)
+        resultados.append({
+            "longitud": longitud,
+            "ms": statistics.median(tiempos),
+            "derivaciones": ParserEarley.contar_derivaciones(raiz),
+            "nodos": ParserEarley.contar_nodos(raiz),
+        })
+    return resultados
+
+
+def mostrar_earley(longitudes: Sequence[int] = LONGITUDES_EARLEY, repeticiones: int = 5):
+    """Imprime el tiempo y el tamaño del bosque de Earley por longitud"""
+    print("="*60)
+    print(f"EARLEY: gramática extendida (mediana de {repeticiones} análisis)")
+    print("="*60)
+    print(f"{'tokens':>8} {'ms':>10} {'derivaciones':>14} {'nodos':>8}")
+    for resultado in medir_earley(longitudes, repeticiones):
+        print(f"{resultado['longitud']:>8} {resultado['ms']:>10.2f} "
+              f"{resultado['derivaciones']:>14.3g} {resultado['nodos']:>8}")
+
+
+def medir_hilos(hilos: Sequence[int] = HILOS, oraciones_por_hilo: int = 20000,
+                repeticiones: int = 3, semilla: int = 0) -> List[dict]:
+    """
+    Mide cómo escala un MiniParser compartido (con su caché de formas) entre hilos
+    
+    Cada hilo analiza el mismo corpus de oraciones_por_hilo oraciones; todos
+    empiezan a la vez y el tiempo va hasta que termina el último. Con el GIL
+    activo no se espera aceleración; sin GIL, una aceleración muy por debajo
+    del número de hilos indica contención en el estado compartido.
+    
+    Returns:
+        Por número de hilos, las oraciones por segundo del conjunto (la
+        mejor de las repeticiones) y la aceleración respecto del primero
+    """
+    parser = MiniParser()
+    corpus = generar_corpus(oraciones_por_hilo, semilla)
+    analizar = parser.analizar
+    for oracion in corpus:
+        analizar(oracion)
+    
+    def trabajar(barrera: threading.Barrier):
+        barrera.wait()
+        for oracion in corpus:
+            analizar(oracion)
+    
+    resultados = []
+    for cantidad in hilos:
+        mejor = 0.0
+        for _ in range(max(repeticiones, 1)):
+            barrera = threading.Barrier(cantidad + 1)
+            trabajadores = [threading.Thread(target=trabajar, args=(barrera,))
+                            for _ in range(cantidad)]
+            for trabajador in trabajadores:
+                trabajador.start()
+            barrera.wait()
+            inicio = time.perf_counter_ns()
+            for trabajador in trabajadores:
+                trabajador.join()
+            duracion = time.perf_counter_ns() - inicio
+            mejor = max(mejor, cantidad * len(corpus) / duracion * 1e9)
+        resultados.append({
+            "hilos": cantidad,
+            "oraciones_por_segundo": mejor,
+            "aceleracion": mejor / resultados[0]["oraciones_por_segundo"] if resultados else 1.0,
+        })
+    return resultados
+
+
+def mostrar_hilos(hilos: Sequence[int] = HILOS, repeticiones: int = 3, semilla: int = 0):
+    """Imprime el rendimiento de un MiniParser compartido por número de hilos"""
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("="*60)
+    print(f"HILOS: un MiniParser compartido (GIL {'activo' if gil else 'desactivado'}, "
+          f"mejor de {repeticiones})")
+    print("="*60)
+    print(f"{'hilos':>8} {'oraciones/s':>14} {'aceleración':>12}")
+    for resultado in medir_hilos(hilos, repeticiones=repeticiones, semilla=semilla):
+        print(f"{resultado['hilos']:>8} {resultado['oraciones_por_segundo']:>14,.0f} "
+              f"{resultado['aceleracion']:>11.2f}x")
+
+
+# Punto de entrada -> código que produce su primer resultado para ORACION
+ARRANQUES = {
+    "mini_parser": "from mini_parser import MiniParser\nMiniParser().analizar(ORACION)",
+    "demo_interactiva": "import demo_interactiva\ndemo_interactiva.main([ORACION])",
+    "visualizador_arbol": ("from visualizador_arbol import VisualizadorArbol\n"
+                           "VisualizadorArbol().visualizar_pasos(ORACION)"),
+    "comparacion_parsers": ("import comparacion_parsers as c\n"
+                            "c.AnalizadorNLPModerno(c.BackendLocal()).analizar(ORACION)"),
+}
+
+
+def importaciones(informe: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Lee la salida de python -X importtime
+    
+    Returns:
+        Tuplas (módulo, nivel, µs propios, µs acumulados), en el orden en que
+        terminó cada importación; el nivel es 0 para las que no hizo otro módulo
+    """
+    modulos = []
+    for linea in informe.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        propio, acumulado, modulo = linea[len("import time:"):].split("|")
+        if not propio.strip().isdigit():
+            continue
+        nombre = modulo.lstrip()
+        nivel = (len(modulo) - len(nombre) - 1) // 2
+        modulos.append((nombre, nivel, int(propio), int(acumulado)))
+    return modulos
+
+
+def medir_arranque(codigo: str, oracion: str = ORACIONES[0], repeticiones: int = 5) -> dict:
+    """
+    Mide el arranque de un proceso nuevo que ejecuta el código indicado
+    
+    Cada repetición es un intérprete nuevo con -X importtime; el código
+    puede usar ORACION.
+    
+    Returns:
+        Medianas del tiempo total del proceso y del tiempo hasta el primer
+        resultado (importaciones incluidas, sin el arranque del intérprete),
+        en ms, y las importaciones de la última repetición ordenadas por su
+        tiempo propio
+    """
+    programa = (f"import time\n_inicio = time.perf_counter_ns()\nORACION = {oracion!r}\n"
+                f"{codigo}\nprint((time.perf_counter_ns() - _inicio) / 1e6)")
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    procesos, primeros = [], []
+    for _ in range(max(repeticiones, 1)):
+        inicio = time.perf_counter_ns()
+        ejecucion = subprocess.run([sys.executable, "-X", "importtime", "-c", programa],
+                                   cwd=directorio, capture_output=True, text=True,
+                                   encoding="utf-8", check=True)
+        procesos.append((time.perf_counter_ns() - inicio) / 1e6)
+        primeros.append(float(ejecucion.stdout.split()[-1]))
+    
+    return {
+        "proceso_ms": statistics.median(procesos),
+        "primer_resultado_ms": statistics.median(primeros),
+        "importaciones": sorted(importaciones(ejecucion.stderr), key=lambda m: -m[2]),
+    }
+
+
+def mostrar_arranque(entradas: Sequence[str] = tuple(ARRANQUES), repeticiones: int = 5,
+                     modulos: int = 8):
+    """Imprime el arranque de cada punto de entrada y sus importaciones más costosas"""
+    print("="*70)
+    print(f"ARRANQUE: primer resultado de una oración (mediana de {repeticiones} procesos)")
+    print("="*70)
+    for entrada in entradas:
+        arranque = medir_arranque(ARRANQUES[entrada], repeticiones=repeticiones)
+        print(f"\n{entrada}: primer resultado en {arranque['primer_resultado_ms']:.1f} ms "
+              f"(proceso completo: {arranque['proceso_ms']:.1f} ms)")
+        print(f"  {'µs propios':>12} {'µs acumulados':>14}  módulo (nivel)")
+        for modulo, nivel, propio, acumulado in arranque["importaciones"][:modulos]:
+            print(f"  {propio:>12} {acumulado:>14}  {modulo} ({nivel})")
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Función principal"""
+    argumentos = argparse.ArgumentParser(description="Benchmarks del mini-parser")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS),
+                            help="tamaños de corpus en oraciones")
+    argumentos.add_argument("--casos", nargs="+", choices=list(CASOS),
+                            help="casos a medir (por defecto: todos)")
+    argumentos.add_argument("--repeticiones", type=int, default=5,
+                            help="recorridos cronometrados por caso (por defecto: 5)")
+    argumentos.add_argument("--calentamiento", type=int, default=1,
+                            help="recorridos sin cronometrar por caso (por defecto: 1)")
+    argumentos.add_argument("--semilla", type=int, default=0,
+                            help="semilla del corpus generado (por defecto: 0)")
+    argumentos.add_argument("--guardar", metavar="ARCHIVO",
+                            help="guarda los resultados como línea base JSON")
+    argumentos.add_argument("--comparar", metavar="ARCHIVO",
+                            help="compara con una línea base JSON guardada")
+    argumentos.add_argument("--tolerancia", type=float, default=0.10,
+                            help="aumento relativo tolerado de ns/token (por defecto: 0.10)")
+    argumentos.add_argument("--validez", action="store_true",
+                            help="compara también es_valida() con analizar()")
+    argumentos.add_argument("--arranque", nargs="*", choices=list(ARRANQUES), metavar="ENTRADA",
+                            help="solo mide el arranque de los puntos de entrada hasta el "
+                                 f"primer resultado (por defecto: {', '.join(ARRANQUES)})")
+    argumentos.add_argument("--earley", type=int, nargs="*", metavar="TOKENS",
+                            help="solo mide el parser de Earley con oraciones extendidas de "
+                                 f"estas longitudes (por defecto: "
+                                 f"{' '.join(map(str, LONGITUDES_EARLEY))})")
+    argumentos.add_argument("--hilos", type=int, nargs="*", metavar="N",
+                            help="solo mide el escalado de un MiniParser compartido entre "
+                                 f"estos números de hilos (por defecto: "
+                                 f"{' '.join(map(str, HILOS))})")
+    opciones = argumentos.parse_args(argv)
+    
+    if opciones.hilos is not None:
+        mostrar_hilos(opciones.hilos or HILOS, opciones.repeticiones, opciones.semilla)
+        return 0
+    
+    if opciones.earley is not None:
+        mostrar_earley(opciones.earley or LONGITUDES_EARLEY, opciones.repeticiones)
+        return 0
+    
+    if opciones.arranque is not None:
+        mostrar_arranque(opciones.arranque or tuple(ARRANQUES), opciones.repeticiones)
+        return 0
+    
+    ejecucion = ejecutar_suite(opciones.tamanos, opciones.casos, opciones.repeticiones,
+                               opciones.calentamiento, opciones.semilla)
+    mostrar_resultados(ejecucion)
+    
+    if opciones.guardar:
+        with open(opciones.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(ejecucion, archivo, ensure_ascii=False, indent=2)
+        print(f"\nLínea base guardada en {opciones.guardar}")
+    
+    regresiones = False
+    if opciones.comparar:
+        with open(opciones.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        comparacion = comparar(ejecucion, base, opciones.tolerancia)
+        mostrar_comparacion(comparacion, opciones.tolerancia)
+        regresiones = any(entrada["regresion"] for entrada in comparacion)
+    
+    if opciones.validez:
+        print()
+        benchmark_validez()
+    
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,20 @@ Comparación entre Parser Manual vs Modelo NLP Moderno
 Contraste de desempeño: Parser Descendente Recursivo vs spaCy (Deep Learning)
 """
 
+import argparse
+import importlib.util
 import sys
 import io
+import threading
 import time
-from typing import List, Dict
-from mini_parser import MiniParser
+import zlib
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from mini_parser import MiniParser, TipoToken, LEXICO
+
+# spaCy, sqlite3, hashlib, json, statistics y estadisticas se importan al
+# usarlos por primera vez: importar el módulo (o analizar una oración con el
+# backend local) no los carga
 
 # Configurar codificación UTF-8 para Windows
 if sys.platform == 'win32':
@@ -15,52 +24,385 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
+# Modelo de spaCy usado en la comparación
+MODELO = "es_core_news_sm"
+
+# Componentes del pipeline que no aportan a la verificación SVO (solo se usan
+# pos_ y dep_); se desactivan en el análisis por lotes
+COMPONENTES_NO_USADOS = ("ner", "lemmatizer", "entity_ruler", "textcat", "senter")
+
+# Dependencias que marcan sujeto y objeto en la verificación SVO
+DEPENDENCIAS_SUJETO = frozenset(("nsubj", "nsubj:pass"))
+DEPENDENCIAS_OBJETO = frozenset(("obj", "dobj", "iobj"))
+
+
 def verificar_dependencias():
-    """Verifica que spaCy esté disponible"""
-    try:
-        import spacy
-        nlp = spacy.load("es_core_news_sm")
-        print("✓ spaCy y modelo es_core_news_sm disponibles")
-        return True
-    except Exception as e:
-        print(f"✗ Error al cargar spaCy: {e}")
+    """
+    Verifica que spaCy y el modelo estén instalados
+    
+    No carga el modelo: eso lo hace una sola vez BackendSpacy (o el servidor
+    de servidor_nlp.py), y el tiempo de carga se reporta aparte.
+    """
+    if not spacy_instalado():
+        print("✗ Error: spaCy no está instalado")
+        return False
+    if importlib.util.find_spec(MODELO) is None:
+        print(f"✗ Error: el modelo {MODELO} no está instalado")
         return False
+    print(f"✓ spaCy y modelo {MODELO} disponibles")
+    return True
 
 
-class AnalizadorNLPModerno:
-    """Wrapper para análisis con spaCy (modelo estadístico/deep learning)"""
+class BackendNLP:
+    """
+    Interfaz de los modelos de NLP que usa AnalizadorNLPModerno
+    
+    Cada token se describe con un diccionario con al menos "texto", "pos"
+    (etiqueta POS universal) y "dep" (dependencia sintáctica universal).
+    carga_ms es el arranque en frío del backend (cargar el modelo), que se
+    reporta aparte del tiempo por oración. modelo y version identifican
+    los resultados del backend: a igual modelo y versión, el mismo análisis
+    (ver BackendCacheado).
+    """
+    
+    nombre = "NLP"
+    modelo = "NLP"
+    version = ""
+    carga_ms = 0.0
+    
+    def analizar(self, texto: str) -> List[dict]:
+        """
+        Tokens de una oración con todos sus atributos: texto, pos, tag, dep,
+        lemma y es_stop
+        """
+        raise NotImplementedError
+    
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[Tuple[str, List[dict]]]:
+        """
+        Analiza muchas oraciones por lotes
+        
+        Yields:
+            Tuplas (oración, tokens con texto, pos y dep), en el orden de entrada
+        """
+        raise NotImplementedError
+
+
+class BackendSpacy(BackendNLP):
+    """Modelo estadístico/deep learning de spaCy"""
     
-    def __init__(self):
+    def __init__(self, modelo: str = MODELO):
+        inicio = time.perf_counter_ns()
         import spacy
-        self.nlp = spacy.load("es_core_news_sm")
+        self.nlp = spacy.load(modelo)
+        self.carga_ms = (time.perf_counter_ns() - inicio) / 1e6
+        self.nombre = f"spaCy {modelo}"
+        self.modelo = f"spacy:{modelo}"
+        self.version = f"{self.nlp.meta.get('version', '')}+spacy{spacy.__version__}"
+    
+    def analizar(self, texto: str) -> List[dict]:
+        return [{
+            "texto": token.text,
+            "pos": token.pos_,  # Part-of-Speech tag
+            "tag": token.tag_,  # Etiqueta detallada
+            "dep": token.dep_,  # Dependencia sintáctica
+            "lemma": token.lemma_,
+            "es_stop": token.is_stop
+        } for token in self.nlp(texto)]
+    
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[Tuple[str, List[dict]]]:
+        """
+        Analiza con nlp.pipe, por lotes y opcionalmente en varios procesos
+        (-1: uno por CPU), con los componentes de COMPONENTES_NO_USADOS
+        desactivados. De cada token solo se extraen texto, pos_ y dep_.
+        """
+        desactivar = [nombre for nombre in COMPONENTES_NO_USADOS if nombre in self.nlp.pipe_names]
+        for doc in self.nlp.pipe(textos, batch_size=tamano_lote, n_process=procesos,
+                                 disable=desactivar):
+            yield doc.text, [{"texto": token.text, "pos": token.pos_, "dep": token.dep_}
+                             for token in doc]
+
+
+class BackendLocal(BackendNLP):
+    """
+    Sustituto local y determinista de spaCy, sin modelos ni red
+    
+    Etiqueta cada palabra según el léxico del mini-parser (DET, NOUN, ADJ,
+    VERB; X si es desconocida) y asigna dependencias con reglas simples: el
+    primer verbo es la raíz, el primer sustantivo antes de él es el sujeto
+    (nsubj) y el primero después es el objeto (obj). Sirve para ejecutar y
+    medir la comparación, sus lotes y sus tiempos en cualquier equipo; sus
+    etiquetas no pretenden igualar las de un modelo real.
+    """
+    
+    nombre = "backend local"
+    modelo = "local"
+    # Las etiquetas dependen solo del léxico y de las reglas de _etiquetar
+    version = "1+%08x" % zlib.crc32("\n".join(
+        f"{palabra} {tipo.value}" for palabra, tipo in sorted(LEXICO.items())).encode("utf-8"))
+    
+    POS = {
+        TipoToken.ARTICULO: "DET",
+        TipoToken.SUSTANTIVO: "NOUN",
+        TipoToken.ADJETIVO: "ADJ",
+        TipoToken.VERBO: "VERB",
+    }
+    DEPENDENCIAS = {"DET": "det", "ADJ": "amod", "NOUN": "nmod", "VERB": "conj", "X": "dep"}
+    
+    def analizar(self, texto: str) -> List[dict]:
+        tokens = self._etiquetar(texto)
+        for token in tokens:
+            token["tag"] = token["pos"]
+            token["lemma"] = token["texto"].lower()
+            token["es_stop"] = token["pos"] == "DET"
+        return tokens
+    
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[Tuple[str, List[dict]]]:
+        """Analiza las oraciones por lotes de tamano_lote, en este proceso"""
+        textos = iter(textos)
+        while True:
+            lote = list(islice(textos, tamano_lote))
+            if not lote:
+                return
+            for texto in lote:
+                yield texto, self._etiquetar(texto)
+    
+    def _etiquetar(self, texto: str) -> List[dict]:
+        """Tokens con texto, pos y dep"""
+        palabras = texto.split()
+        etiquetas = [self.POS.get(LEXICO.get(palabra.lower()), "X") for palabra in palabras]
+        dependencias = [self.DEPENDENCIAS[pos] for pos in etiquetas]
+        
+        raiz = etiquetas.index("VERB") if "VERB" in etiquetas else 0
+        if palabras:
+            dependencias[raiz] = "ROOT"
+        sujeto = next((i for i in range(raiz) if etiquetas[i] == "NOUN"), None)
+        objeto = next((i for i in range(raiz + 1, len(etiquetas)) if etiquetas[i] == "NOUN"), None)
+        if sujeto is not None and etiquetas[raiz] == "VERB":
+            dependencias[sujeto] = "nsubj"
+        if objeto is not None and etiquetas[raiz] == "VERB":
+            dependencias[objeto] = "obj"
+        
+        return [{"texto": palabra, "pos": pos, "dep": dep}
+                for palabra, pos, dep in zip(palabras, etiquetas, dependencias)]
+
+
+def verificar_svo(tokens: List[dict]) -> Tuple[bool, bool, bool]:
+    """Tupla (tiene sujeto, tiene verbo, tiene objeto) según pos y dep de los tokens"""
+    return (any(t["dep"] in DEPENDENCIAS_SUJETO for t in tokens),
+            any(t["pos"] == "VERB" for t in tokens),
+            any(t["dep"] in DEPENDENCIAS_OBJETO for t in tokens))
+
+
+class BackendCacheado(BackendNLP):
+    """
+    Backend que guarda en disco los análisis de otro backend
+    
+    Los análisis se guardan en una base SQLite, indexados por el hash SHA-256
+    de la oración más el modelo y la versión del backend, junto con las
+    marcas de sujeto, verbo y objeto. Como los resultados son deterministas
+    para un modelo fijo, solo las oraciones nuevas pasan por la inferencia;
+    al cambiar de modelo o de versión las entradas anteriores se ignoran.
+    
+    analizar_lote acepta cualquier entrada guardada; analizar solo las que
+    tienen todos los atributos (las de analizar_lote guardan texto, pos y dep).
+    """
+    
+    def __init__(self, backend: BackendNLP, ruta: str):
+        """
+        Args:
+            backend: Backend a consultar cuando la oración no está guardada
+            ruta: Archivo de la base de datos (se crea si no existe)
+        """
+        self.backend = backend
+        self.ruta = ruta
+        self.nombre = f"{backend.nombre} (caché)"
+        self.modelo = backend.modelo
+        self.version = backend.version
+        self.carga_ms = backend.carga_ms
+        self.aciertos = 0
+        self.fallos = 0
+        # El servidor NLP atiende cada conexión en un hilo distinto
+        self.candado = threading.Lock()
+        import sqlite3
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS analisis ("
+            " hash TEXT NOT NULL, modelo TEXT NOT NULL, version TEXT NOT NULL,"
+            " completo INTEGER NOT NULL, tokens TEXT NOT NULL, tiene_sujeto INTEGER NOT NULL,"
+            " tiene_verbo INTEGER NOT NULL, tiene_objeto INTEGER NOT NULL,"
+            " PRIMARY KEY (hash, modelo, version))")
+        self.conexion.commit()
+    
+    @staticmethod
+    def clave(texto: str) -> str:
+        """Hash del contenido de la oración"""
+        import hashlib
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+    
+    def analizar(self, texto: str) -> List[dict]:
+        clave = self.clave(texto)
+        guardados = self._buscar([clave], solo_completos=True)
+        if clave in guardados:
+            return guardados[clave]
+        
+        tokens = self.backend.analizar(texto)
+        self._guardar([(clave, tokens)], completo=True)
+        return tokens
+    
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[Tuple[str, List[dict]]]:
+        """
+        Busca cada lote en la caché y analiza solo las oraciones que faltan,
+        en un único lote del backend
+        """
+        textos = iter(textos)
+        while True:
+            lote = list(islice(textos, tamano_lote))
+            if not lote:
+                return
+            claves = [self.clave(texto) for texto in lote]
+            guardados = self._buscar(claves)
+            
+            faltantes = list(dict.fromkeys(texto for texto, clave in zip(lote, claves)
+                                           if clave not in guardados))
+            if faltantes:
+                nuevos = [(self.clave(texto), tokens) for texto, tokens
+                          in self.backend.analizar_lote(faltantes, tamano_lote, procesos)]
+                self._guardar(nuevos, completo=False)
+                guardados.update(nuevos)
+            
+            for texto, clave in zip(lote, claves):
+                yield texto, guardados[clave]
+    
+    def _buscar(self, claves: List[str], solo_completos: bool = False) -> Dict[str, List[dict]]:
+        """Tokens guardados de las claves presentes en la caché, y actualiza los contadores"""
+        import json
+        unicas = list(dict.fromkeys(claves))
+        guardados = {}
+        with self.candado:
+            # Por tramos, para no superar el límite de parámetros de SQLite
+            for inicio in range(0, len(unicas), 500):
+                tramo = unicas[inicio:inicio + 500]
+                consulta = (f"SELECT hash, tokens FROM analisis WHERE modelo = ? AND version = ?"
+                            f" AND hash IN ({', '.join('?' * len(tramo))})")
+                if solo_completos:
+                    consulta += " AND completo = 1"
+                filas = self.conexion.execute(consulta, [self.modelo, self.version, *tramo])
+                guardados.update((clave, json.loads(tokens)) for clave, tokens in filas)
+            aciertos = sum(clave in guardados for clave in claves)
+            self.aciertos += aciertos
+            self.fallos += len(claves) - aciertos
+        return guardados
+    
+    def _guardar(self, analisis: List[Tuple[str, List[dict]]], completo: bool):
+        """Guarda los tokens y las marcas SVO de cada clave"""
+        import json
+        filas = [(clave, self.modelo, self.version, int(completo),
+                  json.dumps(tokens, ensure_ascii=False), *verificar_svo(tokens))
+                 for clave, tokens in analisis]
+        # Una entrada completa reemplaza a la de un lote; nunca al revés
+        orden = "INSERT OR REPLACE" if completo else "INSERT OR IGNORE"
+        with self.candado:
+            self.conexion.executemany(f"{orden} INTO analisis VALUES (?, ?, ?, ?, ?, ?, ?, ?)", filas)
+            self.conexion.commit()
+    
+    def estadisticas(self) -> dict:
+        """Entradas guardadas para este modelo y versión, aciertos y fallos"""
+        with self.candado:
+            entradas, = self.conexion.execute(
+                "SELECT COUNT(*) FROM analisis WHERE modelo = ? AND version = ?",
+                (self.modelo, self.version)).fetchone()
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+    
+    def cerrar(self):
+        """Cierra la base de datos"""
+        self.conexion.close()
+
+
+# Backends disponibles
+BACKENDS = {
+    "spacy": BackendSpacy,
+    "local": BackendLocal,
+}
+
+
+def spacy_instalado() -> bool:
+    """Indica si spaCy está instalado (sin importarlo)"""
+    return importlib.util.find_spec("spacy") is not None
+
+
+def crear_backend(nombre: Optional[str] = None) -> BackendNLP:
+    """
+    Crea un backend por nombre ("spacy" o "local")
+    
+    Sin nombre se usa spaCy si está instalado y, si no, el backend local.
+    """
+    if nombre is None:
+        nombre = "spacy" if spacy_instalado() else "local"
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend desconocido: '{nombre}'. Opciones: {', '.join(BACKENDS)}")
+    return BACKENDS[nombre]()
+
+
+class AnalizadorNLPModerno:
+    """Wrapper para análisis con un modelo de NLP (spaCy por defecto, ver BackendNLP)"""
+    
+    def __init__(self, backend: Optional[BackendNLP] = None):
+        self.backend = backend if backend is not None else crear_backend()
     
     def analizar(self, texto: str) -> dict:
         """
-        Analiza texto usando spaCy (modelo basado en redes neuronales)
+        Analiza texto usando el backend (con spaCy, un modelo basado en redes neuronales)
         
         Returns:
             Diccionario con análisis sintáctico y POS tagging
         """
-        inicio = time.time()
-        doc = self.nlp(texto)
-        tiempo = time.time() - inicio
-        
-        # Extraer información
-        tokens = []
-        for token in doc:
-            tokens.append({
-                "texto": token.text,
-                "pos": token.pos_,  # Part-of-Speech tag
-                "tag": token.tag_,  # Etiqueta detallada
-                "dep": token.dep_,  # Dependencia sintáctica
-                "lemma": token.lemma_,
-                "es_stop": token.is_stop
-            })
+        inicio = time.perf_counter_ns()
+        tokens = self.backend.analizar(texto)
+        tiempo = time.perf_counter_ns() - inicio
+        
+        return self._resultado(texto, tokens, tiempo)
+    
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[dict]:
+        """
+        Analiza muchas oraciones por lotes (con spaCy, mediante nlp.pipe)
         
-        # Verificar estructura SVO (Sujeto-Verbo-Objeto)
-        tiene_sujeto = any(t["dep"] in ["nsubj", "nsubj:pass"] for t in tokens)
-        tiene_verbo = any(t["pos"] == "VERB" for t in tokens)
-        tiene_objeto = any(t["dep"] in ["obj", "dobj", "iobj"] for t in tokens)
+        Args:
+            textos: Oraciones a analizar
+            tamano_lote: Oraciones por lote
+            procesos: Procesos del backend (-1: uno por CPU)
+        
+        Yields:
+            Un resultado por oración, en el orden de entrada, con las mismas
+            claves que analizar() (los tokens solo tienen texto, pos y dep).
+            El backend procesa cada lote de una vez, al pedirle su primera
+            oración, así que se cronometra el lote completo y cada oración
+            recibe el tiempo del lote dividido por sus oraciones.
+        """
+        analisis = iter(self.backend.analizar_lote(textos, tamano_lote, procesos))
+        while True:
+            inicio = time.perf_counter_ns()
+            lote = list(islice(analisis, tamano_lote))
+            tiempo = time.perf_counter_ns() - inicio
+            if not lote:
+                return
+            for texto, tokens in lote:
+                yield self._resultado(texto, tokens, tiempo / len(lote))
+    
+    @staticmethod
+    def _resultado(texto: str, tokens: List[dict], tiempo_ns: int) -> dict:
+        """Verifica la estructura SVO (Sujeto-Verbo-Objeto) y arma el resultado"""
+        tiene_sujeto, tiene_verbo, tiene_objeto = verificar_svo(tokens)
         
         estructura_svo = tiene_sujeto and tiene_verbo and tiene_objeto
         
@@ -72,49 +414,128 @@ class AnalizadorNLPModerno:
             "tiene_verbo": tiene_verbo,
             "tiene_objeto": tiene_objeto,
             "estructura_svo": estructura_svo,
-            "tiempo_ms": tiempo * 1000
+            "tiempo_ms": tiempo_ns / 1e6
         }
 
 
+def _resumen_tiempos(tiempos: List[List[float]], pasadas: List[int]) -> dict:
+    """
+    Resume los tiempos de un parser
+    
+    Args:
+        tiempos: Tiempos en ns de cada oración en cada repetición
+        pasadas: Duración en ns de cada pasada completa por el corpus
+    
+    Returns:
+        Mediana y percentiles 95 y 99 del tiempo por oración (ms), y las
+        oraciones por segundo (media entre pasadas) con su IC del 95%
+    """
+    from estadisticas import percentil, intervalo_confianza
+    muestras = [tiempo for muestras_oracion in tiempos for tiempo in muestras_oracion]
+    rendimientos = [len(tiempos) / pasada * 1e9 for pasada in pasadas if pasada > 0]
+    media, inferior, superior = intervalo_confianza(rendimientos or [0.0])
+    return {
+        "mediana_ms": percentil(muestras, 50) / 1e6 if muestras else 0.0,
+        "p95_ms": percentil(muestras, 95) / 1e6 if muestras else 0.0,
+        "p99_ms": percentil(muestras, 99) / 1e6 if muestras else 0.0,
+        "oraciones_por_segundo": media,
+        "ic95_oraciones_por_segundo": (inferior, superior),
+    }
+
+
+def _razon_velocidad(manual: dict, nlp: dict) -> dict:
+    """
+    Cuántas veces más oraciones por segundo procesa el parser manual que spaCy
+    
+    El intervalo combina los extremos de los intervalos de ambos parsers, por
+    lo que es conservador. Un límite superior infinito indica que el
+    intervalo de spaCy llega a cero.
+    """
+    if not nlp["oraciones_por_segundo"]:
+        return {"valor": float("inf"), "ic95": (float("inf"), float("inf"))}
+    
+    inferior_manual, superior_manual = manual["ic95_oraciones_por_segundo"]
+    inferior_nlp, superior_nlp = nlp["ic95_oraciones_por_segundo"]
+    return {
+        "valor": manual["oraciones_por_segundo"] / nlp["oraciones_por_segundo"],
+        "ic95": (max(inferior_manual, 0.0) / superior_nlp,
+                 superior_manual / inferior_nlp if inferior_nlp > 0 else float("inf")),
+    }
+
+
 class ComparadorParsers:
     """Compara el desempeño de ambos parsers"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[BackendNLP] = None):
+        """
+        Args:
+            backend: Modelo de NLP a comparar (por defecto, ver crear_backend)
+        """
         self.parser_manual = MiniParser()
-        self.parser_nlp = AnalizadorNLPModerno()
+        self.parser_nlp = AnalizadorNLPModerno(backend)
     
-    def comparar(self, casos_prueba: List[str]) -> Dict:
+    def comparar(self, casos_prueba: List[str], tamano_lote: int = 64, procesos: int = 1,
+                 repeticiones: int = 5, calentamiento: int = 1) -> Dict:
         """
         Compara ambos parsers con múltiples casos de prueba
         
+        Cada parser recorre el corpus varias veces tras unas pasadas de
+        calentamiento; los tiempos se toman con perf_counter_ns. El parser
+        manual se cronometra oración por oración; spaCy analiza por lotes, y
+        cada oración recibe el tiempo de su lote dividido por el tamaño del
+        lote (ver AnalizadorNLPModerno.analizar_lote). Se reportan la mediana
+        y los percentiles 95 y 99 del tiempo por oración, y las oraciones por
+        segundo con su intervalo de confianza del 95% entre repeticiones.
+        El arranque en frío del backend (carga_ms y, con un servidor,
+        carga_servidor_ms) no entra en esos tiempos y se reporta aparte. Con
+        un BackendCacheado, los tiempos de spaCy incluyen los aciertos de la
+        caché, cuyas estadísticas se agregan en "cache".
+        
+        Args:
+            casos_prueba: Oraciones a comparar
+            tamano_lote: Oraciones por lote de spaCy
+            procesos: Procesos de spaCy (-1: uno por CPU)
+            repeticiones: Pasadas cronometradas por parser
+            calentamiento: Pasadas previas sin cronometrar
+        
         Returns:
             Diccionario con estadísticas comparativas
         """
+        import statistics
+        resultados_manual, tiempos_manual, pasadas_manual = self._medir_manual(
+            casos_prueba, repeticiones, calentamiento)
+        resultados_nlp, tiempos_nlp, pasadas_nlp = self._medir_nlp(
+            casos_prueba, tamano_lote, procesos, repeticiones, calentamiento)
+        
+        backend = self.parser_nlp.backend
         resultados = {
             "casos": [],
+            "backend": backend.nombre,
+            "carga_ms": backend.carga_ms,
+            "carga_servidor_ms": getattr(backend, "carga_servidor_ms", None),
+            "cache": backend.estadisticas() if isinstance(backend, BackendCacheado) else None,
+            "repeticiones": repeticiones,
+            "calentamiento": calentamiento,
             "stats_manual": {
                 "validos": 0,
                 "invalidos": 0,
-                "tiempo_total": 0,
+                "tiempo_total": statistics.median(pasadas_manual) / 1e6,
                 "errores_lexico": 0,
-                "errores_sintactico": 0
+                "errores_sintactico": 0,
+                "tiempos": _resumen_tiempos(tiempos_manual, pasadas_manual)
             },
             "stats_nlp": {
                 "con_estructura_svo": 0,
                 "sin_estructura_svo": 0,
-                "tiempo_total": 0
+                "tiempo_total": statistics.median(pasadas_nlp) / 1e6,
+                "tiempos": _resumen_tiempos(tiempos_nlp, pasadas_nlp)
             }
         }
+        resultados["razon_velocidad"] = _razon_velocidad(resultados["stats_manual"]["tiempos"],
+                                                         resultados["stats_nlp"]["tiempos"])
         
-        for caso in casos_prueba:
-            # Parser manual
-            inicio = time.time()
-            resultado_manual = self.parser_manual.analizar(caso)
-            tiempo_manual = (time.time() - inicio) * 1000
-            
-            # Parser NLP
-            resultado_nlp = self.parser_nlp.analizar(caso)
-            
+        for caso, resultado_manual, resultado_nlp, muestras_manual, muestras_nlp in zip(
+                casos_prueba, resultados_manual, resultados_nlp, tiempos_manual, tiempos_nlp):
             # Acumular estadísticas
             if resultado_manual["valido"]:
                 resultados["stats_manual"]["validos"] += 1
@@ -125,42 +546,104 @@ class ComparadorParsers:
                 else:
                     resultados["stats_manual"]["errores_sintactico"] += 1
             
-            resultados["stats_manual"]["tiempo_total"] += tiempo_manual
-            
             if resultado_nlp["estructura_svo"]:
                 resultados["stats_nlp"]["con_estructura_svo"] += 1
             else:
                 resultados["stats_nlp"]["sin_estructura_svo"] += 1
             
-            resultados["stats_nlp"]["tiempo_total"] += resultado_nlp["tiempo_ms"]
-            
-            # Guardar resultado individual
+            # Guardar resultado individual (tiempo: mediana de las repeticiones)
             resultados["casos"].append({
                 "texto": caso,
                 "manual": {
                     "valido": resultado_manual["valido"],
                     "fase": resultado_manual.get("fase", "N/A"),
-                    "tiempo_ms": tiempo_manual
+                    "tiempo_ms": statistics.median(muestras_manual) / 1e6
                 },
                 "nlp": {
                     "estructura_svo": resultado_nlp["estructura_svo"],
                     "tiene_sujeto": resultado_nlp["tiene_sujeto"],
                     "tiene_verbo": resultado_nlp["tiene_verbo"],
                     "tiene_objeto": resultado_nlp["tiene_objeto"],
-                    "tiempo_ms": resultado_nlp["tiempo_ms"],
+                    "tiempo_ms": statistics.median(muestras_nlp) / 1e6,
                     "pos_tags": [f"{t['texto']}:{t['pos']}" for t in resultado_nlp["tokens"]]
                 }
             })
         
         return resultados
     
-    def mostrar_comparacion_detallada(self, resultados: Dict):
-        """Muestra una comparación detallada de los resultados"""
+    def _medir_manual(self, casos: List[str], repeticiones: int,
+                      calentamiento: int) -> Tuple[List[dict], List[List[int]], List[int]]:
+        """
+        Cronometra el parser manual oración por oración
+        
+        Returns:
+            Tupla (resultado de cada oración, tiempos en ns de cada oración
+            en cada repetición, duración en ns de cada pasada)
+        """
+        analizar = self.parser_manual.analizar
+        reloj = time.perf_counter_ns
+        
+        for _ in range(calentamiento):
+            for caso in casos:
+                analizar(caso)
+        
+        resultados = [analizar(caso) for caso in casos]
+        tiempos = [[] for _ in casos]
+        pasadas = []
+        for _ in range(max(repeticiones, 1)):
+            for caso, muestras in zip(casos, tiempos):
+                inicio = reloj()
+                analizar(caso)
+                muestras.append(reloj() - inicio)
+            # La pasada suma solo el tiempo dentro de analizar(), sin el del bucle
+            pasadas.append(sum(muestras[-1] for muestras in tiempos))
+        
+        return resultados, tiempos, pasadas
+    
+    def _medir_nlp(self, casos: List[str], tamano_lote: int, procesos: int, repeticiones: int,
+                   calentamiento: int) -> Tuple[List[dict], List[List[int]], List[int]]:
+        """
+        Cronometra spaCy sobre el corpus completo en cada repetición
+        
+        Returns:
+            Tupla (resultado de cada oración en la primera repetición, tiempos
+            en ns de cada oración en cada repetición, repartidos por lote, y
+            duración en ns de cada pasada)
+        """
+        reloj = time.perf_counter_ns
+        
+        # El calentamiento usa un solo lote: cada oración cuesta milisegundos
+        for _ in range(calentamiento):
+            list(self.parser_nlp.analizar_lote(casos[:tamano_lote], tamano_lote, procesos))
+        
+        resultados = []
+        tiempos = [[] for _ in casos]
+        pasadas = []
+        for _ in range(max(repeticiones, 1)):
+            inicio = reloj()
+            pasada = list(self.parser_nlp.analizar_lote(casos, tamano_lote, procesos))
+            pasadas.append(reloj() - inicio)
+            
+            for resultado, muestras in zip(pasada, tiempos):
+                muestras.append(resultado["tiempo_ms"] * 1e6)
+            resultados = resultados or pasada
+        
+        return resultados, tiempos, pasadas
+    
+    def mostrar_comparacion_detallada(self, resultados: Dict, detalle: bool = True):
+        """
+        Muestra una comparación detallada de los resultados
+        
+        Args:
+            resultados: Resultado de comparar()
+            detalle: Si es False, solo se muestran el resumen y el análisis
+                     comparativo (útil con corpus grandes)
+        """
         print("\n" + "="*80)
         print("COMPARACIÓN DETALLADA: PARSER MANUAL VS NLP MODERNO")
         print("="*80)
         
-        for i, caso in enumerate(resultados["casos"], 1):
+        for i, caso in enumerate(resultados["casos"] if detalle else [], 1):
             print(f"\n{'─'*80}")
             print(f"Caso {i}: \"{caso['texto']}\"")
             print(f"{'─'*80}")
@@ -174,7 +657,7 @@ class ComparadorParsers:
             print(f"   ⏱ Tiempo: {caso['manual']['tiempo_ms']:.4f} ms")
             
             # Resultado NLP
-            print(f"\n🤖 PARSER NLP (spaCy - Deep Learning):")
+            print(f"\n🤖 PARSER NLP ({resultados['backend']}):")
             print(f"   Estructura SVO detectada: {'✓ Sí' if caso['nlp']['estructura_svo'] else '✗ No'}")
             print(f"   • Sujeto: {'✓' if caso['nlp']['tiene_sujeto'] else '✗'}")
             print(f"   • Verbo: {'✓' if caso['nlp']['tiene_verbo'] else '✗'}")
@@ -201,7 +684,7 @@ class ComparadorParsers:
         print(f"   • Tiempo total: {stats_m['tiempo_total']:.4f} ms")
         print(f"   • Tiempo promedio: {stats_m['tiempo_total']/total_casos:.4f} ms/oración")
         
-        print(f"\n🤖 PARSER NLP (spaCy):")
+        print(f"\n🤖 PARSER NLP ({resultados['backend']}):")
         print(f"   • Con estructura SVO: {stats_n['con_estructura_svo']}/{total_casos} "
               f"({stats_n['con_estructura_svo']/total_casos*100:.1f}%)")
         print(f"   • Sin estructura SVO: {stats_n['sin_estructura_svo']}/{total_casos} "
@@ -214,21 +697,36 @@ class ComparadorParsers:
         print("ANÁLISIS COMPARATIVO")
         print(f"{'='*80}")
         
-        # Evitar división por cero
-        print(f"\n⚡ DESEMPEÑO:")
-        if stats_n['tiempo_total'] > 0 and stats_m['tiempo_total'] > 0:
-            velocidad_ratio = stats_m['tiempo_total'] / stats_n['tiempo_total']
-            if velocidad_ratio < 1:
-                print(f"   • Parser Manual es {1/velocidad_ratio:.2f}x más rápido que spaCy")
-            else:
-                print(f"   • spaCy es {velocidad_ratio:.2f}x más rápido que Parser Manual")
-        elif stats_m['tiempo_total'] == 0 or stats_m['tiempo_total'] < 0.0001:
-            print(f"   • Parser Manual es extremadamente rápido (tiempo < 0.0001 ms)")
-            print(f"   • spaCy: {stats_n['tiempo_total']:.4f} ms total")
-            if stats_n['tiempo_total'] > 0:
-                print(f"   • Parser Manual es significativamente más rápido que spaCy")
+        print(f"\n⚡ DESEMPEÑO ({resultados['repeticiones']} repeticiones, "
+              f"{resultados['calentamiento']} de calentamiento):")
+        nombre_nlp = resultados["backend"]
+        if resultados["carga_servidor_ms"] is not None:
+            print(f"   • Arranque de {nombre_nlp}: {resultados['carga_ms']:.1f} ms de conexión "
+                  f"(modelo cargado una vez por el servidor en "
+                  f"{resultados['carga_servidor_ms']:.1f} ms)")
+        else:
+            print(f"   • Arranque en frío de {nombre_nlp}: {resultados['carga_ms']:.1f} ms")
+        if resultados["cache"] is not None:
+            cache = resultados["cache"]
+            print(f"   • Caché de análisis: {cache['aciertos']} aciertos, {cache['fallos']} fallos "
+                  f"({cache['tasa_aciertos']*100:.1f}%), {cache['entradas']} entradas guardadas")
+        for nombre, stats in (("Parser Manual", stats_m), (nombre_nlp, stats_n)):
+            tiempos = stats["tiempos"]
+            inferior, superior = tiempos["ic95_oraciones_por_segundo"]
+            print(f"   • {nombre}: mediana {tiempos['mediana_ms']:.4f} ms/oración "
+                  f"(p95 {tiempos['p95_ms']:.4f} ms, p99 {tiempos['p99_ms']:.4f} ms)")
+            print(f"     {tiempos['oraciones_por_segundo']:,.0f} oraciones/s "
+                  f"(IC 95%: {inferior:,.0f} – {superior:,.0f})")
+        
+        razon = resultados["razon_velocidad"]
+        inferior, superior = razon["ic95"]
+        if razon["valor"] >= 1:
+            print(f"   • Parser Manual es {razon['valor']:.2f}x más rápido que {nombre_nlp} "
+                  f"(IC 95%: {inferior:.2f}x – {superior:.2f}x)")
         else:
-            print(f"   • No se puede calcular ratio (tiempos muy pequeños o cero)")
+            print(f"   • {nombre_nlp} es {1/razon['valor']:.2f}x más rápido que Parser Manual "
+                  f"(IC 95%: {1/superior if superior else float('inf'):.2f}x – "
+                  f"{1/inferior if inferior else float('inf'):.2f}x)")
         
         print(f"\n🎯 PRECISIÓN:")
         print(f"   • Parser Manual: Verifica gramática formal estricta (SVO con vocabulario limitado)")
@@ -255,13 +753,51 @@ class ComparadorParsers:
         print(f"\n{'='*80}\n")
 
 
-def main():
+def main(argv: Optional[list] = None):
     """Función principal"""
+    argumentos = argparse.ArgumentParser(description="Compara el parser manual con spaCy")
+    argumentos.add_argument("--backend", choices=list(BACKENDS),
+                            help="modelo de NLP (por defecto: spacy si está instalado, si no local)")
+    argumentos.add_argument("--corpus", metavar="ARCHIVO",
+                            help="archivo con una oración por línea (por defecto: casos de ejemplo)")
+    argumentos.add_argument("--tamano-lote", type=int, default=64,
+                            help="oraciones por lote de spaCy (por defecto: 64)")
+    argumentos.add_argument("--procesos", type=int, default=1,
+                            help="procesos de spaCy (-1: uno por CPU; por defecto: 1)")
+    argumentos.add_argument("--repeticiones", type=int, default=5,
+                            help="pasadas cronometradas por parser (por defecto: 5)")
+    argumentos.add_argument("--calentamiento", type=int, default=1,
+                            help="pasadas sin cronometrar por parser (por defecto: 1)")
+    argumentos.add_argument("--solo-resumen", action="store_true",
+                            help="no muestra el detalle de cada oración")
+    argumentos.add_argument("--servidor", action="store_true",
+                            help="usa el modelo ya cargado por servidor_nlp.py (y lo inicia "
+                                 "en segundo plano si no está activo)")
+    argumentos.add_argument("--direccion", metavar="SOCKET",
+                            help="dirección del servidor (por defecto, la de servidor_nlp.py)")
+    argumentos.add_argument("--cache", metavar="ARCHIVO",
+                            help="base SQLite donde guardar los análisis de NLP; solo se analizan "
+                                 "las oraciones que no estén guardadas para el mismo modelo")
+    opciones = argumentos.parse_args(argv)
+    
+    backend = opciones.backend or ("spacy" if spacy_instalado() else "local")
+    
     print("="*80)
     print("VERIFICACIÓN DE DEPENDENCIAS")
     print("="*80)
-    if not verificar_dependencias():
-        return
+    if opciones.servidor:
+        import servidor_nlp
+        try:
+            modelo = servidor_nlp.conectar(opciones.direccion, backend, iniciar=True)
+        except servidor_nlp.ErrorServidor as error:
+            print(f"✗ {error}")
+            return
+        print(f"✓ Conectado al servidor NLP ({modelo.nombre}) en {modelo.direccion}")
+    elif backend == "spacy":
+        if not verificar_dependencias():
+            return
+    else:
+        print("ℹ Usando el backend local (sin spaCy): etiquetas deterministas a partir del léxico")
     
     print("\n\n" + "="*80)
     print("FASE 2: COMPARACIÓN DE PARSERS")
@@ -291,12 +827,26 @@ def main():
         "los gatos negros cazan ratones pequeños",
     ]
     
+    if opciones.corpus:
+        with open(opciones.corpus, encoding="utf-8") as archivo:
+            casos_prueba = [linea.strip() for linea in archivo if linea.strip()]
+    
     # Ejecutar comparación
-    comparador = ComparadorParsers()
-    resultados = comparador.comparar(casos_prueba)
+    if not opciones.servidor:
+        modelo = crear_backend(backend)
+    if opciones.cache:
+        modelo = BackendCacheado(modelo, opciones.cache)
+    comparador = ComparadorParsers(modelo)
+    resultados = comparador.comparar(casos_prueba, opciones.tamano_lote, opciones.procesos,
+                                     opciones.repeticiones, opciones.calentamiento)
     
     # Mostrar resultados
-    comparador.mostrar_comparacion_detallada(resultados)
+    comparador.mostrar_comparacion_detallada(resultados, detalle=not opciones.solo_resumen)
+    if opciones.cache:
+        modelo.cerrar()
+        modelo = modelo.backend
+    if opciones.servidor:
+        modelo.cerrar()
 
 
 if __name__ == "__main__":
@@ -4,9 +4,12 @@ Demo Interactiva - Mini-Parser
 Permite probar el parser de forma interactiva
 """
 
-from mini_parser import MiniParser
-from visualizador_arbol import VisualizadorArbol
+import argparse
 import sys
+from mini_parser import MiniParser, ParserLL1
+
+# VisualizadorArbol se importa y se crea recién al pedir el análisis paso a
+# paso, para que el menú y el primer análisis no paguen su carga
 
 
 def mostrar_menu():
@@ -30,21 +33,9 @@ def mostrar_gramatica():
     print("\n" + "="*70)
     print("GRAMÁTICA LIBRE DE CONTEXTO")
     print("="*70)
+    print("\nReglas de Producción (las que compila el motor LL(1)):\n")
+    print(ParserLL1.GRAMATICA)
     print("""
-Reglas de Producción:
-
-  <oración>     ::= <sujeto> <predicado>
-  
-  <sujeto>      ::= <artículo> <sustantivo>
-                  | <artículo> <sustantivo> <adjetivo>
-                  | <artículo> <adjetivo> <sustantivo>
-  
-  <predicado>   ::= <verbo> <complemento>
-  
-  <complemento> ::= <artículo> <sustantivo>
-                  | <artículo> <sustantivo> <adjetivo>
-                  | <artículo> <adjetivo> <sustantivo>
-
 Estructura Básica: SUJETO + VERBO + COMPLEMENTO
 
 Características:
@@ -61,26 +52,26 @@ def mostrar_vocabulario():
     print("VOCABULARIO SOPORTADO")
     print("="*70)
     
-    from mini_parser import AnalizadorLexico
-    lexico = AnalizadorLexico()
+    from mini_parser import ARTICULOS, SUSTANTIVOS, ADJETIVOS, VERBOS
     
     print("\n📌 ARTÍCULOS:")
-    print("  ", ", ".join(sorted(lexico.articulos)))
+    print("  ", ", ".join(sorted(ARTICULOS)))
     
     print("\n📌 SUSTANTIVOS:")
-    sustantivos = sorted(lexico.sustantivos)
+    sustantivos = sorted(SUSTANTIVOS)
     for i in range(0, len(sustantivos), 8):
         print("  ", ", ".join(sustantivos[i:i+8]))
     
     print("\n📌 ADJETIVOS:")
-    adjetivos = sorted(lexico.adjetivos)
+    adjetivos = sorted(ADJETIVOS)
     for i in range(0, len(adjetivos), 8):
         print("  ", ", ".join(adjetivos[i:i+8]))
     
     print("\n📌 VERBOS:")
-    print("  ", ", ".join(sorted(lexico.verbos)))
+    print("  ", ", ".join(sorted(VERBOS)))
     
-    print(f"\nTotal de palabras: {len(lexico.articulos) + len(lexico.sustantivos) + len(lexico.adjetivos) + len(lexico.verbos)}")
+    # Solo las palabras listadas (las de la gramática del parser de la demo)
+    print(f"\nTotal de palabras: {len(ARTICULOS | SUSTANTIVOS | ADJETIVOS | VERBOS)}")
 
 
 def probar_oracion(parser, oracion):
@@ -148,15 +139,28 @@ def ejemplos_invalidos(parser):
         print(f"   Razón: {razon}")
 
 
-def analisis_paso_a_paso(visualizador, oracion):
+def analisis_paso_a_paso(parser, oracion):
     """Muestra análisis paso a paso con árbol"""
-    print(visualizador.visualizar_pasos(oracion))
+    from visualizador_arbol import VisualizadorArbol
+    print(VisualizadorArbol(parser).visualizar_pasos(oracion))
 
 
-def main():
+def main(argv=None):
     """Función principal de la demo"""
+    argumentos = argparse.ArgumentParser(description="Demo interactiva del mini-parser")
+    argumentos.add_argument("oracion", nargs="?",
+                            help="analiza solo esta oración y termina (sin menú)")
+    argumentos.add_argument("--arbol", action="store_true",
+                            help="con una oración, muestra el análisis paso a paso con el árbol")
+    opciones = argumentos.parse_args(argv)
+    
     parser = MiniParser()
-    visualizador = VisualizadorArbol()
+    if opciones.oracion:
+        if opciones.arbol:
+            analisis_paso_a_paso(parser, opciones.oracion)
+        else:
+            probar_oracion(parser, opciones.oracion)
+        return
     
     print("\n" + "="*70)
     print("¡Bienvenido a la Demo del Mini-Parser!")
@@ -186,7 +190,7 @@ def main():
                 print("\nIngresa una oración para análisis detallado: ", end="")
                 oracion = input().strip()
                 if oracion:
-                    analisis_paso_a_paso(visualizador, oracion)
+                    analisis_paso_a_paso(parser, oracion)
             
             elif opcion == "5":
                 mostrar_gramatica()
@@ -0,0 +1,58 @@
+"""
+Estadísticas de Tiempos
+Percentiles e intervalos de confianza de las mediciones de rendimiento,
+compartidos por benchmark_parser y comparacion_parsers
+"""
+
+import statistics
+from typing import Sequence, Tuple
+
+
+def percentil(valores: Sequence[float], p: float) -> float:
+    """
+    Percentil p (0-100) con interpolación lineal entre muestras
+    
+    Args:
+        valores: Muestras (no necesitan estar ordenadas)
+        p: Percentil a calcular
+    """
+    if not valores:
+        raise ValueError("No hay muestras para calcular el percentil")
+    ordenados = sorted(valores)
+    rango = (len(ordenados) - 1) * p / 100
+    inferior = int(rango)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (rango - inferior)
+
+
+# Valores críticos de la t de Student (bilateral, 95%) por grados de libertad
+_T_STUDENT_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+                 8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086,
+                 25: 2.060, 30: 2.042}
+
+
+def intervalo_confianza(valores: Sequence[float]) -> Tuple[float, float, float]:
+    """
+    Media e intervalo de confianza del 95% (t de Student)
+    
+    Para grados de libertad fuera de la tabla se usa el valor crítico del
+    grado inmediatamente inferior (un intervalo algo más ancho), y 1.96 a
+    partir de 30.
+    
+    Returns:
+        Tupla (media, límite inferior, límite superior); con una sola
+        muestra el intervalo se reduce a la media
+    """
+    if not valores:
+        raise ValueError("No hay muestras para calcular el intervalo de confianza")
+    media = statistics.fmean(valores)
+    if len(valores) < 2:
+        return media, media, media
+    
+    libertad = len(valores) - 1
+    if libertad > 30:
+        critico = 1.96
+    else:
+        critico = _T_STUDENT_95[max(grado for grado in _T_STUDENT_95 if grado <= libertad)]
+    margen = critico * statistics.stdev(valores) / len(valores) ** 0.5
+    return media, media - margen, media + margen
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+"""
+Generador de Corpus Sintéticos
+Genera oraciones de la gramática del mini-parser, mezcladas con oraciones
+casi válidas con errores controlados, para pruebas de carga y benchmarks
+"""
+
+import argparse
+import random
+import sys
+from itertools import islice, repeat
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from mini_parser import AnalizadorLexico, LEXICO
+
+
+# Tipos de error que puede introducir el generador
+FALTA_ARTICULO = "falta_articulo"
+ADJETIVO_EXTRA = "adjetivo_extra"
+PALABRA_DESCONOCIDA = "palabra_desconocida"
+ORDEN_INCORRECTO = "orden_incorrecto"
+TIPOS_ERROR = (FALTA_ARTICULO, ADJETIVO_EXTRA, PALABRA_DESCONOCIDA, ORDEN_INCORRECTO)
+
+# Proporción de oraciones con cada tipo de error, por defecto
+ERRORES_POR_DEFECTO = {tipo: 0.05 for tipo in TIPOS_ERROR}
+
+# Distribución de longitudes (en palabras) de las oraciones válidas, por
+# defecto: 5 sin adjetivos, 6 con un adjetivo, 7 con uno en cada sintagma
+LONGITUDES_POR_DEFECTO = {5: 0.5, 6: 0.35, 7: 0.15}
+
+# Palabras fuera del vocabulario para los errores léxicos
+PALABRAS_DESCONOCIDAS = tuple(
+    palabra for palabra in ("python", "rápidamente", "muy", "bicicleta",
+                            "nube", "corre", "verde", "ellos", "sobre")
+    if palabra not in LEXICO
+)
+
+
+class GeneradorCorpus:
+    """
+    Generador reproducible de oraciones para pruebas de carga
+    
+    Las oraciones válidas siguen la gramática de ParserDescendenteRecursivo
+    con el vocabulario de AnalizadorLexico. Una parte de las oraciones recibe
+    exactamente un error, según las proporciones indicadas. Cada error está
+    construido para que la oración resultante sea inválida.
+    
+    Las oraciones se generan a medida que se piden, por lo que un corpus de
+    millones de oraciones no ocupa memoria. Cada llamada a muestras() u
+    oraciones() empieza desde la semilla, así que repite la misma secuencia.
+    """
+    
+    def __init__(self, semilla: int = 0, errores: Optional[Mapping[str, float]] = None,
+                 longitudes: Optional[Mapping[int, float]] = None):
+        """
+        Args:
+            semilla: Semilla del generador pseudoaleatorio
+            errores: Proporción de oraciones con cada tipo de error (TIPOS_ERROR);
+                     la suma no puede superar 1
+            longitudes: Peso de cada longitud de oración válida (5, 6 o 7)
+        """
+        errores = dict(ERRORES_POR_DEFECTO if errores is None else errores)
+        longitudes = dict(LONGITUDES_POR_DEFECTO if longitudes is None else longitudes)
+        
+        desconocidos = set(errores) - set(TIPOS_ERROR)
+        if desconocidos:
+            raise ValueError(
+                f"Tipo de error desconocido: {', '.join(sorted(desconocidos))}. "
+                f"Opciones: {', '.join(TIPOS_ERROR)}"
+            )
+        if any(proporcion < 0 for proporcion in errores.values()) or sum(errores.values()) > 1:
+            raise ValueError("Las proporciones de error deben ser positivas y sumar como máximo 1")
+        if not longitudes or set(longitudes) - set(LONGITUDES_POR_DEFECTO):
+            raise ValueError(
+                f"Longitudes inválidas: {sorted(longitudes)}. "
+                f"Opciones: {', '.join(map(str, LONGITUDES_POR_DEFECTO))}"
+            )
+        if any(peso < 0 for peso in longitudes.values()) or not sum(longitudes.values()):
+            raise ValueError("Los pesos de las longitudes deben ser positivos")
+        
+        self.semilla = semilla
+        self.errores = errores
+        self.longitudes = longitudes
+        
+        # El vocabulario se ordena para que la semilla determine el corpus
+        # (el orden de iteración de un frozenset depende del hash de cada ejecución)
+        self.articulos = sorted(AnalizadorLexico.articulos)
+        self.sustantivos = sorted(AnalizadorLexico.sustantivos)
+        self.adjetivos = sorted(AnalizadorLexico.adjetivos)
+        self.verbos = sorted(AnalizadorLexico.verbos)
+        
+        # Umbrales acumulados para elegir el error con un solo número aleatorio
+        self._umbrales: List[Tuple[float, str]] = []
+        acumulado = 0.0
+        for tipo in TIPOS_ERROR:
+            acumulado += errores.get(tipo, 0.0)
+            self._umbrales.append((acumulado, tipo))
+        
+        self._longitudes = sorted(longitudes)
+        self._pesos_longitud = [longitudes[longitud] for longitud in self._longitudes]
+    
+    def muestras(self, cantidad: Optional[int] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Genera oraciones junto con el error que se les introdujo
+        
+        Args:
+            cantidad: Número de oraciones (None: sin límite)
+        
+        Yields:
+            Tuplas (oración, tipo de error o None si la oración es válida)
+        """
+        azar = random.Random(self.semilla)
+        generadas = (self._generar(azar) for _ in repeat(None))
+        return islice(generadas, cantidad)
+    
+    def oraciones(self, cantidad: Optional[int] = None) -> Iterator[str]:
+        """Genera solo el texto de las oraciones (ver muestras())"""
+        return (texto for texto, _ in self.muestras(cantidad))
+    
+    def _generar(self, azar: random.Random) -> Tuple[str, Optional[str]]:
+        """Genera una oración y le introduce, según las proporciones, un error"""
+        longitud = azar.choices(self._longitudes, self._pesos_longitud)[0]
+        palabras, verbo = self._oracion_valida(azar, longitud)
+        
+        sorteo = azar.random()
+        for umbral, tipo in self._umbrales:
+            if sorteo < umbral:
+                getattr(self, "_" + tipo)(azar, palabras, verbo)
+                return " ".join(palabras), tipo
+        return " ".join(palabras), None
+    
+    def _oracion_valida(self, azar: random.Random, longitud: int) -> Tuple[List[str], int]:
+        """
+        Genera una oración válida de la longitud pedida
+        
+        Returns:
+            Tupla (palabras, posición del verbo)
+        """
+        # Cada adjetivo va en el sujeto o el complemento, antes o después del sustantivo
+        adjetivos = longitud - 5
+        if adjetivos == 1:
+            en_sujeto = azar.random() < 0.5
+            sujeto = self._sintagma(azar, en_sujeto)
+            complemento = self._sintagma(azar, not en_sujeto)
+        else:
+            sujeto = self._sintagma(azar, adjetivos == 2)
+            complemento = self._sintagma(azar, adjetivos == 2)
+        
+        return sujeto + [azar.choice(self.verbos)] + complemento, len(sujeto)
+    
+    def _sintagma(self, azar: random.Random, con_adjetivo: bool) -> List[str]:
+        """<artículo> [<adjetivo>] <sustantivo> [<adjetivo>]"""
+        sintagma = [azar.choice(self.articulos), azar.choice(self.sustantivos)]
+        if con_adjetivo:
+            sintagma.insert(azar.choice((1, 2)), azar.choice(self.adjetivos))
+        return sintagma
+    
+    # Errores: cada uno modifica la oración válida (palabras, posición del verbo)
+    
+    def _falta_articulo(self, azar: random.Random, palabras: List[str], verbo: int):
+        """Quita el artículo del sujeto o del complemento"""
+        del palabras[azar.choice((0, verbo + 1))]
+    
+    def _adjetivo_extra(self, azar: random.Random, palabras: List[str], verbo: int):
+        """Agrega un adjetivo donde la gramática no lo admite"""
+        # Al inicio, tras el verbo o al final de un sintagma que ya tiene adjetivo
+        posiciones = [0, verbo + 1]
+        if verbo == 3:
+            posiciones.append(verbo)
+        if len(palabras) - verbo == 4:
+            posiciones.append(len(palabras))
+        palabras.insert(azar.choice(posiciones), azar.choice(self.adjetivos))
+    
+    def _palabra_desconocida(self, azar: random.Random, palabras: List[str], verbo: int):
+        """Reemplaza una palabra por otra fuera del vocabulario"""
+        palabras[azar.randrange(len(palabras))] = azar.choice(PALABRAS_DESCONOCIDAS)
+    
+    def _orden_incorrecto(self, azar: random.Random, palabras: List[str], verbo: int):
+        """Intercambia artículo y sustantivo de un sintagma, o adelanta el verbo"""
+        opcion = azar.randrange(3)
+        if opcion == 2:
+            palabras.insert(0, palabras.pop(verbo))
+            return
+        
+        inicio = 0 if opcion == 0 else verbo + 1
+        sustantivo = next(i for i in range(inicio + 1, inicio + 3)
+                          if palabras[i] in AnalizadorLexico.sustantivos)
+        palabras[inicio], palabras[sustantivo] = palabras[sustantivo], palabras[inicio]
+
+
+def _leer_proporciones(valores: List[str]) -> Dict[str, float]:
+    """Convierte argumentos 'tipo=proporción' en un diccionario"""
+    proporciones = {}
+    for valor in valores:
+        tipo, _, proporcion = valor.partition("=")
+        try:
+            proporciones[tipo] = float(proporcion)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Se esperaba tipo=proporción: '{valor}'")
+    return proporciones
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Escribe un corpus generado, una oración por línea"""
+    argumentos = argparse.ArgumentParser(
+        description="Genera un corpus sintético para pruebas de carga del mini-parser"
+    )
+    argumentos.add_argument("-n", "--cantidad", type=int, default=1000,
+                            help="número de oraciones (por defecto: 1000)")
+    argumentos.add_argument("--semilla", type=int, default=0,
+                            help="semilla del generador (por defecto: 0)")
+    argumentos.add_argument("--errores", nargs="*", metavar="TIPO=PROPORCION",
+                            help=f"proporción de cada error ({', '.join(TIPOS_ERROR)}); "
+                                 f"por defecto 0.05 de cada uno")
+    argumentos.add_argument("--longitudes", nargs="*", metavar="LONGITUD=PESO",
+                            help="peso de cada longitud válida (5, 6, 7)")
+    argumentos.add_argument("--etiquetas", action="store_true",
+                            help="agrega el tipo de error (o 'valida') separado por un tabulador")
+    argumentos.add_argument("-o", "--salida", default="-",
+                            help="archivo de salida ('-' o ausente: salida estándar)")
+    opciones = argumentos.parse_args(argv)
+    
+    try:
+        errores = _leer_proporciones(opciones.errores) if opciones.errores is not None else None
+        longitudes = None
+        if opciones.longitudes is not None:
+            longitudes = {int(longitud): peso
+                          for longitud, peso in _leer_proporciones(opciones.longitudes).items()}
+        generador = GeneradorCorpus(opciones.semilla, errores, longitudes)
+    except (ValueError, argparse.ArgumentTypeError) as error:
+        argumentos.error(str(error))
+    
+    salida = sys.stdout if opciones.salida == "-" else open(opciones.salida, "w", encoding="utf-8")
+    try:
+        if opciones.etiquetas:
+            for texto, error in generador.muestras(opciones.cantidad):
+                salida.write(f"{texto}\t{error or 'valida'}\n")
+        else:
+            for texto in generador.oraciones(opciones.cantidad):
+                salida.write(texto)
+                salida.write("\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,17 @@ Mini-Parser para Lenguaje Natural Limitado
 Implementación de parser descendente recursivo con gramática libre de contexto
 """
 
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from typing import (Dict, Hashable, Iterable, Iterator, List, Mapping, NamedTuple, Sequence,
+                    Tuple, Optional, Union)
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from enum import Enum
+from itertools import repeat
+from types import MappingProxyType
+import sys
+import threading
+import time
 
 
 class TipoToken(Enum):
@@ -16,6 +24,17 @@ class TipoToken(Enum):
     VERBO = "VERBO"
     FIN = "FIN"
     DESCONOCIDO = "DESCONOCIDO"
+    # Solo los usa la gramática extendida (ver GRAMATICA_EXTENDIDA)
+    CONJUNCION = "CONJUNCION"
+    PREPOSICION = "PREPOSICION"
+    
+    def __init__(self, valor: str):
+        # Código entero (orden de declaración) usado por las tablas de transición
+        self.codigo = len(type(self).__members__)
+
+
+# Tipos de token indexados por su código
+TIPOS_TOKEN: Tuple[TipoToken, ...] = tuple(TipoToken)
 
 
 @dataclass
@@ -26,30 +45,252 @@ class Token:
     posicion: int
 
 
+# Códigos de fase usados en los resultados columnares (ver ResultadoLote)
+FASE_OK = 0
+FASE_LEXICO = 1
+FASE_SINTACTICO = 2
+NOMBRES_FASE = ("", "léxico", "sintáctico")
+
+
+@dataclass
+class ResultadoLote:
+    """
+    Resultados de un análisis por lotes en forma columnar
+
+    Cada arreglo tiene un elemento por oración, en el orden de entrada:
+        validos: 1 si la oración es válida, 0 en caso contrario
+        fases: código de fase del error (FASE_OK, FASE_LEXICO, FASE_SINTACTICO)
+        posiciones: posición (índice de palabra) del primer error, -1 si es válida
+    """
+    validos: array = field(default_factory=lambda: array('B'))
+    fases: array = field(default_factory=lambda: array('B'))
+    posiciones: array = field(default_factory=lambda: array('i'))
+    
+    def __len__(self) -> int:
+        return len(self.validos)
+    
+    def limpiar(self):
+        """Vacía los arreglos conservando los objetos para reutilizarlos"""
+        del self.validos[:]
+        del self.fases[:]
+        del self.posiciones[:]
+    
+    def fase(self, indice: int) -> str:
+        """Nombre de la fase de error de la oración indicada ('' si es válida)"""
+        return NOMBRES_FASE[self.fases[indice]]
+
+
+class FlujoTokens:
+    """
+    Secuencia de tokens respaldada por arreglos compactos
+    
+    Alternativa a la lista de Token: guarda el código de tipo de cada palabra
+    en un array('B') y sus desplazamientos en el texto original. Igual que la
+    salida de tokenizar(), termina con un token FIN. Los desplazamientos se
+    calculan la primera vez que se consultan, y los objetos Token solo se
+    construyen al accederlos por índice o al iterar.
+    """
+    
+    __slots__ = ("texto", "tipos", "_inicios", "_finales")
+    
+    def __init__(self, texto: str, tipos: Sequence[int]):
+        self.texto = texto
+        self.tipos = tipos
+        self._inicios: Optional[Sequence[int]] = None
+        self._finales: Optional[Sequence[int]] = None
+    
+    def __len__(self) -> int:
+        return len(self.tipos)
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        return Token(TIPOS_TOKEN[self.tipos[indice]], self.valor(indice), indice)
+    
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __eq__(self, otro) -> bool:
+        # Se compara como secuencia de tokens, también contra una lista de Token
+        if isinstance(otro, (FlujoTokens, list)):
+            return list(self) == list(otro)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"FlujoTokens({self.texto!r})"
+    
+    @property
+    def inicios(self) -> Sequence[int]:
+        """Desplazamiento del inicio de cada token en el texto original"""
+        if self._inicios is None:
+            self._calcular_desplazamientos()
+        return self._inicios
+    
+    @property
+    def finales(self) -> Sequence[int]:
+        """Desplazamiento del final de cada token en el texto original"""
+        if self._finales is None:
+            self._calcular_desplazamientos()
+        return self._finales
+    
+    def _calcular_desplazamientos(self):
+        """Ubica cada palabra en el texto original (el token FIN queda al final)"""
+        texto = self.texto
+        inicios = array('I')
+        finales = array('I')
+        buscar = texto.find
+        final = 0
+        
+        for palabra in texto.split():
+            inicio = buscar(palabra, final)
+            final = inicio + len(palabra)
+            inicios.append(inicio)
+            finales.append(final)
+        
+        inicios.append(len(texto))
+        finales.append(len(texto))
+        self._inicios = inicios
+        self._finales = finales
+    
+    def congelar(self) -> "FlujoTokensCongelado":
+        """
+        Retorna una copia inmutable (ver FlujoTokensCongelado)
+        """
+        return FlujoTokensCongelado(self.texto, self.tipos, self.inicios, self.finales)
+    
+    def tipo(self, indice: int) -> TipoToken:
+        """Tipo del token indicado, sin construir el Token"""
+        return TIPOS_TOKEN[self.tipos[indice]]
+    
+    def valor(self, indice: int) -> str:
+        """Palabra (normalizada a minúsculas) del token indicado"""
+        return self.texto[self.inicios[indice]:self.finales[indice]].lower()
+
+
+class FlujoTokensCongelado(FlujoTokens):
+    """
+    FlujoTokens inmutable
+    
+    Los tipos se guardan como bytes y los desplazamientos como tuplas, ya
+    calculados, y no se pueden reasignar atributos. Como los Token se
+    construyen en cada acceso, nadie puede alterar el flujo.
+    """
+    
+    __slots__ = ()
+    
+    def __init__(self, texto: str, tipos: Sequence[int], inicios: Sequence[int],
+                 finales: Sequence[int]):
+        asignar = object.__setattr__
+        asignar(self, "texto", texto)
+        asignar(self, "tipos", bytes(tipos))
+        asignar(self, "_inicios", tuple(inicios))
+        asignar(self, "_finales", tuple(finales))
+    
+    def __setattr__(self, nombre: str, valor):
+        raise AttributeError(f"FlujoTokensCongelado es inmutable: no se puede asignar '{nombre}'")
+    
+    def __delattr__(self, nombre: str):
+        raise AttributeError(f"FlujoTokensCongelado es inmutable: no se puede borrar '{nombre}'")
+    
+    def __repr__(self) -> str:
+        return f"FlujoTokensCongelado({self.texto!r})"
+    
+    def congelar(self) -> "FlujoTokensCongelado":
+        return self
+
+
+# Secuencias de tokens aceptadas por los parsers
+SecuenciaTokens = Union[List[Token], FlujoTokens]
+
+
+def codigos_tipo(tokens: SecuenciaTokens) -> Sequence[int]:
+    """Retorna los códigos de tipo de una secuencia de tokens"""
+    if isinstance(tokens, FlujoTokens):
+        return tokens.tipos
+    return [token.tipo.codigo for token in tokens]
+
+
+# Vocabulario definido por la gramática
+ARTICULOS = frozenset({"el", "la", "un", "una", "los", "las"})
+SUSTANTIVOS = frozenset({
+    "perro", "perros", "gato", "gatos", "niño", "niña", "niños", "niñas",
+    "casa", "casas", "libro", "libros", "árbol", "árboles",
+    "computadora", "computadoras", "carro", "carros", "hueso", "huesos"
+})
+ADJETIVOS = frozenset({
+    "grande", "grandes", "pequeño", "pequeña", "pequeños", "pequeñas",
+    "rojo", "roja", "rojos", "rojas",
+    "azul", "azules", "hermoso", "hermosa", "hermosos", "hermosas",
+    "viejo", "vieja", "viejos", "viejas",
+    "nuevo", "nueva", "nuevos", "nuevas",
+    "rápido", "rápida", "rápidos", "rápidas"
+})
+VERBOS = frozenset({
+    "come", "comen", "lee", "leen", "ve", "ven", "quiere", "quieren",
+    "tiene", "tienen", "busca", "buscan", "escribe", "escriben",
+    "maneja", "manejan"
+})
+# Vocabulario de la gramática extendida (coordinación y sintagmas preposicionales)
+CONJUNCIONES = frozenset({"y", "o"})
+PREPOSICIONES = frozenset({"de", "con", "en", "sin", "para"})
+
+
+def _compilar_lexico(extendido: bool = False) -> Dict[str, TipoToken]:
+    """
+    Construye el mapa palabra -> tipo a partir del vocabulario
+    
+    Args:
+        extendido: Si es True, incluye las conjunciones y preposiciones de
+                   GRAMATICA_EXTENDIDA
+    """
+    categorias = [(VERBOS, TipoToken.VERBO),
+                  (ADJETIVOS, TipoToken.ADJETIVO),
+                  (SUSTANTIVOS, TipoToken.SUSTANTIVO),
+                  (ARTICULOS, TipoToken.ARTICULO)]
+    if extendido:
+        categorias[:0] = [(PREPOSICIONES, TipoToken.PREPOSICION),
+                          (CONJUNCIONES, TipoToken.CONJUNCION)]
+    lexico = {}
+    # Ante palabras repetidas gana la primera categoría (artículo, sustantivo,
+    # adjetivo, verbo, conjunción, preposición), igual que en la clasificación
+    # por conjuntos
+    for conjunto, tipo in categorias:
+        for palabra in conjunto:
+            lexico[sys.intern(palabra)] = tipo
+    return lexico
+
+
+# Léxicos compilados: el básico lo comparten los motores de GRAMATICA y el
+# extendido solo el de GRAMATICA_EXTENDIDA. Las rutas críticas consultan
+# directamente los diccionarios internos; LEXICO y LEXICO_EXTENDIDO son las
+# vistas públicas de solo lectura.
+_TIPOS_LEXICO: Dict[str, TipoToken] = _compilar_lexico()
+_CODIGOS_LEXICO: Dict[str, int] = {palabra: tipo.codigo
+                                   for palabra, tipo in _TIPOS_LEXICO.items()}
+LEXICO: Mapping[str, TipoToken] = MappingProxyType(_TIPOS_LEXICO)
+
+_TIPOS_LEXICO_EXTENDIDO: Dict[str, TipoToken] = _compilar_lexico(extendido=True)
+_CODIGOS_LEXICO_EXTENDIDO: Dict[str, int] = {palabra: tipo.codigo for palabra, tipo
+                                             in _TIPOS_LEXICO_EXTENDIDO.items()}
+LEXICO_EXTENDIDO: Mapping[str, TipoToken] = MappingProxyType(_TIPOS_LEXICO_EXTENDIDO)
+
+
 class AnalizadorLexico:
     """Analizador léxico - convierte texto en tokens"""
     
-    def __init__(self):
-        # Vocabulario definido por la gramática
-        self.articulos = {"el", "la", "un", "una", "los", "las"}
-        self.sustantivos = {
-            "perro", "perros", "gato", "gatos", "niño", "niña", "niños", "niñas",
-            "casa", "casas", "libro", "libros", "árbol", "árboles",
-            "computadora", "computadoras", "carro", "carros", "hueso", "huesos"
-        }
-        self.adjetivos = {
-            "grande", "grandes", "pequeño", "pequeña", "pequeños", "pequeñas",
-            "rojo", "roja", "rojos", "rojas",
-            "azul", "azules", "hermoso", "hermosa", "hermosos", "hermosas",
-            "viejo", "vieja", "viejos", "viejas",
-            "nuevo", "nueva", "nuevos", "nuevas",
-            "rápido", "rápida", "rápidos", "rápidas"
-        }
-        self.verbos = {
-            "come", "comen", "lee", "leen", "ve", "ven", "quiere", "quieren",
-            "tiene", "tienen", "busca", "buscan", "escribe", "escriben",
-            "maneja", "manejan"
-        }
+    # El vocabulario es compartido e inmutable: crear un analizador no cuesta nada
+    articulos = ARTICULOS
+    sustantivos = SUSTANTIVOS
+    adjetivos = ADJETIVOS
+    verbos = VERBOS
+    # Palabra -> tipo y palabra -> código de tipo
+    tipos = _TIPOS_LEXICO
+    codigos = _CODIGOS_LEXICO
     
     def tokenizar(self, texto: str) -> List[Token]:
         """
@@ -62,23 +303,270 @@ class AnalizadorLexico:
             Lista de tokens identificados
         """
         palabras = texto.lower().strip().split()
-        tokens = []
-        
-        for i, palabra in enumerate(palabras):
-            if palabra in self.articulos:
-                tokens.append(Token(TipoToken.ARTICULO, palabra, i))
-            elif palabra in self.sustantivos:
-                tokens.append(Token(TipoToken.SUSTANTIVO, palabra, i))
-            elif palabra in self.adjetivos:
-                tokens.append(Token(TipoToken.ADJETIVO, palabra, i))
-            elif palabra in self.verbos:
-                tokens.append(Token(TipoToken.VERBO, palabra, i))
-            else:
-                tokens.append(Token(TipoToken.DESCONOCIDO, palabra, i))
+        clasificar = self.tipos.get
+        desconocido = TipoToken.DESCONOCIDO
+        tokens = [Token(clasificar(palabra, desconocido), palabra, i)
+                  for i, palabra in enumerate(palabras)]
         
         # Token de fin
         tokens.append(Token(TipoToken.FIN, "", len(palabras)))
         return tokens
+    
+    def tokenizar_compacto(self, texto: str) -> FlujoTokens:
+        """
+        Convierte una cadena de texto en un FlujoTokens
+        
+        Args:
+            texto: Cadena a tokenizar
+            
+        Returns:
+            Flujo con los códigos de tipo de cada palabra, terminado en FIN
+        """
+        desconocido = TipoToken.DESCONOCIDO.codigo
+        tipos = array('B', map(self.codigos.get,
+                               texto.lower().split(), repeat(desconocido)))
+        
+        # Token de fin
+        tipos.append(TipoToken.FIN.codigo)
+        return FlujoTokens(texto, tipos)
+    
+    def tokenizar_y_verificar(self, texto: str) -> Tuple[FlujoTokens, List[Tuple[int, str]]]:
+        """
+        Tokeniza en forma compacta y ubica las palabras desconocidas en el mismo recorrido
+        
+        Args:
+            texto: Cadena a tokenizar
+            
+        Returns:
+            Tupla (flujo de tokens, lista de (posición, palabra) desconocidas)
+        """
+        tipos = array('B')
+        agregar = tipos.append
+        desconocidas = []
+        clasificar = self.codigos.get
+        desconocido = TipoToken.DESCONOCIDO.codigo
+        
+        for posicion, palabra in enumerate(texto.lower().split()):
+            codigo = clasificar(palabra, desconocido)
+            if codigo == desconocido:
+                desconocidas.append((posicion, palabra))
+            agregar(codigo)
+        
+        # Token de fin
+        agregar(TipoToken.FIN.codigo)
+        return FlujoTokens(texto, tipos), desconocidas
+
+
+class AnalizadorLexicoExtendido(AnalizadorLexico):
+    """Analizador léxico de GRAMATICA_EXTENDIDA: reconoce además conjunciones y preposiciones"""
+    
+    conjunciones = CONJUNCIONES
+    preposiciones = PREPOSICIONES
+    tipos = _TIPOS_LEXICO_EXTENDIDO
+    codigos = _CODIGOS_LEXICO_EXTENDIDO
+
+
+class CodigoError(Enum):
+    """Códigos estables de los errores de análisis"""
+    PALABRA_DESCONOCIDA = "palabra_desconocida"
+    TOKEN_INESPERADO = "token_inesperado"
+    TOKENS_ADICIONALES = "tokens_adicionales"
+
+
+class ErrorAnalisis(NamedTuple):
+    """
+    Error de análisis registrado como datos estructurados
+    
+    Registrarlo no cuesta más que crear la tupla: el mensaje en español solo
+    se redacta al leerlo (str(error) o error.mensaje). Es inmutable, por lo
+    que puede guardarse en cachés y compartirse.
+    """
+    codigo: CodigoError
+    posicion: int
+    esperado: Optional[TipoToken]
+    encontrado: TipoToken
+    valor: str
+    
+    @property
+    def mensaje(self) -> str:
+        """Mensaje legible del error"""
+        if self.codigo is CodigoError.PALABRA_DESCONOCIDA:
+            return f"Palabra desconocida: '{self.valor}'"
+        if self.codigo is CodigoError.TOKENS_ADICIONALES:
+            return (
+                f"Error: Tokens adicionales después del final de la oración: "
+                f"'{self.valor}'"
+            )
+        return (
+            f"Error en posición {self.posicion}: "
+            f"Se esperaba {self.esperado.value}, "
+            f"pero se encontró {self.encontrado.value} ('{self.valor}')"
+        )
+    
+    def __str__(self) -> str:
+        return self.mensaje
+
+
+@dataclass
+class NodoArbol:
+    """Representa un nodo en el árbol de parsing"""
+    simbolo: str
+    hijos: List['NodoArbol']
+    token: Optional[str] = None
+    nivel: int = 0
+
+
+# Símbolo de cada terminal en el árbol de derivación
+SIMBOLOS_TERMINALES = {
+    TipoToken.ARTICULO: "ARTÍCULO",
+    TipoToken.SUSTANTIVO: "SUSTANTIVO",
+    TipoToken.ADJETIVO: "ADJETIVO",
+    TipoToken.VERBO: "VERBO",
+    TipoToken.CONJUNCION: "CONJUNCIÓN",
+    TipoToken.PREPOSICION: "PREPOSICIÓN",
+}
+
+# Símbolos del árbol de derivación, indexados por identificador
+SIMBOLOS_ARBOL = (("ORACIÓN", "SUJETO", "PREDICADO", "COMPLEMENTO")
+                  + tuple(SIMBOLOS_TERMINALES.values()))
+_IDS_SIMBOLO = {simbolo: i for i, simbolo in enumerate(SIMBOLOS_ARBOL)}
+_TIPOS_SIMBOLO = {simbolo: tipo for tipo, simbolo in SIMBOLOS_TERMINALES.items()}
+
+
+class ArbolPlano:
+    """
+    Árbol de derivación en arreglos paralelos
+    
+    Alternativa compacta a NodoArbol: cada nodo es un índice y sus datos viven
+    en arreglos (símbolo, token, padre, nivel y siguiente hermano). Los nodos
+    se guardan en preorden, así que recorrer los índices en orden equivale a
+    recorrer el árbol en profundidad sin recursión. Las palabras no se copian:
+    los nodos terminales guardan el índice de su token en la secuencia fuente.
+    """
+    
+    __slots__ = ("fuente", "nombres", "simbolos", "tokens", "padres", "niveles",
+                 "siguientes", "_ultimos_hijos")
+    
+    SIN_NODO = -1
+    
+    def __init__(self, fuente: SecuenciaTokens = ()):
+        self.fuente = fuente
+        self.nombres: Sequence[str] = SIMBOLOS_ARBOL
+        self.simbolos = array('H')
+        self.tokens = array('i')
+        self.padres = array('i')
+        self.niveles = array('H')
+        self.siguientes = array('i')
+        self._ultimos_hijos = array('i')
+    
+    def __len__(self) -> int:
+        return len(self.simbolos)
+    
+    def agregar(self, simbolo: str, padre: int = SIN_NODO, token: int = SIN_NODO) -> int:
+        """
+        Agrega un nodo como último hijo de padre
+        
+        Para mantener el preorden, los hijos de un nodo deben agregarse después
+        de todo el subárbol de su hermano anterior.
+        
+        Args:
+            simbolo: Nombre del símbolo del nodo
+            padre: Índice del nodo padre (SIN_NODO para la raíz)
+            token: Índice del token en la fuente (SIN_NODO si no es terminal)
+        
+        Returns:
+            Índice del nodo nuevo
+        """
+        nodo = len(self.simbolos)
+        identificador = _IDS_SIMBOLO.get(simbolo) if self.nombres is SIMBOLOS_ARBOL else None
+        if identificador is None:
+            identificador = self._registrar_simbolo(simbolo)
+        
+        self.simbolos.append(identificador)
+        self.tokens.append(token)
+        self.padres.append(padre)
+        self.niveles.append(self.niveles[padre] + 1 if padre != self.SIN_NODO else 0)
+        self.siguientes.append(self.SIN_NODO)
+        self._ultimos_hijos.append(self.SIN_NODO)
+        
+        if padre != self.SIN_NODO:
+            anterior = self._ultimos_hijos[padre]
+            if anterior != self.SIN_NODO:
+                self.siguientes[anterior] = nodo
+            self._ultimos_hijos[padre] = nodo
+        return nodo
+    
+    def _registrar_simbolo(self, simbolo: str) -> int:
+        """Identificador de un símbolo fuera de SIMBOLOS_ARBOL"""
+        if self.nombres is SIMBOLOS_ARBOL:
+            self.nombres = list(SIMBOLOS_ARBOL)
+        if simbolo not in self.nombres:
+            self.nombres.append(simbolo)
+        return self.nombres.index(simbolo)
+    
+    def simbolo(self, nodo: int) -> str:
+        """Nombre del símbolo de un nodo"""
+        return self.nombres[self.simbolos[nodo]]
+    
+    def palabra(self, nodo: int) -> Optional[str]:
+        """Palabra de un nodo terminal (None si el nodo no tiene token)"""
+        indice = self.tokens[nodo]
+        if indice == self.SIN_NODO:
+            return None
+        if isinstance(self.fuente, FlujoTokens):
+            return self.fuente.valor(indice)
+        return self.fuente[indice].valor
+    
+    def hijos(self, nodo: int) -> Iterator[int]:
+        """Índices de los hijos de un nodo, en orden"""
+        # En preorden el primer hijo, si existe, es el nodo siguiente
+        hijo = nodo + 1
+        if hijo >= len(self.padres) or self.padres[hijo] != nodo:
+            return
+        while hijo != self.SIN_NODO:
+            yield hijo
+            hijo = self.siguientes[hijo]
+    
+    @classmethod
+    def desde_nodos(cls, raiz: NodoArbol) -> "ArbolPlano":
+        """Convierte un árbol de NodoArbol, conservando los niveles de sus nodos"""
+        arbol = cls([])
+        pendientes = [(raiz, cls.SIN_NODO)]
+        while pendientes:
+            nodo, padre = pendientes.pop()
+            token = cls.SIN_NODO
+            if nodo.token is not None:
+                token = len(arbol.fuente)
+                arbol.fuente.append(Token(_TIPOS_SIMBOLO.get(nodo.simbolo, TipoToken.DESCONOCIDO),
+                                          nodo.token, token))
+            indice = arbol.agregar(nodo.simbolo, padre, token)
+            arbol.niveles[indice] = nodo.nivel
+            pendientes.extend((hijo, indice) for hijo in reversed(nodo.hijos))
+        return arbol
+    
+    def a_nodos(self) -> Optional[NodoArbol]:
+        """Construye el árbol equivalente de NodoArbol (None si está vacío)"""
+        nodos = []
+        for i in range(len(self)):
+            nodo = NodoArbol(self.simbolo(i), [], self.palabra(i), self.niveles[i])
+            if self.padres[i] != self.SIN_NODO:
+                nodos[self.padres[i]].hijos.append(nodo)
+            nodos.append(nodo)
+        return nodos[0] if nodos else None
+
+
+# Error sintáctico sin palabras: (posición, tipo esperado). Un tipo esperado
+# None indica tokens adicionales después del final de la oración.
+Fallo = Tuple[int, Optional[TipoToken]]
+
+
+def error_sintactico(posicion: int, esperado: Optional[TipoToken], token: Token) -> ErrorAnalisis:
+    """Construye el error sintáctico correspondiente al token encontrado"""
+    if esperado is None:
+        return ErrorAnalisis(CodigoError.TOKENS_ADICIONALES, posicion, None,
+                             token.tipo, token.valor)
+    return ErrorAnalisis(CodigoError.TOKEN_INESPERADO, posicion, esperado,
+                         token.tipo, token.valor)
 
 
 class ParserDescendenteRecursivo:
@@ -90,12 +578,21 @@ class ParserDescendenteRecursivo:
         <sujeto> ::= <artículo> <sustantivo> | <artículo> <adjetivo> <sustantivo>
         <predicado> ::= <verbo> <complemento>
         <complemento> ::= <artículo> <sustantivo> | <artículo> <adjetivo> <sustantivo>
+    
+    Los atributos guardan el estado de un único análisis. parsear() crea una
+    instancia nueva para cada llamada y no modifica la instancia sobre la que
+    se invoca, por lo que un mismo parser puede usarse desde varios hilos.
     """
     
     def __init__(self):
-        self.tokens: List[Token] = []
+        self.tokens: SecuenciaTokens = []
+        self.codigos: Sequence[int] = []
         self.posicion = 0
-        self.errores: List[str] = []
+        self.errores: List[ErrorAnalisis] = []
+        self.fallos: List[Fallo] = []
+        # Árbol de derivación en construcción (None: no se construye)
+        self.arbol: Optional[ArbolPlano] = None
+        self.nodo_actual = ArbolPlano.SIN_NODO
     
     def token_actual(self) -> Token:
         """Retorna el token en la posición actual"""
@@ -103,9 +600,15 @@ class ParserDescendenteRecursivo:
             return self.tokens[self.posicion]
         return Token(TipoToken.FIN, "", self.posicion)
     
+    def tipo_actual(self) -> TipoToken:
+        """Retorna el tipo del token actual sin construir el token"""
+        if self.posicion < len(self.codigos):
+            return TIPOS_TOKEN[self.codigos[self.posicion]]
+        return TipoToken.FIN
+    
     def avanzar(self):
         """Avanza a la siguiente posición"""
-        if self.posicion < len(self.tokens) - 1:
+        if self.posicion < len(self.codigos) - 1:
             self.posicion += 1
     
     def coincidir(self, tipo_esperado: TipoToken) -> bool:
@@ -118,17 +621,34 @@ class ParserDescendenteRecursivo:
         Returns:
             True si coincide, False en caso contrario
         """
-        if self.token_actual().tipo == tipo_esperado:
+        if self.tipo_actual() == tipo_esperado:
+            if self.arbol is not None:
+                self.arbol.agregar(SIMBOLOS_TERMINALES[tipo_esperado],
+                                   self.nodo_actual, self.posicion)
             self.avanzar()
             return True
         
-        self.errores.append(
-            f"Error en posición {self.posicion}: "
-            f"Se esperaba {tipo_esperado.value}, "
-            f"pero se encontró {self.token_actual().tipo.value} ('{self.token_actual().valor}')"
-        )
+        self.fallos.append((self.posicion, tipo_esperado))
+        self.errores.append(error_sintactico(self.posicion, tipo_esperado, self.token_actual()))
         return False
     
+    def abrir_nodo(self, simbolo: str) -> int:
+        """
+        Si se está construyendo el árbol, agrega un nodo no terminal como hijo
+        del nodo actual y lo convierte en el nodo actual
+        
+        Returns:
+            El nodo actual anterior, para restaurarlo con cerrar_nodo()
+        """
+        padre = self.nodo_actual
+        if self.arbol is not None:
+            self.nodo_actual = self.arbol.agregar(simbolo, padre)
+        return padre
+    
+    def cerrar_nodo(self, padre: int):
+        """Vuelve al nodo que era el actual antes de abrir_nodo()"""
+        self.nodo_actual = padre
+    
     def parsear_oracion(self) -> bool:
         """
         <oración> ::= <sujeto> <predicado>
@@ -139,134 +659,1543 @@ class ParserDescendenteRecursivo:
         """
         <sujeto> ::= <artículo> <sustantivo> | <artículo> <adjetivo> <sustantivo> 
                     | <artículo> <sustantivo> <adjetivo>
-        
-        Permite adjetivos antes o después del sustantivo (como en español)
         """
-        if not self.coincidir(TipoToken.ARTICULO):
-            return False
-        
-        # Caso 1: artículo + adjetivo + sustantivo (el grande perro)
-        if self.token_actual().tipo == TipoToken.ADJETIVO:
-            if not self.coincidir(TipoToken.ADJETIVO):
-                return False
-            return self.coincidir(TipoToken.SUSTANTIVO)
-        
-        # Caso 2: artículo + sustantivo [+ adjetivo opcional] (el perro [grande])
-        if not self.coincidir(TipoToken.SUSTANTIVO):
-            return False
-        
-        # Adjetivo después del sustantivo es opcional
-        if self.token_actual().tipo == TipoToken.ADJETIVO:
-            self.coincidir(TipoToken.ADJETIVO)
-        
-        return True
+        return self.parsear_sintagma_nominal("SUJETO")
     
     def parsear_predicado(self) -> bool:
         """
         <predicado> ::= <verbo> <complemento>
         """
+        padre = self.abrir_nodo("PREDICADO")
         if not self.coincidir(TipoToken.VERBO):
             return False
         
-        return self.parsear_complemento()
+        exito = self.parsear_complemento()
+        self.cerrar_nodo(padre)
+        return exito
     
     def parsear_complemento(self) -> bool:
         """
         <complemento> ::= <artículo> <sustantivo> | <artículo> <adjetivo> <sustantivo>
                          | <artículo> <sustantivo> <adjetivo>
+        """
+        return self.parsear_sintagma_nominal("COMPLEMENTO")
+    
+    def parsear_sintagma_nominal(self, simbolo: str) -> bool:
+        """
+        <artículo> <sustantivo> | <artículo> <adjetivo> <sustantivo>
+        | <artículo> <sustantivo> <adjetivo>
         
-        Permite adjetivos antes o después del sustantivo (como en español)
+        Forma común del sujeto y del complemento; simbolo es el nodo del
+        árbol que los agrupa. Permite adjetivos antes o después del
+        sustantivo (como en español)
         """
+        padre = self.abrir_nodo(simbolo)
         if not self.coincidir(TipoToken.ARTICULO):
             return False
         
-        # Caso 1: artículo + adjetivo + sustantivo (un grande libro)
-        if self.token_actual().tipo == TipoToken.ADJETIVO:
+        # Caso 1: artículo + adjetivo + sustantivo (el grande perro)
+        if self.tipo_actual() == TipoToken.ADJETIVO:
             if not self.coincidir(TipoToken.ADJETIVO):
                 return False
-            return self.coincidir(TipoToken.SUSTANTIVO)
+            exito = self.coincidir(TipoToken.SUSTANTIVO)
+            self.cerrar_nodo(padre)
+            return exito
         
-        # Caso 2: artículo + sustantivo [+ adjetivo opcional] (un libro [rojo])
+        # Caso 2: artículo + sustantivo [+ adjetivo opcional] (el perro [grande])
         if not self.coincidir(TipoToken.SUSTANTIVO):
             return False
         
         # Adjetivo después del sustantivo es opcional
-        if self.token_actual().tipo == TipoToken.ADJETIVO:
+        if self.tipo_actual() == TipoToken.ADJETIVO:
             self.coincidir(TipoToken.ADJETIVO)
         
+        self.cerrar_nodo(padre)
         return True
     
-    def parsear(self, tokens: List[Token]) -> Tuple[bool, List[str]]:
+    def parsear(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis]]:
         """
         Método principal de parsing
         
         Args:
-            tokens: Lista de tokens a parsear
+            tokens: Lista de tokens (o FlujoTokens) a parsear
             
         Returns:
             Tupla (éxito, lista_de_errores)
         """
-        self.tokens = tokens
-        self.posicion = 0
-        self.errores = []
+        exito, contexto = self._parsear_en_contexto(tokens)
+        return exito, contexto.errores
+    
+    def parsear_con_arbol(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis],
+                                                                   Optional[ArbolPlano]]:
+        """
+        Parsea construyendo a la vez el árbol de derivación
+        
+        Cada regla agrega su nodo al reconocerse, por lo que el árbol refleja
+        exactamente la derivación que siguió el parser.
         
-        exito = self.parsear_oracion()
+        Returns:
+            Tupla (éxito, lista_de_errores, árbol o None si hay errores)
+        """
+        exito, contexto = self._parsear_en_contexto(tokens, construir_arbol=True)
+        return exito, contexto.errores, (contexto.arbol if exito else None)
+    
+    def _parsear_en_contexto(self, tokens: SecuenciaTokens,
+                             construir_arbol: bool = False) -> Tuple[bool, "ParserDescendenteRecursivo"]:
+        """
+        Ejecuta el análisis sobre una instancia nueva, que guarda su estado
+        
+        Returns:
+            Tupla (éxito, instancia con la posición final, errores, fallos
+            y, si se pidió, el árbol de derivación)
+        """
+        contexto = type(self)()
+        contexto.tokens = tokens
+        contexto.codigos = codigos_tipo(tokens)
+        if construir_arbol:
+            contexto.arbol = ArbolPlano(tokens)
+            contexto.nodo_actual = contexto.arbol.agregar("ORACIÓN")
+        
+        exito = contexto.parsear_oracion()
         
         # Verificar que hayamos llegado al final
-        if exito and self.token_actual().tipo != TipoToken.FIN:
-            self.errores.append(
-                f"Error: Tokens adicionales después del final de la oración: "
-                f"'{self.token_actual().valor}'"
+        if exito and contexto.tipo_actual() != TipoToken.FIN:
+            contexto.fallos.append((contexto.posicion, None))
+            contexto.errores.append(
+                error_sintactico(contexto.posicion, None, contexto.token_actual())
             )
             exito = False
         
-        return exito, self.errores
+        return exito, contexto
+    
+    def diagnosticar(self, codigos: Sequence[int]) -> Tuple[bool, Tuple[Fallo, ...]]:
+        """
+        Verifica una secuencia de códigos de tipo (terminada en FIN) sin palabras
+        
+        Returns:
+            Tupla (éxito, fallos) con los errores sin palabras asociadas
+        """
+        tokens = [Token(TIPOS_TOKEN[codigo], "", i) for i, codigo in enumerate(codigos)]
+        exito, contexto = self._parsear_en_contexto(tokens)
+        return exito, tuple(contexto.fallos)
 
 
-class MiniParser:
-    """Interfaz principal del mini-parser"""
+class ParserAFD:
+    """
+    Parser basado en un autómata finito determinista (AFD)
+    
+    La gramática de ParserDescendenteRecursivo es regular, por lo que se compila
+    en una tabla de transiciones indexada por estado y código de tipo de token.
+    Cada token cuesta una sola consulta a la tabla; el veredicto y los mensajes
+    de error son los mismos que los del parser descendente recursivo.
+    
+    Estados:
+        0: inicio                     5: tras el verbo
+        1: artículo (sujeto)          6: artículo (complemento)
+        2: artículo adjetivo          7: artículo adjetivo
+        3: artículo sustantivo        8: artículo sustantivo
+        4: sujeto completo            9: complemento completo
+    """
+    
+    ERROR = -1
+    ACEPTAR = -2
+    
+    # estado -> {tipo: estado siguiente}
+    TRANSICIONES = {
+        0: {TipoToken.ARTICULO: 1},
+        1: {TipoToken.ADJETIVO: 2, TipoToken.SUSTANTIVO: 3},
+        2: {TipoToken.SUSTANTIVO: 4},
+        3: {TipoToken.ADJETIVO: 4, TipoToken.VERBO: 5},
+        4: {TipoToken.VERBO: 5},
+        5: {TipoToken.ARTICULO: 6},
+        6: {TipoToken.ADJETIVO: 7, TipoToken.SUSTANTIVO: 8},
+        7: {TipoToken.SUSTANTIVO: 9},
+        8: {TipoToken.ADJETIVO: 9, TipoToken.FIN: ACEPTAR},
+        9: {TipoToken.FIN: ACEPTAR},
+    }
+    
+    # Tipo que reporta el error en cada estado (None: tokens adicionales)
+    ESPERADO = (
+        TipoToken.ARTICULO, TipoToken.SUSTANTIVO, TipoToken.SUSTANTIVO,
+        TipoToken.VERBO, TipoToken.VERBO, TipoToken.ARTICULO,
+        TipoToken.SUSTANTIVO, TipoToken.SUSTANTIVO, None, None,
+    )
+    
+    # Tabla compilada, compartida por todas las instancias (se asigna tras la clase)
+    TABLA: array
     
     def __init__(self):
-        self.lexico = AnalizadorLexico()
-        self.parser = ParserDescendenteRecursivo()
+        # La tabla no se modifica después de compilarla: el parser no guarda
+        # estado entre llamadas y puede compartirse entre hilos
+        self.tabla = self.TABLA
     
-    def analizar(self, texto: str) -> dict:
+    @classmethod
+    def _compilar_tabla(cls) -> array:
         """
-        Analiza una cadena de texto completa
+        Compila las transiciones en una tabla plana
+        
+        Los estados se guardan como desplazamiento de su fila en la tabla,
+        de modo que la transición es tabla[fila + codigo].
+        """
+        num_tipos = len(TIPOS_TOKEN)
+        tabla = array('i', [cls.ERROR] * (len(cls.TRANSICIONES) * num_tipos))
+        
+        for estado, transiciones in cls.TRANSICIONES.items():
+            for tipo, siguiente in transiciones.items():
+                if siguiente != cls.ACEPTAR:
+                    siguiente *= num_tipos
+                tabla[estado * num_tipos + tipo.codigo] = siguiente
+        return tabla
+    
+    def ejecutar(self, codigos: Iterable[int]) -> Tuple[int, int]:
+        """
+        Ejecuta el autómata sobre una secuencia de códigos de tipo
+        
+        Si la secuencia termina sin el código de FIN, se asume al final.
+        
+        Returns:
+            Tupla (estado, posición): estado ACEPTAR si la oración es válida;
+            en otro caso, el estado y la posición del token que la invalida
+        """
+        tabla = self.tabla
+        fila = 0
+        posicion = 0
+        
+        for codigo in codigos:
+            siguiente = tabla[fila + codigo]
+            if siguiente < 0:
+                break
+            fila = siguiente
+            posicion += 1
+        else:
+            siguiente = tabla[fila + TipoToken.FIN.codigo]
+        
+        if siguiente == self.ACEPTAR:
+            return self.ACEPTAR, posicion
+        return fila // len(TIPOS_TOKEN), posicion
+    
+    def diagnosticar(self, codigos: Sequence[int]) -> Tuple[bool, Tuple[Fallo, ...]]:
+        """
+        Verifica una secuencia de códigos de tipo sin redactar mensajes de error
+        
+        Returns:
+            Tupla (éxito, fallos) con los errores sin palabras asociadas
+        """
+        estado, posicion = self.ejecutar(codigos)
+        if estado == self.ACEPTAR:
+            return True, ()
+        return False, ((posicion, self.ESPERADO[estado]),)
+    
+    def parsear(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis]]:
+        """
+        Método principal de parsing (misma interfaz que ParserDescendenteRecursivo)
         
         Args:
-            texto: Texto a analizar
+            tokens: Lista de tokens (o FlujoTokens) a parsear
             
         Returns:
-            Diccionario con resultados del análisis
+            Tupla (éxito, lista_de_errores)
         """
-        # Análisis léxico
-        tokens = self.lexico.tokenizar(texto)
+        estado, posicion = self.ejecutar(codigos_tipo(tokens))
         
-        # Verificar tokens desconocidos
-        tokens_desconocidos = [t for t in tokens if t.tipo == TipoToken.DESCONOCIDO]
+        if estado == self.ACEPTAR:
+            return True, []
         
-        if tokens_desconocidos:
-            return {
-                "valido": False,
-                "fase": "léxico",
-                "texto": texto,
-                "tokens": tokens,
-                "errores": [f"Palabra desconocida: '{t.valor}'" for t in tokens_desconocidos]
-            }
+        if posicion < len(tokens):
+            token = tokens[posicion]
+        else:
+            token = Token(TipoToken.FIN, "", posicion)
         
-        # Análisis sintáctico
-        exito, errores = self.parser.parsear(tokens)
+        return False, [error_sintactico(posicion, self.ESPERADO[estado], token)]
+
+
+ParserAFD.TABLA = ParserAFD._compilar_tabla()
+
+
+# Gramática del mini-parser en BNF, factorizada por la izquierda para LL(1).
+# Los no terminales van entre <>; los de nombre en mayúsculas son nodos del
+# árbol de derivación y los de minúsculas son auxiliares (sus hijos cuelgan
+# del nodo padre). Los terminales son nombres de TipoToken y ε es la cadena
+# vacía. El primer no terminal es el inicial.
+GRAMATICA = """
+<ORACIÓN>     ::= <SUJETO> <PREDICADO>
+<SUJETO>      ::= ARTICULO <nominal>
+<PREDICADO>   ::= VERBO <COMPLEMENTO>
+<COMPLEMENTO> ::= ARTICULO <nominal>
+<nominal>     ::= ADJETIVO SUSTANTIVO | SUSTANTIVO <adjetivo>
+<adjetivo>    ::= ADJETIVO | ε
+"""
+
+
+class Gramatica:
+    """
+    Gramática libre de contexto escrita en BNF
+    
+    Al crearla se leen las reglas y se calculan los no terminales anulables
+    y los conjuntos FIRST y FOLLOW. Una regla puede continuar en las líneas
+    siguientes que empiezan con "|".
+    
+    Para los parsers los símbolos se codifican como enteros: cada terminal
+    es el código de su TipoToken y el no terminal i es len(TIPOS_TOKEN) + i.
+    """
+    
+    EPSILON = "ε"
+    
+    def __init__(self, bnf: str = GRAMATICA):
+        """
+        Args:
+            bnf: Reglas "<A> ::= alternativa | alternativa"
         
-        return {
-            "valido": exito,
-            "fase": "sintáctico" if not tokens_desconocidos else "léxico",
-            "texto": texto,
-            "tokens": tokens,
-            "errores": errores
-        }
+        Raises:
+            ValueError: Si la gramática está mal escrita
+        """
+        self.producciones: List[Tuple[str, Tuple[str, ...]]] = []
+        self.no_terminales: List[str] = []
+        self._leer(bnf)
+        self.inicial = self.no_terminales[0]
+        
+        self.anulables = self._calcular_anulables()
+        self.primeros = self._calcular_primeros()
+        self.siguientes = self._calcular_siguientes()
+        self._codificar()
+    
+    def _leer(self, bnf: str):
+        """Lee las reglas en BNF"""
+        cabeza = None
+        for numero, linea in enumerate(bnf.splitlines(), 1):
+            if not linea.strip():
+                continue
+            if linea.strip().startswith("|") and cabeza is not None:
+                derecha = linea.strip()[1:]
+            else:
+                izquierda, separador, derecha = linea.partition("::=")
+                izquierda = izquierda.strip()
+                if not separador or not (izquierda.startswith("<") and izquierda.endswith(">")):
+                    raise ValueError(f"Regla mal escrita en la línea {numero}: '{linea.strip()}'")
+                cabeza = izquierda[1:-1]
+                if cabeza not in self.no_terminales:
+                    self.no_terminales.append(cabeza)
+            
+            for alternativa in derecha.split("|"):
+                simbolos = tuple(alternativa.split())
+                if simbolos == (self.EPSILON,):
+                    simbolos = ()
+                self.producciones.append((cabeza, simbolos))
+        
+        if not self.producciones:
+            raise ValueError("La gramática no tiene reglas")
+        for _, cuerpo in self.producciones:
+            for simbolo in cuerpo:
+                if self.es_no_terminal(simbolo):
+                    if simbolo[1:-1] not in self.no_terminales:
+                        raise ValueError(f"No terminal sin reglas: {simbolo}")
+                elif simbolo not in TipoToken.__members__ or simbolo == TipoToken.FIN.name:
+                    raise ValueError(f"Terminal desconocido: '{simbolo}'")
+    
+    @staticmethod
+    def es_no_terminal(simbolo: str) -> bool:
+        """Indica si un símbolo de una regla es un no terminal (<nombre>)"""
+        return simbolo.startswith("<") and simbolo.endswith(">")
+    
+    def _calcular_anulables(self) -> frozenset:
+        """No terminales que derivan la cadena vacía"""
+        anulables = set()
+        cambio = True
+        while cambio:
+            cambio = False
+            for cabeza, cuerpo in self.producciones:
+                if cabeza not in anulables and all(s[1:-1] in anulables for s in cuerpo):
+                    anulables.add(cabeza)
+                    cambio = True
+        return frozenset(anulables)
+    
+    def primeros_de(self, cuerpo: Sequence[str]) -> Dict[str, None]:
+        """
+        FIRST de una secuencia de símbolos (sin ε), en un diccionario que
+        conserva el orden en que aparecen los terminales
+        """
+        primeros: Dict[str, None] = {}
+        for simbolo in cuerpo:
+            if not self.es_no_terminal(simbolo):
+                primeros[simbolo] = None
+                return primeros
+            primeros.update(self.primeros[simbolo[1:-1]])
+            if simbolo[1:-1] not in self.anulables:
+                return primeros
+        return primeros
+    
+    def anulable(self, cuerpo: Sequence[str]) -> bool:
+        """Indica si una secuencia de símbolos deriva la cadena vacía"""
+        return all(self.es_no_terminal(s) and s[1:-1] in self.anulables for s in cuerpo)
+    
+    def _calcular_primeros(self) -> Dict[str, Dict[str, None]]:
+        """FIRST de cada no terminal (punto fijo)"""
+        self.primeros = {cabeza: {} for cabeza in self.no_terminales}
+        cambio = True
+        while cambio:
+            cambio = False
+            for cabeza, cuerpo in self.producciones:
+                nuevos = self.primeros_de(cuerpo).keys() - self.primeros[cabeza].keys()
+                if nuevos:
+                    self.primeros[cabeza].update(dict.fromkeys(sorted(nuevos)))
+                    cambio = True
+        return self.primeros
+    
+    def _calcular_siguientes(self) -> Dict[str, Dict[str, None]]:
+        """FOLLOW de cada no terminal (punto fijo); FIN sigue al inicial"""
+        siguientes: Dict[str, Dict[str, None]] = {cabeza: {} for cabeza in self.no_terminales}
+        siguientes[self.inicial][TipoToken.FIN.name] = None
+        cambio = True
+        while cambio:
+            cambio = False
+            for cabeza, cuerpo in self.producciones:
+                for i, simbolo in enumerate(cuerpo):
+                    if not self.es_no_terminal(simbolo):
+                        continue
+                    resto = cuerpo[i + 1:]
+                    nuevos = dict(self.primeros_de(resto))
+                    if self.anulable(resto):
+                        nuevos.update(siguientes[cabeza])
+                    destino = siguientes[simbolo[1:-1]]
+                    if nuevos.keys() - destino.keys():
+                        destino.update(nuevos)
+                        cambio = True
+        return siguientes
+    
+    def _codificar(self):
+        """
+        Codifica los símbolos con enteros: el no terminal inicial, la cabeza
+        y el cuerpo de cada producción, y el nombre del nodo del árbol de
+        cada no terminal (None para los auxiliares, en minúsculas)
+        """
+        num_tipos = len(TIPOS_TOKEN)
+        self.codigos: Dict[str, int] = {f"<{nombre}>": num_tipos + i
+                                        for i, nombre in enumerate(self.no_terminales)}
+        self.codigos.update((tipo.name, tipo.codigo) for tipo in TIPOS_TOKEN)
+        
+        self.simbolo_inicial = self.codigos[f"<{self.inicial}>"]
+        self.cabezas = tuple(self.codigos[f"<{cabeza}>"] for cabeza, _ in self.producciones)
+        self.cuerpos_codificados = tuple(tuple(self.codigos[simbolo] for simbolo in cuerpo)
+                                         for _, cuerpo in self.producciones)
+        self.nodos: List[Optional[str]] = [nombre if nombre.isupper() else None
+                                           for nombre in self.no_terminales]
+    
+    def __str__(self) -> str:
+        """Reglas en BNF, una línea por no terminal"""
+        ancho = max(len(nombre) for nombre in self.no_terminales) + 2
+        lineas = []
+        for nombre in self.no_terminales:
+            alternativas = [" ".join(cuerpo) or self.EPSILON
+                            for cabeza, cuerpo in self.producciones if cabeza == nombre]
+            lineas.append(f"{'<' + nombre + '>':<{ancho}} ::= {' | '.join(alternativas)}")
+        return "\n".join(lineas)
+
+
+class GramaticaLL1(Gramatica):
+    """
+    Gramática compilada en una tabla predictiva LL(1)
+    
+    Además de los conjuntos de Gramatica, arma la tabla (no terminal,
+    terminal) -> producción. Una gramática que no es LL(1) (dos producciones
+    para la misma celda) se rechaza con ValueError.
+    
+    La tabla plana se indexa con (símbolo - len(TIPOS_TOKEN)) *
+    len(TIPOS_TOKEN) + código, igual que la de ParserAFD.
+    """
+    
+    SIN_PRODUCCION = -1
+    
+    def __init__(self, bnf: str = GRAMATICA):
+        """
+        Args:
+            bnf: Reglas "<A> ::= alternativa | alternativa"
+        
+        Raises:
+            ValueError: Si la gramática está mal escrita o no es LL(1)
+        """
+        super().__init__(bnf)
+        self.tabla = self._construir_tabla()
+        self._compilar()
+    
+    def _construir_tabla(self) -> Dict[Tuple[str, str], int]:
+        """
+        Tabla predictiva: (no terminal, terminal) -> índice de producción
+        
+        Raises:
+            ValueError: Si alguna celda recibe dos producciones (no es LL(1))
+        """
+        tabla: Dict[Tuple[str, str], int] = {}
+        for indice, (cabeza, cuerpo) in enumerate(self.producciones):
+            terminales = list(self.primeros_de(cuerpo))
+            if self.anulable(cuerpo):
+                terminales.extend(self.siguientes[cabeza])
+            for terminal in terminales:
+                anterior = tabla.setdefault((cabeza, terminal), indice)
+                if anterior != indice:
+                    raise ValueError(
+                        f"La gramática no es LL(1): <{cabeza}> tiene dos producciones "
+                        f"para {terminal}"
+                    )
+        return tabla
+    
+    def _compilar(self):
+        """
+        Codifica la tabla para ParserLL1
+        
+        Además de la tabla se precalculan, por no terminal, la producción que
+        se aplica si el token no está en la tabla (la anulable: el error se
+        detecta después, como en el parser descendente recursivo) y el tipo
+        que se reporta como esperado si no hay ninguna (el primer terminal de
+        su última alternativa, la que el descendente intenta por defecto).
+        """
+        num_tipos = len(TIPOS_TOKEN)
+        self.tabla_plana = array('i', [self.SIN_PRODUCCION] * (len(self.no_terminales) * num_tipos))
+        for (cabeza, terminal), indice in self.tabla.items():
+            fila = self.codigos[f"<{cabeza}>"] - num_tipos
+            self.tabla_plana[fila * num_tipos + self.codigos[terminal]] = indice
+        
+        # Cuerpos invertidos, listos para apilarlos
+        self.cuerpos = tuple(cuerpo[::-1] for cuerpo in self.cuerpos_codificados)
+        
+        self.por_defecto = array('i', [self.SIN_PRODUCCION] * len(self.no_terminales))
+        self.esperados: List[Optional[TipoToken]] = []
+        for fila, nombre in enumerate(self.no_terminales):
+            alternativas = [(indice, cuerpo) for indice, (cabeza, cuerpo)
+                            in enumerate(self.producciones) if cabeza == nombre]
+            for indice, cuerpo in alternativas:
+                if self.anulable(cuerpo):
+                    self.por_defecto[fila] = indice
+            primeros = self.primeros_de(alternativas[-1][1])
+            self.esperados.append(TipoToken[next(iter(primeros))] if primeros else None)
+
+
+class _AlConsultar:
+    """
+    Atributo de clase que se calcula la primera vez que se consulta
+    
+    Las gramáticas por defecto se compilan así al crear el primer parser que
+    las usa y no al importar el módulo. Después, el valor reemplaza al
+    descriptor en la clase y consultarlo no cuesta más que un atributo común.
+    """
+    
+    def __init__(self, calcular):
+        self.calcular = calcular
+    
+    def __set_name__(self, clase, nombre: str):
+        self.nombre = nombre
+    
+    def __get__(self, instancia, clase):
+        valor = self.calcular()
+        setattr(clase, self.nombre, valor)
+        return valor
+
+
+class ParserLL1:
+    """
+    Parser predictivo LL(1) dirigido por tabla
+    
+    En lugar de un método por no terminal, recorre los tokens una vez con una
+    pila de símbolos y la tabla de una GramaticaLL1 (por defecto, la de
+    GRAMATICA): cada no terminal cuesta una consulta a la tabla y cada
+    terminal una comparación. Con la gramática por defecto reconoce el mismo
+    lenguaje que ParserDescendenteRecursivo, con los mismos errores, y
+    también construye el árbol de derivación.
+    
+    La gramática compilada no se modifica, así que el parser no guarda
+    estado entre llamadas y puede compartirse entre hilos.
+    """
+    
+    # Gramática compilada por defecto (se compila al consultarla)
+    GRAMATICA = _AlConsultar(GramaticaLL1)
+    
+    def __init__(self, gramatica: Optional[GramaticaLL1] = None):
+        """
+        Args:
+            gramatica: Gramática a reconocer (por defecto, GRAMATICA)
+        """
+        self.gramatica = gramatica if gramatica is not None else self.GRAMATICA
+    
+    def ejecutar(self, codigos: Sequence[int]) -> Optional[Fallo]:
+        """
+        Reconoce una secuencia de códigos de tipo
+        
+        Si la secuencia termina sin el código de FIN, se asume al final.
+        
+        Returns:
+            None si la secuencia es válida; si no, el fallo (posición, tipo
+            esperado) del primer token que la invalida
+        """
+        gramatica = self.gramatica
+        tabla = gramatica.tabla_plana
+        cuerpos = gramatica.cuerpos
+        por_defecto = gramatica.por_defecto
+        num_tipos = len(TIPOS_TOKEN)
+        fin = TipoToken.FIN.codigo
+        longitud = len(codigos)
+        
+        pila = [fin, gramatica.simbolo_inicial]
+        posicion = 0
+        codigo = codigos[0] if longitud else fin
+        while pila:
+            simbolo = pila.pop()
+            if simbolo < num_tipos:
+                if simbolo != codigo:
+                    return posicion, (TIPOS_TOKEN[simbolo] if simbolo != fin else None)
+                posicion += 1
+                codigo = codigos[posicion] if posicion < longitud else fin
+                continue
+            
+            fila = simbolo - num_tipos
+            produccion = tabla[fila * num_tipos + codigo]
+            if produccion < 0:
+                produccion = por_defecto[fila]
+                if produccion < 0:
+                    return posicion, gramatica.esperados[fila]
+            pila.extend(cuerpos[produccion])
+        return None
+    
+    def derivar(self, codigos: Sequence[int], arbol: ArbolPlano) -> Optional[Fallo]:
+        """
+        Como ejecutar(), agregando al árbol los nodos de la derivación
+        
+        Los no terminales se expanden en preorden, así que los nodos se
+        agregan en el orden que requiere ArbolPlano.
+        """
+        gramatica = self.gramatica
+        tabla = gramatica.tabla_plana
+        cuerpos = gramatica.cuerpos
+        por_defecto = gramatica.por_defecto
+        nodos = gramatica.nodos
+        num_tipos = len(TIPOS_TOKEN)
+        fin = TipoToken.FIN.codigo
+        longitud = len(codigos)
+        
+        # Pila de (símbolo, nodo padre en el árbol)
+        pila = [(fin, ArbolPlano.SIN_NODO), (gramatica.simbolo_inicial, ArbolPlano.SIN_NODO)]
+        posicion = 0
+        codigo = codigos[0] if longitud else fin
+        while pila:
+            simbolo, padre = pila.pop()
+            if simbolo < num_tipos:
+                if simbolo != codigo:
+                    return posicion, (TIPOS_TOKEN[simbolo] if simbolo != fin else None)
+                if simbolo != fin:
+                    arbol.agregar(SIMBOLOS_TERMINALES[TIPOS_TOKEN[simbolo]], padre, posicion)
+                posicion += 1
+                codigo = codigos[posicion] if posicion < longitud else fin
+                continue
+            
+            fila = simbolo - num_tipos
+            produccion = tabla[fila * num_tipos + codigo]
+            if produccion < 0:
+                produccion = por_defecto[fila]
+                if produccion < 0:
+                    return posicion, gramatica.esperados[fila]
+            if nodos[fila] is not None:
+                padre = arbol.agregar(nodos[fila], padre)
+            pila.extend(zip(cuerpos[produccion], repeat(padre)))
+        return None
+    
+    def diagnosticar(self, codigos: Sequence[int]) -> Tuple[bool, Tuple[Fallo, ...]]:
+        """
+        Verifica una secuencia de códigos de tipo sin redactar mensajes de error
+        
+        Returns:
+            Tupla (éxito, fallos) con los errores sin palabras asociadas
+        """
+        fallo = self.ejecutar(codigos)
+        return (True, ()) if fallo is None else (False, (fallo,))
+    
+    def parsear(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis]]:
+        """
+        Método principal de parsing (misma interfaz que ParserDescendenteRecursivo)
+        
+        Args:
+            tokens: Lista de tokens (o FlujoTokens) a parsear
+            
+        Returns:
+            Tupla (éxito, lista_de_errores)
+        """
+        fallo = self.ejecutar(codigos_tipo(tokens))
+        if fallo is None:
+            return True, []
+        return False, [self._error(tokens, fallo)]
+    
+    def parsear_con_arbol(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis],
+                                                                   Optional[ArbolPlano]]:
+        """
+        Parsea construyendo a la vez el árbol de derivación
+        
+        Returns:
+            Tupla (éxito, lista_de_errores, árbol o None si hay errores)
+        """
+        arbol = ArbolPlano(tokens)
+        fallo = self.derivar(codigos_tipo(tokens), arbol)
+        if fallo is None:
+            return True, [], arbol
+        return False, [self._error(tokens, fallo)], None
+    
+    @staticmethod
+    def _error(tokens: SecuenciaTokens, fallo: Fallo) -> ErrorAnalisis:
+        """Error sintáctico de un fallo, con el token encontrado"""
+        posicion, esperado = fallo
+        token = tokens[posicion] if posicion < len(tokens) else Token(TipoToken.FIN, "", posicion)
+        return error_sintactico(posicion, esperado, token)
+
+
+# Gramática extendida, ambigua: varios adjetivos por sintagma, coordinación
+# con "y"/"o" de sintagmas nominales y de predicados, y sintagmas
+# preposicionales que pueden modificar a cualquier sintagma nominal anterior.
+# No es LL(1) (tiene recursión por la izquierda); la reconoce ParserEarley.
+GRAMATICA_EXTENDIDA = """
+<ORACIÓN>       ::= <SUJETO> <PREDICADO>
+<SUJETO>        ::= <nominal>
+<PREDICADO>     ::= VERBO <COMPLEMENTO> | <PREDICADO> CONJUNCION <PREDICADO>
+<COMPLEMENTO>   ::= <nominal>
+<nominal>       ::= ARTICULO <adjetivos> SUSTANTIVO <adjetivos>
+                  | <nominal> CONJUNCION <nominal>
+                  | <nominal> <PREPOSICIONAL>
+<PREPOSICIONAL> ::= PREPOSICION <nominal>
+<adjetivos>     ::= ADJETIVO <adjetivos> | ε
+"""
+
+
+class NodoBosque:
+    """
+    Nodo de un bosque de derivación compartido y empaquetado (SPPF)
+    
+    Cada nodo cubre los tokens [inicio, fin) y su etiqueta es un símbolo
+    (código de terminal o no terminal) o, en los nodos intermedios, un ítem
+    (producción, punto) con el prefijo reconocido de una producción. Cada
+    familia es una forma de derivar el nodo: () para ε, (hijo,) o
+    (izquierdo, derecho), donde izquierdo es el nodo del prefijo. Un nodo
+    con varias familias es ambiguo; los subárboles iguales se comparten.
+    """
+    
+    __slots__ = ("etiqueta", "inicio", "fin", "familias")
+    
+    def __init__(self, etiqueta: Union[int, Tuple[int, int]], inicio: int, fin: int):
+        self.etiqueta = etiqueta
+        self.inicio = inicio
+        self.fin = fin
+        self.familias: List[Tuple["NodoBosque", ...]] = []
+    
+    def agregar_familia(self, familia: Tuple["NodoBosque", ...]):
+        """Agrega una forma de derivar el nodo, si no la tenía"""
+        if familia not in self.familias:
+            self.familias.append(familia)
+    
+    def __repr__(self) -> str:
+        return f"NodoBosque({self.etiqueta!r}, {self.inicio}, {self.fin})"
+
+
+class ParserEarley:
+    """
+    Parser de Earley para gramáticas libres de contexto generales
+    
+    Reconoce cualquier Gramatica (ambigua, con recursión por la izquierda o
+    con producciones ε) en tiempo O(n³) en el peor caso, O(n²) si no es
+    ambigua, y construye a la vez un bosque de derivación compartido y
+    empaquetado (SPPF) con todas las derivaciones, según el algoritmo de
+    Scott (2008): cada ítem lleva el nodo del bosque de lo ya reconocido, y
+    los nodos se reutilizan por etiqueta y extensión, así que el bosque ocupa
+    espacio polinómico aunque el número de árboles sea exponencial.
+    
+    Por defecto usa GRAMATICA_EXTENDIDA. Si la oración no es válida, reporta
+    un único error: en la primera posición donde ningún ítem puede avanzar,
+    tokens adicionales si la oración ya estaba completa y, si no, un
+    terminal esperado elegido con el mismo criterio que ParserLL1.
+    
+    La gramática no se modifica y el estado de cada análisis es local, así
+    que el parser puede compartirse entre hilos.
+    """
+    
+    # Gramática por defecto (se compila al consultarla)
+    GRAMATICA = _AlConsultar(lambda: Gramatica(GRAMATICA_EXTENDIDA))
+    
+    def __init__(self, gramatica: Optional[Gramatica] = None):
+        """
+        Args:
+            gramatica: Gramática a reconocer (por defecto, GRAMATICA_EXTENDIDA)
+        """
+        self.gramatica = gramatica if gramatica is not None else self.GRAMATICA
+        # Producciones de cada no terminal, indexadas por código
+        num_tipos = len(TIPOS_TOKEN)
+        self.alternativas: List[List[int]] = [[] for _ in self.gramatica.no_terminales]
+        for indice, cabeza in enumerate(self.gramatica.cabezas):
+            self.alternativas[cabeza - num_tipos].append(indice)
+        self.anulables = frozenset(self.gramatica.codigos[f"<{nombre}>"]
+                                   for nombre in self.gramatica.anulables)
+    
+    def reconocer(self, codigos: Sequence[int]) -> Tuple[Optional[NodoBosque], Optional[Fallo]]:
+        """
+        Analiza una secuencia de códigos de tipo
+        
+        Si la secuencia termina sin el código de FIN, se asume al final.
+        
+        Returns:
+            Tupla (raíz del bosque, None) si la secuencia es válida; si no,
+            (None, fallo) con la posición y el tipo esperado del error
+        """
+        gramatica = self.gramatica
+        cabezas = gramatica.cabezas
+        cuerpos = gramatica.cuerpos_codificados
+        alternativas = self.alternativas
+        num_tipos = len(TIPOS_TOKEN)
+        fin = TipoToken.FIN.codigo
+        inicial = gramatica.simbolo_inicial
+        n = len(codigos) - 1 if codigos and codigos[-1] == fin else len(codigos)
+        
+        # Ítem: (producción, punto, origen, nodo del bosque o None). Además de
+        # cada conjunto, se indexan sus ítems por el no terminal que esperan
+        conjuntos: List[List[tuple]] = [[] for _ in range(n + 1)]
+        esperando: List[Dict[int, List[tuple]]] = [{} for _ in range(n + 1)]
+        vistos: List[set] = [set() for _ in range(n + 1)]
+        
+        def agregar(i: int, item: tuple, pendientes: list):
+            if item not in vistos[i]:
+                vistos[i].add(item)
+                conjuntos[i].append(item)
+                pendientes.append(item)
+                cuerpo = cuerpos[item[0]]
+                if item[1] < len(cuerpo):
+                    esperando[i].setdefault(cuerpo[item[1]], []).append(item)
+        
+        def crear_nodo(produccion: int, punto: int, origen: int, fin_nodo: int,
+                       izquierdo: Optional[NodoBosque], derecho: NodoBosque,
+                       nodos: Dict[tuple, NodoBosque]) -> NodoBosque:
+            # Un prefijo de un solo símbolo es el nodo de ese símbolo
+            if punto == 1 and punto < len(cuerpos[produccion]):
+                return derecho
+            etiqueta = (cabezas[produccion] if punto == len(cuerpos[produccion])
+                        else (produccion, punto))
+            nodo = nodos.get((etiqueta, origen))
+            if nodo is None:
+                nodo = nodos[(etiqueta, origen)] = NodoBosque(etiqueta, origen, fin_nodo)
+            nodo.agregar_familia((derecho,) if izquierdo is None else (izquierdo, derecho))
+            return nodo
+        
+        # Ítems que siguen a uno nuevo: a completar/predecir en este conjunto,
+        # a escanear con el próximo token o descartados
+        def ubicar(i: int, item: tuple, pendientes: list, escanear: list,
+                   siguiente: int, esperados: list):
+            produccion, punto = item[0], item[1]
+            cuerpo = cuerpos[produccion]
+            if punto == len(cuerpo) or cuerpo[punto] >= num_tipos:
+                agregar(i, item, pendientes)
+            elif cuerpo[punto] == siguiente:
+                escanear.append(item)
+            else:
+                esperados.append((produccion, cuerpo[punto]))
+        
+        # Lo que se escanea y se espera en cada posición se reúne al llegar a ella
+        proximo = codigos[0] if n > 0 else fin
+        escanear_siguiente: List[tuple] = []
+        esperados_siguiente: List[Tuple[int, int]] = []
+        for produccion in alternativas[inicial - num_tipos]:
+            ubicar(0, (produccion, 0, 0, None), [], escanear_siguiente, proximo,
+                   esperados_siguiente)
+        
+        nodos: Dict[tuple, NodoBosque] = {}
+        for i in range(n + 1):
+            siguiente = codigos[i] if i < n else fin
+            pendientes = list(conjuntos[i])
+            escanear, escanear_siguiente = escanear_siguiente, []
+            esperados, esperados_siguiente = esperados_siguiente, []
+            # Nodos ε completados en i: no terminal -> nodo
+            vacios: Dict[int, NodoBosque] = {}
+            
+            while pendientes:
+                produccion, punto, origen, nodo = pendientes.pop()
+                cuerpo = cuerpos[produccion]
+                
+                if punto < len(cuerpo):
+                    # Predicción
+                    simbolo = cuerpo[punto]
+                    for alternativa in alternativas[simbolo - num_tipos]:
+                        ubicar(i, (alternativa, 0, i, None), pendientes, escanear, siguiente,
+                               esperados)
+                    vacio = vacios.get(simbolo)
+                    if vacio is not None:
+                        y = crear_nodo(produccion, punto + 1, origen, i, nodo, vacio, nodos)
+                        ubicar(i, (produccion, punto + 1, origen, y), pendientes, escanear,
+                               siguiente, esperados)
+                    continue
+                
+                # Compleción
+                cabeza = cabezas[produccion]
+                if nodo is None:
+                    nodo = nodos.get((cabeza, i))
+                    if nodo is None:
+                        nodo = nodos[(cabeza, i)] = NodoBosque(cabeza, i, i)
+                    nodo.agregar_familia(())
+                if origen == i:
+                    vacios[cabeza] = nodo
+                for p, q, o, w in esperando[origen].get(cabeza, ()):
+                    y = crear_nodo(p, q + 1, o, i, w, nodo, nodos)
+                    ubicar(i, (p, q + 1, o, y), pendientes, escanear, siguiente, esperados)
+            
+            if i == n:
+                break
+            if not escanear:
+                completa = any(cabezas[p] == inicial and q == len(cuerpos[p]) and o == 0
+                               for p, q, o, _ in conjuntos[i])
+                return None, (i, self._esperado(esperados, completa))
+            
+            # Escaneo del token i
+            nodos = {}
+            hoja = NodoBosque(siguiente, i, i + 1)
+            proximo = codigos[i + 1] if i + 1 < n else fin
+            for produccion, punto, origen, nodo in escanear:
+                y = crear_nodo(produccion, punto + 1, origen, i + 1, nodo, hoja, nodos)
+                ubicar(i + 1, (produccion, punto + 1, origen, y), [], escanear_siguiente,
+                       proximo, esperados_siguiente)
+        
+        for produccion, punto, origen, nodo in conjuntos[n]:
+            if cabezas[produccion] == inicial and punto == len(cuerpos[produccion]) and origen == 0:
+                if nodo is None:
+                    nodo = nodos[(inicial, 0)]
+                return nodo, None
+        return None, (n, self._esperado(esperados, False))
+    
+    def _esperado(self, esperados: List[Tuple[int, int]], completa: bool) -> Optional[TipoToken]:
+        """Tipo reportado como esperado en un error (None: tokens adicionales)"""
+        if completa or not esperados:
+            return None
+        # Como ParserLL1: los no terminales anulables se omiten si hay otra
+        # opción, y se elige la última alternativa del primer no terminal
+        cabezas = self.gramatica.cabezas
+        obligatorios = [e for e in esperados if cabezas[e[0]] not in self.anulables] or esperados
+        return TIPOS_TOKEN[min(obligatorios, key=lambda e: (cabezas[e[0]], -e[0]))[1]]
+    
+    def bosque(self, tokens: SecuenciaTokens) -> Optional[NodoBosque]:
+        """Raíz del bosque con todas las derivaciones (None si no es válida)"""
+        return self.reconocer(codigos_tipo(tokens))[0]
+    
+    @staticmethod
+    def contar_derivaciones(raiz: NodoBosque) -> int:
+        """
+        Número de árboles de derivación distintos que representa el bosque
+        
+        Se calcula de abajo hacia arriba con un recorrido iterativo: cada nodo
+        se cuenta una vez, aunque el resultado sea exponencial. La gramática
+        no debe tener ciclos (A ⇒⁺ A), que darían infinitas derivaciones.
+        """
+        cuentas: Dict[int, int] = {}
+        pila = [raiz]
+        while pila:
+            nodo = pila[-1]
+            pendientes = [hijo for familia in nodo.familias for hijo in familia
+                          if id(hijo) not in cuentas]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            if id(nodo) in cuentas:
+                continue
+            total = 0
+            for familia in nodo.familias:
+                producto = 1
+                for hijo in familia:
+                    producto *= cuentas[id(hijo)]
+                total += producto
+            cuentas[id(nodo)] = total if nodo.familias else 1
+        return cuentas[id(raiz)]
+    
+    @staticmethod
+    def contar_nodos(raiz: NodoBosque) -> int:
+        """Número de nodos distintos del bosque (su tamaño, contando hojas)"""
+        vistos = {id(raiz)}
+        pila = [raiz]
+        while pila:
+            for familia in pila.pop().familias:
+                for hijo in familia:
+                    if id(hijo) not in vistos:
+                        vistos.add(id(hijo))
+                        pila.append(hijo)
+        return len(vistos)
+    
+    def extraer_arbol(self, raiz: NodoBosque, tokens: SecuenciaTokens = ()) -> ArbolPlano:
+        """
+        Un árbol de derivación del bosque (la primera familia de cada nodo)
+        
+        Los no terminales auxiliares (en minúsculas) no forman nodos: sus
+        hijos cuelgan del nodo padre.
+        """
+        num_tipos = len(TIPOS_TOKEN)
+        nodos = self.gramatica.nodos
+        arbol = ArbolPlano(tokens)
+        pila = [(raiz, ArbolPlano.SIN_NODO)]
+        while pila:
+            nodo, padre = pila.pop()
+            etiqueta = nodo.etiqueta
+            if isinstance(etiqueta, int):
+                if etiqueta < num_tipos:
+                    arbol.agregar(SIMBOLOS_TERMINALES[TIPOS_TOKEN[etiqueta]], padre, nodo.inicio)
+                    continue
+                if nodos[etiqueta - num_tipos] is not None:
+                    padre = arbol.agregar(nodos[etiqueta - num_tipos], padre)
+            if nodo.familias:
+                pila.extend((hijo, padre) for hijo in reversed(nodo.familias[0]))
+        return arbol
+    
+    def diagnosticar(self, codigos: Sequence[int]) -> Tuple[bool, Tuple[Fallo, ...]]:
+        """
+        Verifica una secuencia de códigos de tipo sin redactar mensajes de error
+        
+        Returns:
+            Tupla (éxito, fallos) con los errores sin palabras asociadas
+        """
+        raiz, fallo = self.reconocer(codigos)
+        return (True, ()) if raiz is not None else (False, (fallo,))
+    
+    def parsear(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis]]:
+        """
+        Método principal de parsing (misma interfaz que ParserDescendenteRecursivo)
+        
+        Args:
+            tokens: Lista de tokens (o FlujoTokens) a parsear
+            
+        Returns:
+            Tupla (éxito, lista_de_errores)
+        """
+        raiz, fallo = self.reconocer(codigos_tipo(tokens))
+        if raiz is not None:
+            return True, []
+        return False, [ParserLL1._error(tokens, fallo)]
+    
+    def parsear_con_arbol(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis],
+                                                                   Optional[ArbolPlano]]:
+        """
+        Parsea y extrae un árbol de derivación del bosque
+        
+        Returns:
+            Tupla (éxito, lista_de_errores, árbol o None si hay errores)
+        """
+        raiz, fallo = self.reconocer(codigos_tipo(tokens))
+        if raiz is None:
+            return False, [ParserLL1._error(tokens, fallo)], None
+        return True, [], self.extraer_arbol(raiz, tokens)
+
+
+
+class CacheLRU:
+    """
+    Caché acotada con desalojo LRU (se descarta la entrada usada hace más tiempo)
+    
+    Lleva contadores de aciertos, fallos y desalojos para medir su efectividad.
+    Una misma caché puede compartirse entre hilos: las inserciones, los
+    desalojos y la limpieza se protegen con un candado, pero las consultas no
+    lo toman, para que los hilos que comparten un MiniParser no se serialicen
+    en cada análisis. Cada operación del OrderedDict es atómica por sí sola;
+    a cambio, con varios hilos consultando a la vez los contadores de aciertos
+    y fallos pueden perder algún incremento (son una medida, no un invariante).
+    """
+    
+    def __init__(self, capacidad: int):
+        """
+        Args:
+            capacidad: Número máximo de entradas (mayor que cero)
+        """
+        if capacidad <= 0:
+            raise ValueError(f"La capacidad de la caché debe ser positiva: {capacidad}")
+        self.capacidad = capacidad
+        self.datos: "OrderedDict[Hashable, object]" = OrderedDict()
+        self.candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
+    def __len__(self) -> int:
+        return len(self.datos)
+    
+    def obtener(self, clave: Hashable) -> Optional[object]:
+        """Retorna el valor asociado a la clave, o None si no está en la caché (sin candado)"""
+        valor = self.datos.get(clave)
+        if valor is None:
+            self.fallos += 1
+            return None
+        
+        try:
+            self.datos.move_to_end(clave)
+        except KeyError:
+            # Otro hilo la desalojó tras leerla: el valor leído sigue siendo válido
+            pass
+        self.aciertos += 1
+        return valor
+    
+    def guardar(self, clave: Hashable, valor: object):
+        """Guarda un valor, desalojando la entrada menos usada si hace falta"""
+        with self.candado:
+            self.datos[clave] = valor
+            self.datos.move_to_end(clave)
+            
+            if len(self.datos) > self.capacidad:
+                self.datos.popitem(last=False)
+                self.desalojos += 1
+    
+    def limpiar(self):
+        """Elimina todas las entradas y reinicia los contadores"""
+        with self.candado:
+            self.datos.clear()
+            self.aciertos = self.fallos = self.desalojos = 0
+    
+    def estadisticas(self) -> dict:
+        """Retorna capacidad, ocupación y contadores de la caché"""
+        with self.candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "capacidad": self.capacidad,
+                "entradas": len(self.datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+class HistogramaTiempos:
+    """
+    Histograma de duraciones en nanosegundos con cubetas logarítmicas
+    
+    Cada potencia de dos se divide en 8 cubetas, así que la memoria no depende
+    del número de muestras y los percentiles tienen un error relativo menor
+    al 7%. La cantidad, la media, el mínimo y el máximo son exactos.
+    """
+    
+    SUBDIVISIONES = 8
+    
+    def __init__(self):
+        self.cubetas: Dict[int, int] = {}
+        self.cantidad = 0
+        self.suma = 0
+        self.minimo = 0
+        self.maximo = 0
+    
+    @classmethod
+    def cubeta(cls, valor: int) -> int:
+        """Índice de la cubeta de un valor (los menores que 16 son exactos)"""
+        if valor < 2 * cls.SUBDIVISIONES:
+            return max(valor, 0)
+        exponente = valor.bit_length() - 4
+        return exponente * cls.SUBDIVISIONES + (valor >> exponente)
+    
+    @classmethod
+    def limites(cls, cubeta: int) -> Tuple[int, int]:
+        """Rango [inferior, superior] de valores de una cubeta"""
+        if cubeta < 2 * cls.SUBDIVISIONES:
+            return cubeta, cubeta
+        exponente = cubeta // cls.SUBDIVISIONES - 1
+        inferior = (cubeta % cls.SUBDIVISIONES + cls.SUBDIVISIONES) << exponente
+        return inferior, inferior + (1 << exponente) - 1
+    
+    def agregar(self, valor: int):
+        """Registra una duración"""
+        cubeta = self.cubeta(valor)
+        self.cubetas[cubeta] = self.cubetas.get(cubeta, 0) + 1
+        if not self.cantidad or valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        self.cantidad += 1
+        self.suma += valor
+    
+    def percentil(self, p: float) -> float:
+        """Percentil p (0-100), estimado con el punto medio de su cubeta"""
+        if not self.cantidad:
+            return 0.0
+        rango = max(1, -(-self.cantidad * p // 100))
+        acumulado = 0
+        for cubeta in sorted(self.cubetas):
+            acumulado += self.cubetas[cubeta]
+            if acumulado >= rango:
+                inferior, superior = self.limites(cubeta)
+                return min(max((inferior + superior) / 2, self.minimo), self.maximo)
+        return float(self.maximo)
+    
+    def resumen(self) -> dict:
+        """Cantidad, media, mínimo, máximo y percentiles 50, 95 y 99"""
+        return {
+            "cantidad": self.cantidad,
+            "media_ns": self.suma / self.cantidad if self.cantidad else 0.0,
+            "min_ns": self.minimo,
+            "max_ns": self.maximo,
+            "p50_ns": self.percentil(50),
+            "p95_ns": self.percentil(95),
+            "p99_ns": self.percentil(99),
+        }
+
+
+class MetricasFases:
+    """
+    Duraciones por fase de los análisis de un MiniParser
+    
+    Fases:
+        lexico: tokenización y detección de palabras desconocidas
+        sintactico: análisis sintáctico
+        resultado: construcción de los errores léxicos y del diccionario
+        total: análisis completo
+        cache: llamadas resueltas mediante la caché de resultados (si la
+               consulta falla, el análisis se registra además por fases)
+    
+    Los registros se protegen con un candado, así que un MiniParser
+    instrumentado puede compartirse entre hilos.
+    """
+    
+    FASES = ("lexico", "sintactico", "resultado", "total", "cache")
+    
+    def __init__(self):
+        self.candado = threading.Lock()
+        self.histogramas = {fase: HistogramaTiempos() for fase in self.FASES}
+    
+    def registrar(self, **duraciones: int):
+        """Registra la duración en nanosegundos de cada fase indicada"""
+        with self.candado:
+            for fase, duracion in duraciones.items():
+                self.histogramas[fase].agregar(duracion)
+    
+    def limpiar(self):
+        """Descarta todas las mediciones"""
+        with self.candado:
+            self.histogramas = {fase: HistogramaTiempos() for fase in self.FASES}
+    
+    def estadisticas(self) -> Dict[str, dict]:
+        """Resumen del histograma de cada fase (ver HistogramaTiempos.resumen)"""
+        with self.candado:
+            return {fase: histograma.resumen() for fase, histograma in self.histogramas.items()}
+
+
+class MiniParser:
+    """
+    Interfaz principal del mini-parser
+    
+    Los parsers no guardan estado entre llamadas y las cachés usan candados,
+    por lo que una misma instancia puede atender a varios hilos a la vez.
+    """
+    
+    # Motores de análisis sintáctico disponibles
+    MOTORES = {
+        "descendente": ParserDescendenteRecursivo,
+        "afd": ParserAFD,
+        "ll1": ParserLL1,
+        "earley": ParserEarley,
+    }
+    
+    # Motores que reconocen el lenguaje de GRAMATICA (el del AFD); el resto
+    # usa su propia gramática
+    MOTORES_GRAMATICA_BASICA = frozenset({"descendente", "afd", "ll1"})
+    
+    def __init__(self, motor: str = "descendente", tamano_cache: int = 0,
+                 tamano_cache_formas: int = 1024, instrumentar: bool = False):
+        """
+        Args:
+            motor: Motor sintáctico a usar ("descendente", "afd", "ll1" o
+                   "earley", este último con GRAMATICA_EXTENDIDA)
+            tamano_cache: Máximo de resultados a recordar (0 desactiva la caché)
+            tamano_cache_formas: Máximo de secuencias de tipos cuyo veredicto
+                                 sintáctico se recuerda (0 la desactiva)
+            instrumentar: Si es True, analizar() mide cada fase y acumula las
+                          duraciones en self.metricas (ver MetricasFases)
+        """
+        if motor not in self.MOTORES:
+            raise ValueError(
+                f"Motor desconocido: '{motor}'. "
+                f"Opciones: {', '.join(self.MOTORES)}"
+            )
+        self.motor = motor
+        # Los motores de la gramática básica no conocen las conjunciones ni
+        # las preposiciones: para ellos son palabras desconocidas
+        self.lexico = (AnalizadorLexico() if motor in self.MOTORES_GRAMATICA_BASICA
+                       else AnalizadorLexicoExtendido())
+        self.parser = self.MOTORES[motor]()
+        # Parser que construye el árbol de derivación (analizar con arbol=True)
+        self.parser_arbol = (self.parser if hasattr(self.parser, "parsear_con_arbol")
+                             else ParserDescendenteRecursivo())
+        self.cache = CacheLRU(tamano_cache) if tamano_cache > 0 else None
+        self.cache_formas = CacheLRU(tamano_cache_formas) if tamano_cache_formas > 0 else None
+        
+        # La versión instrumentada se asigna solo a esta instancia: sin
+        # instrumentación, analizar() no hace ninguna llamada al reloj
+        self.metricas = MetricasFases() if instrumentar else None
+        if instrumentar:
+            self.analizar = self._analizar_instrumentado
+    
+    def analizar(self, texto: Union[str, FlujoTokens], arbol: bool = False) -> Mapping:
+        """
+        Analiza una cadena de texto completa
+        
+        El análisis léxico y la detección de palabras desconocidas se hacen en
+        un solo recorrido (tokenizar_y_verificar) y los tokens se entregan como
+        un FlujoTokens, que solo construye objetos Token si se consultan.
+        
+        Args:
+            texto: Texto a analizar, o un FlujoTokens ya tokenizado
+                   (en ese caso "tokens" del resultado es el mismo flujo)
+            arbol: Si es True, el resultado incluye "arbol" con el árbol de
+                   derivación (ArbolPlano) construido durante el parsing
+                   (None si la oración no es válida); no usa las cachés
+            
+        Returns:
+            Diccionario con resultados del análisis
+        """
+        if self.cache is not None and not arbol and not isinstance(texto, FlujoTokens):
+            return self._analizar_con_cache(texto)
+        
+        texto, tokens, desconocidas = self._fase_lexica(texto)
+        if desconocidas:
+            return self._resultado_lexico(texto, tokens, desconocidas, arbol)
+        
+        exito, errores, derivacion = self._fase_sintactica(tokens, arbol)
+        return self._resultado(exito, "sintáctico", texto, tokens, errores, arbol, derivacion)
+    
+    def _analizar_instrumentado(self, texto: Union[str, FlujoTokens],
+                                arbol: bool = False) -> Mapping:
+        """
+        Igual que analizar(), registrando la duración de cada fase en self.metricas
+        
+        Ejecuta las mismas fases que analizar() con las mismas funciones, y
+        solo agrega las llamadas al reloj entre ellas.
+        """
+        reloj = time.perf_counter_ns
+        inicio = reloj()
+        
+        if self.cache is not None and not arbol and not isinstance(texto, FlujoTokens):
+            resultado = self._analizar_con_cache(texto)
+            self.metricas.registrar(cache=reloj() - inicio)
+            return resultado
+        
+        texto, tokens, desconocidas = self._fase_lexica(texto)
+        fin_lexico = reloj()
+        
+        if desconocidas:
+            resultado = self._resultado_lexico(texto, tokens, desconocidas, arbol)
+            fin = reloj()
+            self.metricas.registrar(lexico=fin_lexico - inicio, resultado=fin - fin_lexico,
+                                    total=fin - inicio)
+            return resultado
+        
+        exito, errores, derivacion = self._fase_sintactica(tokens, arbol)
+        fin_sintactico = reloj()
+        
+        resultado = self._resultado(exito, "sintáctico", texto, tokens, errores, arbol, derivacion)
+        fin = reloj()
+        self.metricas.registrar(lexico=fin_lexico - inicio,
+                                sintactico=fin_sintactico - fin_lexico,
+                                resultado=fin - fin_sintactico, total=fin - inicio)
+        return resultado
+    
+    def _fase_lexica(self, texto: Union[str, FlujoTokens]) -> Tuple[str, FlujoTokens,
+                                                                    List[Tuple[int, str]]]:
+        """
+        Tokeniza el texto (si hace falta) y ubica las palabras desconocidas
+        
+        Returns:
+            Tupla (texto, flujo de tokens, lista de (posición, palabra) desconocidas)
+        """
+        if not isinstance(texto, FlujoTokens):
+            tokens, desconocidas = self.lexico.tokenizar_y_verificar(texto)
+            return texto, tokens, desconocidas
+        
+        # Ubicar palabras desconocidas sin construir los Token válidos
+        tokens = texto
+        desconocido = TipoToken.DESCONOCIDO.codigo
+        desconocidas = []
+        if desconocido in tokens.tipos:
+            desconocidas = [(i, tokens.valor(i)) for i, codigo in enumerate(tokens.tipos)
+                            if codigo == desconocido]
+        return tokens.texto, tokens, desconocidas
+    
+    def _fase_sintactica(self, tokens: FlujoTokens, arbol: bool) -> Tuple[
+            bool, List[ErrorAnalisis], Optional[ArbolPlano]]:
+        """
+        Parsea los tokens con la caché de formas o, si se pide el árbol, con parser_arbol
+        
+        Returns:
+            Tupla (éxito, lista_de_errores, árbol o None)
+        """
+        if arbol:
+            return self.parser_arbol.parsear_con_arbol(tokens)
+        if self.cache_formas is not None:
+            exito, errores = self._parsear_por_forma(tokens)
+        else:
+            exito, errores = self.parser.parsear(tokens)
+        return exito, errores, None
+    
+    def _resultado_lexico(self, texto: str, tokens: FlujoTokens,
+                          desconocidas: List[Tuple[int, str]], arbol: bool) -> dict:
+        """Resultado de un análisis que falló en la fase léxica"""
+        errores = [ErrorAnalisis(CodigoError.PALABRA_DESCONOCIDA, posicion,
+                                 None, TipoToken.DESCONOCIDO, palabra)
+                   for posicion, palabra in desconocidas]
+        return self._resultado(False, "léxico", texto, tokens, errores, arbol)
+    
+    @staticmethod
+    def _resultado(valido: bool, fase: str, texto: str, tokens: FlujoTokens,
+                   errores: List[ErrorAnalisis], arbol: bool,
+                   derivacion: Optional[ArbolPlano] = None) -> dict:
+        """Diccionario de resultado (con "arbol" solo si se pidió)"""
+        resultado = {
+            "valido": valido,
+            "fase": fase,
+            "texto": texto,
+            "tokens": tokens,
+            "errores": errores
+        }
+        if arbol:
+            resultado["arbol"] = derivacion
+        return resultado
+    
+    def veredicto_forma(self, forma: bytes) -> Tuple[bool, Tuple[Fallo, ...]]:
+        """
+        Veredicto sintáctico de una secuencia de códigos de tipo terminada en FIN
+        
+        Se memoiza en la caché de formas si está activa.
+        
+        Returns:
+            Tupla (éxito, fallos) con los errores sin palabras asociadas
+        """
+        if self.cache_formas is None:
+            return self.parser.diagnosticar(forma)
+        
+        veredicto = self.cache_formas.obtener(forma)
+        if veredicto is None:
+            veredicto = self.parser.diagnosticar(forma)
+            self.cache_formas.guardar(forma, veredicto)
+        return veredicto
+    
+    def _parsear_por_forma(self, tokens: SecuenciaTokens) -> Tuple[bool, List[ErrorAnalisis]]:
+        """
+        Parsea usando la caché de formas
+        
+        La validez solo depende de la secuencia de tipos, así que el veredicto
+        y los fallos se calculan una vez por forma; solo las palabras citadas
+        en los errores dependen de esta oración.
+        """
+        exito, fallos = self.veredicto_forma(bytes(codigos_tipo(tokens)))
+        errores = []
+        for posicion, esperado in fallos:
+            if posicion < len(tokens):
+                token = tokens[posicion]
+            else:
+                token = Token(TipoToken.FIN, "", posicion)
+            errores.append(error_sintactico(posicion, esperado, token))
+        return exito, errores
+    
+    def _analizar_con_cache(self, texto: str) -> Mapping:
+        """
+        Analiza usando la caché de resultados
+        
+        La clave es el texto normalizado (minúsculas y espacios simples). Las
+        entradas guardadas son inmutables: un MappingProxyType con los tokens
+        en un FlujoTokensCongelado (sus desplazamientos se refieren al texto
+        normalizado) y los errores en una tupla.
+        
+        Cada llamada recibe un diccionario propio con la misma forma que sin
+        caché: los tokens son un FlujoTokens del texto recibido y los errores
+        una lista. Los errores no dependen de los espacios ni de las
+        mayúsculas, así que se comparten.
+        """
+        clave = " ".join(texto.lower().split())
+        guardado = self.cache.obtener(clave)
+        
+        if guardado is None:
+            analisis = self.analizar(self.lexico.tokenizar_compacto(clave))
+            analisis["tokens"] = analisis["tokens"].congelar()
+            analisis["errores"] = tuple(analisis["errores"])
+            guardado = MappingProxyType(analisis)
+            self.cache.guardar(clave, guardado)
+        
+        return dict(guardado, texto=texto,
+                    tokens=FlujoTokens(texto, array('B', guardado["tokens"].tipos)),
+                    errores=list(guardado["errores"]))
+    
+    def es_valida(self, texto: str) -> bool:
+        """
+        Indica si una oración es válida sin construir tokens, errores ni resultado
+        
+        Clasifica cada palabra y avanza el AFD en el mismo recorrido, y se
+        detiene en la primera palabra desconocida o en el primer token que no
+        encaja. Los motores de MOTORES_GRAMATICA_BASICA reconocen el lenguaje
+        del AFD; con los demás se diagnostica la secuencia de tipos con el
+        propio motor. En ambos casos el veredicto coincide con
+        analizar(texto)["valido"].
+        """
+        clasificar = self.lexico.codigos.get
+        if self.motor not in self.MOTORES_GRAMATICA_BASICA:
+            forma = [clasificar(palabra) for palabra in texto.lower().split()]
+            if None in forma:
+                return False
+            return self.veredicto_forma(bytes(forma + [TipoToken.FIN.codigo]))[0]
+        
+        tabla = ParserAFD.TABLA
+        fila = 0
+        
+        for palabra in texto.lower().split():
+            codigo = clasificar(palabra)
+            if codigo is None:
+                return False
+            fila = tabla[fila + codigo]
+            if fila < 0:
+                return False
+        
+        return tabla[fila + TipoToken.FIN.codigo] == ParserAFD.ACEPTAR
+    
+    def analizar_lote(self, textos: Iterable[str],
+                      destino: Optional[ResultadoLote] = None) -> ResultadoLote:
+        """
+        Analiza muchas oraciones en una sola llamada
+        
+        No se construyen tokens ni diccionarios de resultado por oración: cada
+        oración se reduce a su secuencia de códigos de tipo, y el parser solo
+        se ejecuta una vez por secuencia distinta (la validez sintáctica no
+        depende de las palabras concretas).
+        
+        Args:
+            textos: Iterable de oraciones a analizar
+            destino: ResultadoLote a reutilizar (se vacía antes de llenarlo)
+            
+        Returns:
+            ResultadoLote con validez, fase y posición del error por oración
+        """
+        lote = destino if destino is not None else ResultadoLote()
+        lote.limpiar()
+        
+        agregar_valido = lote.validos.append
+        agregar_fase = lote.fases.append
+        agregar_posicion = lote.posiciones.append
+        clasificar = self.lexico.codigos.get
+        desconocido = TipoToken.DESCONOCIDO.codigo
+        fin = bytes([TipoToken.FIN.codigo])
+        veredicto_forma = self.veredicto_forma
+        
+        # Forma -> posición del error sintáctico (-1 si es válida) en este lote
+        veredictos: Dict[bytes, int] = {}
+        
+        for texto in textos:
+            forma = bytes(map(clasificar, texto.lower().split(), repeat(desconocido)))
+            
+            if desconocido in forma:
+                agregar_valido(0)
+                agregar_fase(FASE_LEXICO)
+                agregar_posicion(forma.index(desconocido))
+                continue
+            
+            posicion = veredictos.get(forma)
+            if posicion is None:
+                exito, fallos = veredicto_forma(forma + fin)
+                posicion = veredictos[forma] = -1 if exito else fallos[0][0]
+            
+            if posicion < 0:
+                agregar_valido(1)
+                agregar_fase(FASE_OK)
+            else:
+                agregar_valido(0)
+                agregar_fase(FASE_SINTACTICO)
+            agregar_posicion(posicion)
+        
+        return lote
     
-    def mostrar_resultado(self, resultado: dict):
+    def mostrar_resultado(self, resultado: Mapping):
         """Muestra el resultado del análisis de forma legible"""
         print(f"\n{'='*60}")
         print(f"Texto analizado: '{resultado['texto']}'")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+"""
+Servidor NLP Persistente
+Mantiene un modelo de NLP cargado en un proceso de larga duración y atiende
+análisis a través de un socket Unix (o una tubería con nombre en Windows),
+para que las ejecuciones repetidas de la comparación no vuelvan a cargarlo
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from itertools import islice
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Iterable, Iterator, List, Optional, Tuple
+from comparacion_parsers import BackendNLP, BACKENDS, crear_backend
+
+
+class ErrorServidor(Exception):
+    """Error al conectar con el servidor o reportado por él"""
+
+
+def direccion_por_defecto() -> str:
+    """
+    Dirección del servidor: un socket Unix en el directorio temporal,
+    propio de cada usuario, o una tubería con nombre en Windows
+    """
+    if sys.platform == "win32":
+        return r"\\.\pipe\mini-parser-nlp"
+    return os.path.join(tempfile.gettempdir(), f"mini-parser-nlp-{os.getuid()}.sock")
+
+
+def _enviar(conexion: Connection, mensaje: dict):
+    """Envía un mensaje como JSON (nunca con pickle: el servidor no ejecuta datos recibidos)"""
+    conexion.send_bytes(json.dumps(mensaje, ensure_ascii=False).encode("utf-8"))
+
+
+def _recibir(conexion: Connection) -> dict:
+    """Recibe un mensaje JSON"""
+    return json.loads(conexion.recv_bytes().decode("utf-8"))
+
+
+class ServidorNLP:
+    """
+    Proceso de larga duración que mantiene cargado un backend de NLP
+
+    El protocolo es un mensaje JSON por solicitud y otro por respuesta:
+
+        {"operacion": "estado"}
+        {"operacion": "analizar", "texto": "..."}
+        {"operacion": "lote", "textos": [...], "tamano_lote": 64, "procesos": 1}
+        {"operacion": "detener"}
+
+    Cada conexión se atiende en su propio hilo, pero el modelo se usa con un
+    candado: las solicitudes de varios clientes se procesan de a una.
+    """
+
+    def __init__(self, backend: str = "spacy", direccion: Optional[str] = None):
+        """
+        Args:
+            backend: Nombre del backend a mantener cargado (ver BACKENDS)
+            direccion: Socket o tubería donde escuchar (por defecto, direccion_por_defecto())
+        """
+        self.nombre_backend = backend
+        self.direccion = direccion or direccion_por_defecto()
+        self.backend: Optional[BackendNLP] = None
+        self.solicitudes = 0
+        self.candado = threading.Lock()
+        self.activo = False
+        self.listo = threading.Event()
+
+    def cargar(self) -> float:
+        """
+        Carga el modelo (el arranque en frío)
+
+        Returns:
+            Tiempo de carga en milisegundos
+        """
+        self.backend = crear_backend(self.nombre_backend)
+        return self.backend.carga_ms
+
+    def servir(self):
+        """Atiende conexiones hasta recibir la operación "detener" """
+        if self.backend is None:
+            self.cargar()
+
+        _eliminar_socket_abandonado(self.direccion)
+        with Listener(self.direccion) as oyente:
+            self.activo = True
+            self.listo.set()
+            while self.activo:
+                try:
+                    conexion = oyente.accept()
+                except OSError:
+                    continue
+                if not self.activo:
+                    conexion.close()
+                    break
+                threading.Thread(target=self._atender, args=(conexion,), daemon=True).start()
+
+    def _atender(self, conexion: Connection):
+        """Responde las solicitudes de una conexión hasta que el cliente la cierra"""
+        with conexion:
+            while True:
+                try:
+                    solicitud = _recibir(conexion)
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    respuesta = self._responder(solicitud)
+                except Exception as error:
+                    respuesta = {"error": f"{type(error).__name__}: {error}"}
+                _enviar(conexion, respuesta)
+
+                if solicitud.get("operacion") == "detener":
+                    self._detener()
+                    return
+
+    def _responder(self, solicitud: dict) -> dict:
+        """Ejecuta una solicitud y arma su respuesta"""
+        operacion = solicitud.get("operacion")
+        if operacion == "estado":
+            return {
+                "backend": self.backend.nombre,
+                "modelo": self.backend.modelo,
+                "version": self.backend.version,
+                "carga_ms": self.backend.carga_ms,
+                "pid": os.getpid(),
+                "solicitudes": self.solicitudes,
+            }
+        if operacion == "detener":
+            return {"detenido": True}
+
+        with self.candado:
+            self.solicitudes += 1
+            if operacion == "analizar":
+                return {"tokens": self.backend.analizar(solicitud["texto"])}
+            if operacion == "lote":
+                resultados = self.backend.analizar_lote(solicitud["textos"],
+                                                        solicitud.get("tamano_lote", 64),
+                                                        solicitud.get("procesos", 1))
+                return {"resultados": list(resultados)}
+        raise ValueError(f"Operación desconocida: '{operacion}'")
+
+    def _detener(self):
+        """Termina el bucle de servir(), despertando al accept() pendiente"""
+        self.activo = False
+        try:
+            Client(self.direccion).close()
+        except OSError:
+            pass
+
+
+def _eliminar_socket_abandonado(direccion: str):
+    """
+    Elimina el archivo de un socket Unix que quedó de un servidor terminado
+
+    Raises:
+        ErrorServidor: Si ya hay un servidor atendiendo en la dirección
+    """
+    if direccion.startswith("\\\\") or not os.path.exists(direccion):
+        return
+    try:
+        Client(direccion).close()
+    except OSError:
+        os.unlink(direccion)
+    else:
+        raise ErrorServidor(f"Ya hay un servidor escuchando en {direccion}")
+
+
+class BackendRemoto(BackendNLP):
+    """
+    Backend que delega el análisis en un ServidorNLP ya cargado
+
+    carga_ms es el tiempo de conexión (el arranque que paga cada ejecución)
+    y carga_servidor_ms el tiempo que tardó el servidor en cargar el modelo,
+    pagado una sola vez al iniciarlo.
+    """
+
+    def __init__(self, direccion: Optional[str] = None):
+        """
+        Raises:
+            ErrorServidor: Si no hay un servidor en la dirección
+        """
+        self.direccion = direccion or direccion_por_defecto()
+        inicio = time.perf_counter_ns()
+        try:
+            self.conexion = Client(self.direccion)
+        except OSError as error:
+            raise ErrorServidor(f"No hay un servidor NLP en {self.direccion}: {error}") from None
+        estado = self.estado()
+        self.carga_ms = (time.perf_counter_ns() - inicio) / 1e6
+        self.carga_servidor_ms = estado["carga_ms"]
+        self.nombre = f"{estado['backend']} (servidor)"
+        self.modelo = estado["modelo"]
+        self.version = estado["version"]
+
+    def estado(self) -> dict:
+        """Backend, tiempo de carga, pid y solicitudes atendidas por el servidor"""
+        return self._solicitar({"operacion": "estado"})
+
+    def analizar(self, texto: str) -> List[dict]:
+        return self._solicitar({"operacion": "analizar", "texto": texto})["tokens"]
+
+    def analizar_lote(self, textos: Iterable[str], tamano_lote: int = 64,
+                      procesos: int = 1) -> Iterator[Tuple[str, List[dict]]]:
+        """Envía las oraciones al servidor de a un lote por solicitud"""
+        textos = iter(textos)
+        while True:
+            lote = list(islice(textos, tamano_lote))
+            if not lote:
+                return
+            respuesta = self._solicitar({"operacion": "lote", "textos": lote,
+                                         "tamano_lote": tamano_lote, "procesos": procesos})
+            for texto, tokens in respuesta["resultados"]:
+                yield texto, tokens
+
+    def detener_servidor(self):
+        """Pide al servidor que termine"""
+        self._solicitar({"operacion": "detener"})
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra la conexión (el servidor sigue activo)"""
+        self.conexion.close()
+
+    def _solicitar(self, solicitud: dict) -> dict:
+        """Envía una solicitud y espera su respuesta"""
+        try:
+            _enviar(self.conexion, solicitud)
+            respuesta = _recibir(self.conexion)
+        except (EOFError, OSError) as error:
+            raise ErrorServidor(f"Se perdió la conexión con el servidor: {error}") from None
+        if "error" in respuesta:
+            raise ErrorServidor(respuesta["error"])
+        return respuesta
+
+
+def archivo_registro(direccion: str) -> str:
+    """
+    Registro del servidor iniciado en segundo plano: junto al socket o, en
+    Windows (donde la dirección es una tubería), en el directorio temporal
+    """
+    if sys.platform == "win32":
+        return os.path.join(tempfile.gettempdir(), "mini-parser-nlp.log")
+    return direccion + ".log"
+
+
+def conectar(direccion: Optional[str] = None, backend: str = "spacy",
+             iniciar: bool = False, espera: float = 120.0) -> BackendRemoto:
+    """
+    Conecta con el servidor y, si no está activo, opcionalmente lo inicia
+
+    Args:
+        direccion: Socket o tubería del servidor
+        backend: Backend que carga el servidor si hay que iniciarlo
+        iniciar: Si es True, inicia un servidor en segundo plano cuando no
+                 hay ninguno (queda activo para las ejecuciones siguientes;
+                 sus mensajes van a archivo_registro(direccion))
+        espera: Segundos máximos de espera a que el servidor cargue el modelo
+
+    Raises:
+        ErrorServidor: Si no hay servidor (o no llegó a iniciar a tiempo)
+    """
+    direccion = direccion or direccion_por_defecto()
+    try:
+        return BackendRemoto(direccion)
+    except ErrorServidor:
+        if not iniciar:
+            raise
+
+    # El servidor sobrevive al cliente: si heredara su stderr, una tubería o
+    # una captura de la salida no se cerraría hasta detenerlo
+    registro = archivo_registro(direccion)
+    with open(registro, "ab") as salida_errores:
+        proceso = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                    "--backend", backend, "--direccion", direccion],
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=salida_errores, start_new_session=True)
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            return BackendRemoto(direccion)
+        except ErrorServidor:
+            if proceso.poll() is not None:
+                raise ErrorServidor(f"El servidor NLP terminó al iniciar (código "
+                                    f"{proceso.returncode}; ver {registro})") from None
+            if time.monotonic() > limite:
+                raise
+            time.sleep(0.1)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Inicia el servidor, o consulta o detiene uno activo"""
+    argumentos = argparse.ArgumentParser(
+        description="Mantiene un modelo de NLP cargado para comparacion_parsers.py"
+    )
+    argumentos.add_argument("--backend", choices=list(BACKENDS), default="spacy",
+                            help="modelo a mantener cargado (por defecto: spacy)")
+    argumentos.add_argument("--direccion", default=direccion_por_defecto(),
+                            help=f"socket o tubería (por defecto: {direccion_por_defecto()})")
+    accion = argumentos.add_mutually_exclusive_group()
+    accion.add_argument("--estado", action="store_true", help="muestra el estado del servidor activo")
+    accion.add_argument("--detener", action="store_true", help="detiene el servidor activo")
+    opciones = argumentos.parse_args(argv)
+
+    if opciones.estado or opciones.detener:
+        try:
+            remoto = BackendRemoto(opciones.direccion)
+        except ErrorServidor as error:
+            print(error, file=sys.stderr)
+            return 1
+        if opciones.detener:
+            remoto.detener_servidor()
+            print(f"Servidor en {opciones.direccion} detenido")
+        else:
+            estado = remoto.estado()
+            remoto.cerrar()
+            print(f"{estado['backend']} (pid {estado['pid']}): modelo cargado en "
+                  f"{estado['carga_ms']:.1f} ms, {estado['solicitudes']} solicitudes atendidas")
+        return 0
+
+    servidor = ServidorNLP(opciones.backend, opciones.direccion)
+    try:
+        _eliminar_socket_abandonado(servidor.direccion)
+    except ErrorServidor as error:
+        print(error, file=sys.stderr)
+        return 1
+    carga = servidor.cargar()
+    print(f"{servidor.backend.nombre} cargado en {carga:.1f} ms; "
+          f"escuchando en {servidor.direccion}", file=sys.stderr)
+    servidor.servir()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,40 @@ Suite de Tests para Mini-Parser
 Tests unitarios y de integración
 """
 
+import argparse
+import contextlib
+import dataclasses
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
-from mini_parser import MiniParser, AnalizadorLexico, TipoToken, ParserDescendenteRecursivo
+from concurrent.futures import ThreadPoolExecutor
+from mini_parser import (MiniParser, AnalizadorLexico, AnalizadorLexicoExtendido, TipoToken, ParserDescendenteRecursivo,
+                         ParserAFD, ParserLL1, GramaticaLL1, GRAMATICA, ParserEarley, Gramatica,
+                         Token, FlujoTokens, ResultadoLote,
+                         CacheLRU, CodigoError, LEXICO, NodoArbol, ArbolPlano, HistogramaTiempos,
+                         FASE_OK, FASE_LEXICO, FASE_SINTACTICO)
+import validar_corpus
+import benchmark_parser
+import estadisticas
+import comparacion_parsers
+from comparacion_parsers import AnalizadorNLPModerno, BackendCacheado, BackendLocal, ComparadorParsers
+import servidor_nlp
+import generador_corpus
+from generador_corpus import GeneradorCorpus
+from visualizador_arbol import VisualizadorArbol
+
+
+# Tipos que produce el léxico básico: las conjunciones y preposiciones solo
+# las produce el de la gramática extendida
+TIPOS_BASICOS = [t for t in TipoToken
+                 if t not in (TipoToken.FIN, TipoToken.CONJUNCION, TipoToken.PREPOSICION)]
 
 
 class TestAnalizadorLexico(unittest.TestCase):
@@ -55,6 +87,14 @@ class TestAnalizadorLexico(unittest.TestCase):
         tokens = self.lexico.tokenizar("xyz")
         self.assertEqual(tokens[0].tipo, TipoToken.DESCONOCIDO)
     
+    def test_lexico_compartido(self):
+        """Test que el léxico compilado es único e inmutable"""
+        self.assertIs(AnalizadorLexico().articulos, self.lexico.articulos)
+        self.assertEqual(LEXICO["perro"], TipoToken.SUSTANTIVO)
+        self.assertEqual(LEXICO["el"], TipoToken.ARTICULO)
+        with self.assertRaises(TypeError):
+            LEXICO["pizza"] = TipoToken.SUSTANTIVO
+    
     def test_mayusculas_minusculas(self):
         """Test insensibilidad a mayúsculas"""
         tokens1 = self.lexico.tokenizar("El Perro")
@@ -229,6 +269,1303 @@ class TestErrores(unittest.TestCase):
         self.assertEqual(resultado["fase"], "léxico")
         # Debe reportar 3 palabras desconocidas
         self.assertEqual(len(resultado["errores"]), 3)
+    
+    def test_errores_estructurados(self):
+        """Test códigos, posiciones y tipos de los errores"""
+        error = self.parser.analizar("el perro come pizza")["errores"][0]
+        self.assertEqual(error.codigo, CodigoError.PALABRA_DESCONOCIDA)
+        self.assertEqual(error.posicion, 3)
+        self.assertEqual(str(error), "Palabra desconocida: 'pizza'")
+        
+        error = self.parser.analizar("el perro grande")["errores"][0]
+        self.assertEqual(error.codigo, CodigoError.TOKEN_INESPERADO)
+        self.assertEqual((error.esperado, error.encontrado), (TipoToken.VERBO, TipoToken.FIN))
+        self.assertEqual(error.mensaje,
+                         "Error en posición 3: Se esperaba VERBO, pero se encontró FIN ('')")
+        
+        error = self.parser.analizar("el perro come un hueso grande rojo")["errores"][0]
+        self.assertEqual(error.codigo, CodigoError.TOKENS_ADICIONALES)
+        self.assertEqual(error.posicion, 6)
+        self.assertIn("'rojo'", str(error))
+
+
+class TestAnalisisLote(unittest.TestCase):
+    """Tests del análisis por lotes"""
+    
+    ORACIONES = [
+        "el perro come un hueso",
+        "el perro grande",
+        "come el libro",
+        "el perro come una pizza",
+        "python es genial",
+        "el niño pequeño quiere un libro rojo",
+        "el perro come un hueso grande azul",
+        "",
+    ]
+    
+    def setUp(self):
+        self.parser = MiniParser()
+    
+    def test_coincide_con_analizar(self):
+        """Test que el lote da los mismos veredictos que analizar()"""
+        lote = self.parser.analizar_lote(self.ORACIONES)
+        self.assertEqual(len(lote), len(self.ORACIONES))
+        
+        for i, oracion in enumerate(self.ORACIONES):
+            with self.subTest(oracion=oracion):
+                resultado = self.parser.analizar(oracion)
+                self.assertEqual(bool(lote.validos[i]), resultado["valido"])
+                if not resultado["valido"]:
+                    self.assertEqual(lote.fase(i), resultado["fase"])
+    
+    def test_fases_y_posiciones(self):
+        """Test códigos de fase y posición del primer error"""
+        lote = self.parser.analizar_lote(self.ORACIONES[:4])
+        self.assertEqual(list(lote.fases),
+                         [FASE_OK, FASE_SINTACTICO, FASE_SINTACTICO, FASE_LEXICO])
+        self.assertEqual(list(lote.posiciones), [-1, 3, 0, 4])
+    
+    def test_reutilizar_destino(self):
+        """Test que el resultado destino se vacía y reutiliza"""
+        lote = self.parser.analizar_lote(self.ORACIONES)
+        mismo = self.parser.analizar_lote(iter(self.ORACIONES[:2]), destino=lote)
+        self.assertIs(mismo, lote)
+        self.assertEqual(len(lote), 2)
+
+
+class TestParserAFD(unittest.TestCase):
+    """Tests del motor basado en autómata finito"""
+    
+    def test_equivalencia_con_descendente(self):
+        """Test mismos veredictos y errores que el parser descendente recursivo"""
+        descendente = ParserDescendenteRecursivo()
+        afd = ParserAFD()
+        tipos = TIPOS_BASICOS
+        
+        for longitud in range(7):
+            for secuencia in itertools.product(tipos, repeat=longitud):
+                tokens = [Token(tipo, f"p{i}", i) for i, tipo in enumerate(secuencia)]
+                tokens.append(Token(TipoToken.FIN, "", longitud))
+                
+                esperado = descendente.parsear(tokens)
+                self.assertEqual(afd.parsear(tokens), (esperado[0], list(esperado[1])),
+                                 f"Difiere en: {secuencia}")
+                codigos = [tipo.codigo for tipo in secuencia] + [TipoToken.FIN.codigo]
+                self.assertEqual(afd.diagnosticar(codigos), descendente.diagnosticar(codigos))
+    
+    def test_motor_en_mini_parser(self):
+        """Test selección del motor en MiniParser"""
+        parser = MiniParser(motor="afd")
+        self.assertTrue(parser.analizar("el niño pequeño quiere un libro rojo")["valido"])
+        
+        resultado = parser.analizar("el perro grande")
+        self.assertFalse(resultado["valido"])
+        self.assertEqual(resultado["fase"], "sintáctico")
+        self.assertEqual(resultado["errores"],
+                         MiniParser().analizar("el perro grande")["errores"])
+    
+    def test_motor_desconocido(self):
+        """Test error al pedir un motor inexistente"""
+        with self.assertRaises(ValueError):
+            MiniParser(motor="lalr")
+
+
+class TestParserLL1(unittest.TestCase):
+    """Tests de la gramática declarativa y el motor LL(1)"""
+    
+    def test_equivalencia_con_descendente(self):
+        """Test mismos veredictos, errores y árboles que el parser descendente recursivo"""
+        descendente = ParserDescendenteRecursivo()
+        ll1 = ParserLL1()
+        tipos = TIPOS_BASICOS
+        
+        for longitud in range(7):
+            for secuencia in itertools.product(tipos, repeat=longitud):
+                tokens = [Token(tipo, f"p{i}", i) for i, tipo in enumerate(secuencia)]
+                tokens.append(Token(TipoToken.FIN, "", longitud))
+                
+                esperado = descendente.parsear(tokens)
+                self.assertEqual(ll1.parsear(tokens), (esperado[0], list(esperado[1])),
+                                 f"Difiere en: {secuencia}")
+                codigos = [tipo.codigo for tipo in secuencia] + [TipoToken.FIN.codigo]
+                self.assertEqual(ll1.diagnosticar(codigos), descendente.diagnosticar(codigos))
+                
+                arbol = descendente.parsear_con_arbol(tokens)[2]
+                if arbol is not None:
+                    self.assertEqual(ll1.parsear_con_arbol(tokens)[2].a_nodos(), arbol.a_nodos())
+    
+    def test_conjuntos_y_tabla(self):
+        """Test de los conjuntos FIRST y FOLLOW precalculados"""
+        gramatica = ParserLL1.GRAMATICA
+        self.assertEqual(gramatica.inicial, "ORACIÓN")
+        self.assertEqual(gramatica.anulables, {"adjetivo"})
+        self.assertEqual(set(gramatica.primeros["nominal"]), {"ADJETIVO", "SUSTANTIVO"})
+        self.assertEqual(set(gramatica.siguientes["nominal"]), {"VERBO", "FIN"})
+        self.assertEqual(gramatica.tabla[("adjetivo", "FIN")], gramatica.tabla[("adjetivo", "VERBO")])
+    
+    def test_motor_en_mini_parser(self):
+        """Test del motor ll1 en MiniParser, con árbol de derivación"""
+        parser = MiniParser(motor="ll1")
+        resultado = parser.analizar("el niño pequeño quiere un libro rojo", arbol=True)
+        self.assertTrue(resultado["valido"])
+        self.assertIs(parser.parser_arbol, parser.parser)
+        self.assertEqual(resultado["arbol"].a_nodos(),
+                         MiniParser().analizar("el niño pequeño quiere un libro rojo",
+                                               arbol=True)["arbol"].a_nodos())
+        self.assertEqual(parser.analizar("el perro grande")["errores"],
+                         MiniParser().analizar("el perro grande")["errores"])
+    
+    def test_extender_gramatica(self):
+        """Test que una regla nueva se reconoce sin escribir métodos"""
+        gramatica = GramaticaLL1(GRAMATICA.replace(
+            "<PREDICADO>   ::= VERBO <COMPLEMENTO>", "<PREDICADO>   ::= VERBO <objeto>")
+            + "<objeto> ::= <COMPLEMENTO> | ε\n")
+        parser = ParserLL1(gramatica)
+        lexico = AnalizadorLexico()
+        
+        self.assertTrue(parser.parsear(lexico.tokenizar("el perro come"))[0])
+        self.assertTrue(parser.parsear(lexico.tokenizar("el perro come un hueso"))[0])
+        self.assertFalse(parser.parsear(lexico.tokenizar("el perro come hueso"))[0])
+    
+    def test_gramaticas_invalidas(self):
+        """Test que se rechazan gramáticas mal escritas o que no son LL(1)"""
+        for bnf in ("<A> ::= ARTICULO SUSTANTIVO | ARTICULO ADJETIVO",
+                    "<A> ::= <B>",
+                    "<A> ::= PALABRA",
+                    "A ::= ARTICULO",
+                    ""):
+            with self.subTest(bnf=bnf), self.assertRaises(ValueError):
+                GramaticaLL1(bnf)
+
+
+class TestParserEarley(unittest.TestCase):
+    """Tests del parser de Earley y su bosque de derivación compartido"""
+    
+    def setUp(self):
+        self.lexico = AnalizadorLexicoExtendido()
+        self.parser = ParserEarley()
+    
+    def derivaciones(self, oracion: str) -> int:
+        raiz = self.parser.bosque(self.lexico.tokenizar(oracion))
+        self.assertIsNotNone(raiz, oracion)
+        return ParserEarley.contar_derivaciones(raiz)
+    
+    def test_equivalencia_con_ll1(self):
+        """Test con GRAMATICA: mismos veredictos y errores que LL(1)"""
+        earley = ParserEarley(Gramatica(GRAMATICA))
+        ll1 = ParserLL1()
+        tipos = [t.codigo for t in TIPOS_BASICOS]
+        
+        for longitud in range(7):
+            for secuencia in itertools.product(tipos, repeat=longitud):
+                codigos = list(secuencia) + [TipoToken.FIN.codigo]
+                self.assertEqual(earley.diagnosticar(codigos), ll1.diagnosticar(codigos),
+                                 f"Difiere en: {secuencia}")
+    
+    def test_ambiguedad(self):
+        """Test del número de derivaciones de oraciones ambiguas"""
+        self.assertEqual(self.derivaciones("el perro grande rojo come un hueso"), 1)
+        self.assertEqual(self.derivaciones("el perro come un hueso con el libro"), 1)
+        self.assertEqual(self.derivaciones("el perro come un hueso con el libro con el gato"), 2)
+        self.assertEqual(self.derivaciones("el perro come un hueso con el libro y el gato"), 2)
+        # Tres sintagmas preposicionales: número de Catalan C(3)
+        self.assertEqual(self.derivaciones(
+            "el perro come un hueso con el libro con el gato con la casa"), 5)
+    
+    def test_bosque_compartido(self):
+        """Test que el bosque crece polinómicamente aunque las derivaciones no"""
+        tokens = self.lexico.tokenizar(benchmark_parser.oracion_extendida(200))
+        self.assertEqual(len(tokens), 201)
+        raiz = self.parser.bosque(tokens)
+        self.assertGreater(ParserEarley.contar_derivaciones(raiz), 10 ** 30)
+        self.assertLess(ParserEarley.contar_nodos(raiz), 200 ** 2)
+    
+    def test_errores(self):
+        """Test de la posición y el tipo esperado de los errores"""
+        casos = [
+            ("el perro come", 3, TipoToken.ARTICULO),
+            ("perro come un hueso", 0, TipoToken.ARTICULO),
+            ("el perro come un hueso el", 5, None),
+            ("el perro come un hueso con", 6, TipoToken.ARTICULO),
+        ]
+        for oracion, posicion, esperado in casos:
+            with self.subTest(oracion=oracion):
+                exito, errores = self.parser.parsear(self.lexico.tokenizar(oracion))
+                self.assertFalse(exito)
+                self.assertEqual((errores[0].posicion, errores[0].esperado), (posicion, esperado))
+    
+    def test_recursion_izquierda_y_epsilon(self):
+        """Test de una gramática con recursión por la izquierda y producción ε"""
+        parser = ParserEarley(Gramatica("<A> ::= <A> ADJETIVO | ε"))
+        for longitud in range(4):
+            codigos = [TipoToken.ADJETIVO.codigo] * longitud + [TipoToken.FIN.codigo]
+            self.assertEqual(parser.diagnosticar(codigos), (True, ()))
+        self.assertFalse(parser.diagnosticar([TipoToken.ADJETIVO.codigo,
+                                              TipoToken.SUSTANTIVO.codigo])[0])
+    
+    def test_lexico_por_motor(self):
+        """Test que solo el motor earley reconoce conjunciones y preposiciones"""
+        oracion = "el perro y el gato comen un hueso con el libro"
+        for motor in MiniParser.MOTORES_GRAMATICA_BASICA:
+            with self.subTest(motor=motor):
+                parser = MiniParser(motor=motor)
+                resultado = parser.analizar(oracion)
+                self.assertEqual(resultado["fase"], "léxico")
+                self.assertEqual([(e.codigo, e.valor) for e in resultado["errores"]],
+                                 [(CodigoError.PALABRA_DESCONOCIDA, "y"),
+                                  (CodigoError.PALABRA_DESCONOCIDA, "con")])
+                self.assertFalse(parser.es_valida(oracion))
+                self.assertEqual(list(parser.analizar_lote([oracion]).fases), [FASE_LEXICO])
+        
+        self.assertNotIn("y", LEXICO)
+        self.assertEqual(AnalizadorLexicoExtendido().tokenizar("y")[0].tipo, TipoToken.CONJUNCION)
+        self.assertTrue(MiniParser(motor="earley").analizar(oracion)["valido"])
+    
+    def test_motor_en_mini_parser(self):
+        """Test del motor earley en MiniParser, con árbol y ruta de validez"""
+        parser = MiniParser(motor="earley")
+        oracion = "el perro grande rojo come un hueso con el libro y el gato"
+        resultado = parser.analizar(oracion, arbol=True)
+        self.assertTrue(resultado["valido"])
+        self.assertFalse(MiniParser().analizar(oracion)["valido"])
+        self.assertIs(parser.parser_arbol, parser.parser)
+        simbolos = [nodo.simbolo for nodo in resultado["arbol"].a_nodos().hijos]
+        self.assertEqual(simbolos, ["SUJETO", "PREDICADO"])
+        arbol = resultado["arbol"]
+        palabras = [arbol.palabra(nodo) for nodo in range(len(arbol))]
+        self.assertEqual([palabra for palabra in palabras if palabra is not None], oracion.split())
+        
+        for texto in TestAnalisisLote.ORACIONES + [oracion, "el perro come un hueso y",
+                                                   "el perro come un hueso y come el libro"]:
+            with self.subTest(texto=texto):
+                self.assertEqual(parser.es_valida(texto), parser.analizar(texto)["valido"])
+        self.assertTrue(parser.es_valida("el perro come un hueso y come el libro"))
+
+
+class TestFlujoTokens(unittest.TestCase):
+    """Tests de la tokenización compacta basada en arreglos"""
+    
+    def setUp(self):
+        self.lexico = AnalizadorLexico()
+    
+    def test_equivalente_a_tokenizar(self):
+        """Test que los tokens construidos bajo demanda coinciden con tokenizar()"""
+        for texto in ["el perro come un hueso", "  El  Perro\tgrande ", "python es genial", ""]:
+            with self.subTest(texto=texto):
+                flujo = self.lexico.tokenizar_compacto(texto)
+                self.assertIsInstance(flujo, FlujoTokens)
+                self.assertEqual(list(flujo), self.lexico.tokenizar(texto))
+    
+    def test_desplazamientos(self):
+        """Test desplazamientos en el texto original"""
+        texto = "  El Perro  come"
+        flujo = self.lexico.tokenizar_compacto(texto)
+        self.assertEqual(list(flujo.inicios), [2, 5, 12, 16])
+        self.assertEqual(list(flujo.finales), [4, 10, 16, 16])
+        self.assertEqual(flujo.tipo(1), TipoToken.SUSTANTIVO)
+        self.assertEqual(flujo[-1].tipo, TipoToken.FIN)
+    
+    def test_verificacion_en_un_recorrido(self):
+        """Test que tokenizar_y_verificar ubica todas las palabras desconocidas"""
+        flujo, desconocidas = self.lexico.tokenizar_y_verificar("El perro Muy grande come pizza")
+        self.assertEqual(desconocidas, [(2, "muy"), (5, "pizza")])
+        self.assertEqual(list(flujo), self.lexico.tokenizar("El perro Muy grande come pizza"))
+        
+        resultado = MiniParser().analizar("python es genial")
+        self.assertIsInstance(resultado["tokens"], FlujoTokens)
+        self.assertEqual([e.valor for e in resultado["errores"]], ["python", "es", "genial"])
+    
+    def test_parsers_aceptan_flujo(self):
+        """Test que los parsers y analizar() aceptan el flujo directamente"""
+        for oracion in ["el perro come un hueso", "el perro grande", "el perro come pizza"]:
+            flujo = self.lexico.tokenizar_compacto(oracion)
+            esperado = MiniParser().analizar(oracion)
+            
+            for motor in MiniParser.MOTORES:
+                with self.subTest(oracion=oracion, motor=motor):
+                    resultado = MiniParser(motor=motor).analizar(flujo)
+                    self.assertIs(resultado["tokens"], flujo)
+                    self.assertEqual(resultado["texto"], oracion)
+                    self.assertEqual(resultado["valido"], esperado["valido"])
+                    self.assertEqual(resultado["errores"], esperado["errores"])
+
+
+class TestCacheResultados(unittest.TestCase):
+    """Tests de la caché LRU de resultados"""
+    
+    def setUp(self):
+        self.parser = MiniParser(tamano_cache=2)
+    
+    def test_aciertos_y_fallos(self):
+        """Test que textos equivalentes comparten la entrada de caché"""
+        primero = self.parser.analizar("el perro come un hueso")
+        segundo = self.parser.analizar("  El perro  come un HUESO")
+        
+        self.assertTrue(segundo["valido"])
+        self.assertEqual(segundo["texto"], "  El perro  come un HUESO")
+        self.assertEqual(list(segundo["tokens"]), list(primero["tokens"]))
+        
+        estadisticas = self.parser.cache.estadisticas()
+        self.assertEqual(estadisticas["aciertos"], 1)
+        self.assertEqual(estadisticas["fallos"], 1)
+    
+    def test_desalojo_lru(self):
+        """Test que se desaloja la entrada usada hace más tiempo"""
+        self.parser.analizar("el perro come un hueso")
+        self.parser.analizar("la niña lee el libro")
+        self.parser.analizar("el perro come un hueso")
+        self.parser.analizar("python es genial")
+        
+        self.assertEqual(self.parser.cache.desalojos, 1)
+        self.assertIn("el perro come un hueso", self.parser.cache.datos)
+        self.assertNotIn("la niña lee el libro", self.parser.cache.datos)
+    
+    def test_resultados_independientes(self):
+        """Test que alterar un resultado no cambia la entrada de caché"""
+        resultado = self.parser.analizar("el perro grande")
+        resultado["valido"] = True
+        resultado["errores"].append("otro error")
+        resultado["tokens"].tipos[0] = TipoToken.VERBO.codigo
+        resultado["tokens"].texto = "la niña"
+        resultado["tokens"][0].valor = "gato"
+        
+        otro = self.parser.analizar("el perro grande")
+        self.assertFalse(otro["valido"])
+        self.assertEqual(len(otro["errores"]), 1)
+        self.assertEqual(otro["tokens"][0], Token(TipoToken.ARTICULO, "el", 0))
+    
+    def test_misma_forma_que_sin_cache(self):
+        """Test que los resultados con y sin caché tienen la misma forma"""
+        sin_cache = MiniParser()
+        for texto in ["  El perro  GRANDE ", "  El perro  GRANDE ", "el perro come pizza"]:
+            with self.subTest(texto=texto):
+                esperado = sin_cache.analizar(texto)
+                resultado = self.parser.analizar(texto)
+                self.assertEqual(resultado, esperado)
+                self.assertIs(type(resultado["errores"]), list)
+                self.assertIs(type(resultado["tokens"]), FlujoTokens)
+                self.assertEqual(resultado["tokens"].texto, texto)
+                self.assertEqual(list(resultado["tokens"].inicios),
+                                 list(esperado["tokens"].inicios))
+    
+    def test_entradas_congeladas(self):
+        """Test que las entradas guardadas no se pueden alterar"""
+        self.parser.analizar("el perro grande")
+        guardado = self.parser.cache.datos["el perro grande"]
+        with self.assertRaises(TypeError):
+            guardado["valido"] = True
+        with self.assertRaises(AttributeError):
+            guardado["errores"].append("otro error")
+        for atributo in ("texto", "tipos", "_inicios", "_finales"):
+            with self.subTest(atributo=atributo), self.assertRaises(AttributeError):
+                setattr(guardado["tokens"], atributo, None)
+        with self.assertRaises(TypeError):
+            guardado["tokens"].tipos[0] = 0
+    
+    def test_mismos_resultados_que_sin_cache(self):
+        """Test que la caché no cambia los veredictos"""
+        sin_cache = MiniParser()
+        for oracion in TestAnalisisLote.ORACIONES * 2:
+            with self.subTest(oracion=oracion):
+                esperado = sin_cache.analizar(oracion)
+                resultado = self.parser.analizar(oracion)
+                self.assertEqual(resultado["valido"], esperado["valido"])
+                self.assertEqual(resultado["fase"], esperado["fase"])
+                self.assertEqual(list(resultado["errores"]), esperado["errores"])
+    
+    def test_capacidad_invalida(self):
+        """Test que la capacidad debe ser positiva"""
+        with self.assertRaises(ValueError):
+            CacheLRU(0)
+
+
+class TestCacheFormas(unittest.TestCase):
+    """Tests de la caché de veredictos por secuencia de tipos"""
+    
+    def test_oraciones_con_la_misma_forma(self):
+        """Test que oraciones con la misma forma comparten el veredicto"""
+        parser = MiniParser()
+        parser.analizar("el perro come un hueso")
+        resultado = parser.analizar("la niña lee el libro")
+        
+        self.assertTrue(resultado["valido"])
+        self.assertEqual(parser.cache_formas.aciertos, 1)
+        self.assertEqual(len(parser.cache_formas), 1)
+    
+    def test_errores_con_palabras_propias(self):
+        """Test que los errores reutilizados usan las palabras de cada oración"""
+        parser = MiniParser()
+        parser.analizar("el perro come libro")
+        resultado = parser.analizar("la niña lee casa")
+        
+        self.assertEqual(parser.cache_formas.aciertos, 1)
+        self.assertEqual(resultado["errores"],
+                         MiniParser(tamano_cache_formas=0).analizar("la niña lee casa")["errores"])
+        self.assertIn("casa", str(resultado["errores"][0]))
+    
+    def test_equivalencia_con_y_sin_cache(self):
+        """Test mismos resultados con la caché de formas activa o desactivada"""
+        oraciones = TestAnalisisLote.ORACIONES + [
+            "el perro come un hueso grande azul",
+            "los gatos ven el carro rojo",
+            "la casa",
+        ]
+        for motor in MiniParser.MOTORES:
+            con_cache = MiniParser(motor=motor)
+            sin_cache = MiniParser(motor=motor, tamano_cache_formas=0)
+            for oracion in oraciones * 2:
+                with self.subTest(motor=motor, oracion=oracion):
+                    self.assertEqual(con_cache.analizar(oracion), sin_cache.analizar(oracion))
+
+
+class TestValidarCorpus(unittest.TestCase):
+    """Tests de la validación de corpus en formato JSONL"""
+    
+    def validar(self, contenido: bytes) -> list:
+        salida = io.BytesIO()
+        validar_corpus.validar_flujo(io.BytesIO(contenido), salida, MiniParser(motor="afd"))
+        return [json.loads(linea) for linea in salida.getvalue().decode("utf-8").splitlines()]
+    
+    def test_registro_por_linea(self):
+        """Test un registro por línea con validez y fase"""
+        registros = self.validar("el perro come un hueso\nel perro grande\nla niña come pizza\n".encode())
+        
+        self.assertEqual([r["linea"] for r in registros], [1, 2, 3])
+        self.assertEqual([r["valido"] for r in registros], [True, False, False])
+        self.assertEqual([r["fase"] for r in registros], [None, "sintáctico", "léxico"])
+    
+    def test_codigos_y_desplazamientos(self):
+        """Test códigos de error y desplazamientos en bytes"""
+        contenido = "el perro come un hueso\r\nla niña come pizza\nel perro grande".encode()
+        registros = self.validar(contenido)
+        
+        self.assertEqual(registros[1]["offset"], contenido.index("la niña".encode()))
+        error = registros[1]["errores"][0]
+        self.assertEqual(error["codigo"], CodigoError.PALABRA_DESCONOCIDA.value)
+        self.assertEqual(error["posicion"], 3)
+        self.assertEqual(error["offset"], contenido.index(b"pizza"))
+        
+        error = registros[2]["errores"][0]
+        self.assertEqual(error["codigo"], CodigoError.TOKEN_INESPERADO.value)
+        self.assertEqual(error["esperado"], "VERBO")
+        self.assertEqual(error["offset"], len(contenido))
+    
+    def test_paralelo_conserva_el_orden(self):
+        """Test que el modo paralelo produce la misma salida que el secuencial"""
+        contenido = "\n".join(TestAnalisisLote.ORACIONES * 5).encode()
+        
+        secuencial = io.BytesIO()
+        esperado = validar_corpus.validar_flujo(io.BytesIO(contenido), secuencial, MiniParser())
+        paralelo = io.BytesIO()
+        obtenido = validar_corpus.validar_en_paralelo(io.BytesIO(contenido), paralelo,
+                                                      procesos=2, tamano_bloque=3)
+        
+        self.assertEqual(obtenido, esperado)
+        self.assertEqual(paralelo.getvalue(), secuencial.getvalue())
+    
+    def test_numero_procesos(self):
+        """Test que -j acepta 0 (uno por CPU) y enteros positivos, y rechaza el resto"""
+        self.assertEqual(validar_corpus.numero_procesos("0"), 0)
+        self.assertEqual(validar_corpus.numero_procesos("4"), 4)
+        for valor in ("-1", "dos", "1.5"):
+            with self.subTest(valor=valor):
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    validar_corpus.numero_procesos(valor)
+        
+        with contextlib.redirect_stderr(io.StringIO()) as errores:
+            with self.assertRaises(SystemExit) as salida:
+                validar_corpus.main(["-j", "-2", "-o", os.devnull])
+        self.assertEqual(salida.exception.code, 2)
+        self.assertIn("0 (uno por CPU) o positivo", errores.getvalue())
+    
+    def test_tamano_bloque(self):
+        """Test que el tamaño de bloque debe ser positivo, en la línea de comandos y en la función"""
+        self.assertEqual(validar_corpus.entero_positivo("1"), 1)
+        for valor in ("0", "-3", "diez"):
+            with self.subTest(valor=valor):
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    validar_corpus.entero_positivo(valor)
+        
+        with contextlib.redirect_stderr(io.StringIO()) as errores:
+            with self.assertRaises(SystemExit) as salida:
+                validar_corpus.main(["-j", "2", "--tamano-bloque", "0", "-o", os.devnull])
+        self.assertEqual(salida.exception.code, 2)
+        self.assertIn("--tamano-bloque", errores.getvalue())
+        
+        with self.assertRaises(ValueError):
+            validar_corpus.validar_en_paralelo(io.BytesIO(b"el perro come un hueso\n"),
+                                               io.BytesIO(), procesos=1, tamano_bloque=0)
+
+
+class TestEsValida(unittest.TestCase):
+    """Tests de la ruta rápida de validez"""
+    
+    def test_coincide_con_analizar(self):
+        """Test que es_valida() coincide con analizar()["valido"]"""
+        parser = MiniParser()
+        oraciones = TestAnalisisLote.ORACIONES + [
+            "El Perro  come un HUESO",
+            "el perro come un hueso hueso",
+            "la niña hermosa lee un libro viejo",
+        ]
+        for oracion in oraciones:
+            with self.subTest(oracion=oracion):
+                self.assertEqual(parser.es_valida(oracion), parser.analizar(oracion)["valido"])
+    
+    def test_todas_las_formas(self):
+        """Test equivalencia para todas las secuencias cortas de tipos"""
+        parser = MiniParser()
+        ejemplo = {
+            TipoToken.ARTICULO: "el", TipoToken.SUSTANTIVO: "perro",
+            TipoToken.ADJETIVO: "grande", TipoToken.VERBO: "come",
+            TipoToken.DESCONOCIDO: "pizza",
+        }
+        for longitud in range(7):
+            for secuencia in itertools.product(ejemplo, repeat=longitud):
+                oracion = " ".join(ejemplo[tipo] for tipo in secuencia)
+                self.assertEqual(parser.es_valida(oracion), parser.analizar(oracion)["valido"],
+                                 oracion)
+
+
+class TestReentrancia(unittest.TestCase):
+    """Tests de uso concurrente y reentrante de un mismo parser"""
+    
+    def test_parseo_anidado(self):
+        """Test que un análisis anidado no altera el análisis en curso"""
+        parser = ParserDescendenteRecursivo()
+        lexico = AnalizadorLexico()
+        interno = lexico.tokenizar("el perro come un hueso")
+        
+        class TokensReentrantes(list):
+            def __getitem__(self, indice):
+                # Se llama al redactar el error: parsea otra oración en medio
+                parser.parsear(interno)
+                return super().__getitem__(indice)
+        
+        tokens = TokensReentrantes(lexico.tokenizar("el perro grande"))
+        exito, errores = parser.parsear(tokens)
+        
+        self.assertFalse(exito)
+        self.assertEqual(errores, ParserDescendenteRecursivo().parsear(
+            lexico.tokenizar("el perro grande"))[1])
+    
+    def test_mini_parser_compartido_entre_hilos(self):
+        """Test que un MiniParser compartido da los mismos resultados en paralelo"""
+        oraciones = TestAnalisisLote.ORACIONES * 200
+        for motor in MiniParser.MOTORES:
+            with self.subTest(motor=motor):
+                referencia = [MiniParser(motor=motor).analizar(o) for o in oraciones]
+                compartido = MiniParser(motor=motor, tamano_cache=4, tamano_cache_formas=2)
+                
+                with ThreadPoolExecutor(max_workers=8) as hilos:
+                    resultados = list(hilos.map(compartido.analizar, oraciones))
+                
+                for esperado, obtenido in zip(referencia, resultados):
+                    self.assertEqual(obtenido["valido"], esperado["valido"])
+                    self.assertEqual(list(obtenido["errores"]), esperado["errores"])
+
+
+class TestArbolDerivacion(unittest.TestCase):
+    """Tests del árbol de derivación construido durante el parsing"""
+    
+    def setUp(self):
+        self.parser = MiniParser()
+    
+    def test_arbol_construido_por_el_parser(self):
+        """Test que el árbol refleja la derivación de la oración"""
+        arbol = self.parser.analizar("el perro grande come un hueso", arbol=True)["arbol"].a_nodos()
+        
+        esperado = NodoArbol("ORACIÓN", [
+            NodoArbol("SUJETO", [
+                NodoArbol("ARTÍCULO", [], "el", 2),
+                NodoArbol("SUSTANTIVO", [], "perro", 2),
+                NodoArbol("ADJETIVO", [], "grande", 2),
+            ], nivel=1),
+            NodoArbol("PREDICADO", [
+                NodoArbol("VERBO", [], "come", 2),
+                NodoArbol("COMPLEMENTO", [
+                    NodoArbol("ARTÍCULO", [], "un", 3),
+                    NodoArbol("SUSTANTIVO", [], "hueso", 3),
+                ], nivel=2),
+            ], nivel=1),
+        ], nivel=0)
+        self.assertEqual(arbol, esperado)
+    
+    def test_sin_arbol_para_oraciones_invalidas(self):
+        """Test que las oraciones inválidas no tienen árbol"""
+        for texto in ("el perro grande", "el perro vuela un hueso"):
+            with self.subTest(texto=texto):
+                resultado = self.parser.analizar(texto, arbol=True)
+                self.assertFalse(resultado["valido"])
+                self.assertIsNone(resultado["arbol"])
+    
+    def test_arbol_no_cambia_el_analisis(self):
+        """Test que pedir el árbol no cambia veredicto ni errores, con cualquier motor"""
+        for motor in MiniParser.MOTORES:
+            parser = MiniParser(motor=motor, tamano_cache=8)
+            for texto in TestAnalisisLote.ORACIONES:
+                with self.subTest(motor=motor, texto=texto):
+                    resultado = parser.analizar(texto, arbol=True)
+                    referencia = parser.analizar(texto)
+                    self.assertEqual(resultado["valido"], referencia["valido"])
+                    self.assertEqual(resultado["errores"], list(referencia["errores"]))
+                    self.assertEqual(resultado["arbol"] is not None, resultado["valido"])
+                    self.assertNotIn("arbol", referencia)
+
+
+class TestArbolPlano(unittest.TestCase):
+    """Tests del árbol en arreglos y su visualización iterativa"""
+    
+    def test_conversion_ida_y_vuelta(self):
+        """Test que convertir a ArbolPlano y de vuelta conserva el árbol"""
+        parser = MiniParser()
+        for texto in TestAnalisisLote.ORACIONES:
+            arbol = parser.analizar(texto, arbol=True)["arbol"]
+            if arbol is None:
+                continue
+            with self.subTest(texto=texto):
+                nodos = arbol.a_nodos()
+                self.assertEqual(ArbolPlano.desde_nodos(nodos).a_nodos(), nodos)
+    
+    def test_hijos_en_orden(self):
+        """Test que los hijos de cada nodo se recorren en orden"""
+        arbol = MiniParser().analizar("la niña pequeña lee el libro", arbol=True)["arbol"]
+        sujeto, predicado = arbol.hijos(0)
+        
+        self.assertEqual([arbol.palabra(h) for h in arbol.hijos(sujeto)],
+                         ["la", "niña", "pequeña"])
+        self.assertEqual([arbol.simbolo(h) for h in arbol.hijos(predicado)],
+                         ["VERBO", "COMPLEMENTO"])
+        self.assertEqual(list(arbol.hijos(len(arbol) - 1)), [])
+    
+    def test_visualizacion_arbol_profundo(self):
+        """Test que un árbol muy profundo se visualiza sin recursión"""
+        profundidad = 5000
+        arbol = ArbolPlano([Token(TipoToken.VERBO, "x", 0)])
+        nodo = arbol.agregar("ORACIÓN")
+        for _ in range(profundidad - 1):
+            nodo = arbol.agregar("SUJETO", nodo)
+        arbol.agregar("VERBO", nodo, 0)
+        
+        lineas = VisualizadorArbol().visualizar_ascii(arbol).split("\n")
+        
+        self.assertEqual(len(lineas), profundidad + 1)
+        self.assertEqual(lineas[1], "└── SUJETO")
+        self.assertEqual(lineas[-1], " " * 4 * (profundidad - 1) + '└── VERBO: "x"')
+    
+    def test_escribir_arboles(self):
+        """Test que se escriben en el flujo solo los árboles de oraciones válidas"""
+        visualizador = VisualizadorArbol()
+        textos = ["el perro come un hueso", "el perro grande", "un gato ve la casa"]
+        salida = io.StringIO()
+        
+        escritos = visualizador.escribir_arboles(textos, salida)
+        
+        self.assertEqual(escritos, 2)
+        self.assertEqual(salida.getvalue(), "\n\n".join(
+            visualizador.visualizar_ascii(visualizador.construir_arbol(t))
+            for t in (textos[0], textos[2])
+        ) + "\n")
+    
+    def test_reglas_segun_el_arbol(self):
+        """Test que las reglas aplicadas se leen del árbol, con cualquier motor"""
+        basico = VisualizadorArbol()
+        arbol = basico.parser.analizar("el perro grande come un hueso", arbol=True)["arbol"]
+        self.assertEqual(basico.reglas_aplicadas(arbol), [
+            "<oración> → <sujeto> <predicado>",
+            "<sujeto> → <artículo> <sustantivo> <adjetivo>",
+            "<predicado> → <verbo> <complemento>",
+            "<complemento> → <artículo> <sustantivo>",
+        ])
+        
+        earley = VisualizadorArbol(MiniParser(motor="earley"))
+        pasos = earley.visualizar_pasos("el perro come un hueso y ve la casa")
+        self.assertIn("3. <predicado> → <predicado> <conjunción> <predicado>", pasos)
+        reglas = pasos[pasos.index("Reglas aplicadas"):pasos.index("PASO 3")]
+        self.assertEqual(reglas.count("<predicado> → <verbo> <complemento>"), 2)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests de las utilidades de benchmark_parser"""
+    
+    def test_percentil(self):
+        """Test de percentiles con interpolación lineal"""
+        valores = [4, 1, 3, 2, 5]
+        self.assertEqual(estadisticas.percentil(valores, 0), 1)
+        self.assertEqual(estadisticas.percentil(valores, 50), 3)
+        self.assertEqual(estadisticas.percentil(valores, 100), 5)
+        self.assertAlmostEqual(estadisticas.percentil(valores, 95), 4.8)
+        with self.assertRaises(ValueError):
+            estadisticas.percentil([], 50)
+    
+    def test_intervalo_confianza(self):
+        """Test del intervalo de confianza del 95% con la t de Student"""
+        media, inferior, superior = estadisticas.intervalo_confianza([10, 12, 14])
+        self.assertEqual(media, 12)
+        self.assertAlmostEqual(superior - media, 4.303 * 2 / 3 ** 0.5, places=6)
+        self.assertAlmostEqual(media - inferior, superior - media)
+        
+        self.assertEqual(estadisticas.intervalo_confianza([5.0]), (5.0, 5.0, 5.0))
+        _, inferior, superior = estadisticas.intervalo_confianza(list(range(100)))
+        self.assertAlmostEqual(superior - inferior, 2 * 1.96 * 29.011491975882016 / 10)
+        with self.assertRaises(ValueError):
+            estadisticas.intervalo_confianza([])
+    
+    def test_corpus_reproducible(self):
+        """Test que el corpus generado depende solo de la semilla"""
+        corpus = benchmark_parser.generar_corpus(200, semilla=3)
+        self.assertEqual(corpus, benchmark_parser.generar_corpus(200, semilla=3))
+        self.assertNotEqual(corpus, benchmark_parser.generar_corpus(200, semilla=4))
+        
+        parser = MiniParser()
+        validas = sum(parser.es_valida(texto) for texto in corpus)
+        self.assertTrue(0 < validas < len(corpus))
+    
+    def test_suite_y_comparacion(self):
+        """Test que la suite produce todos los casos y detecta regresiones"""
+        ejecucion = benchmark_parser.ejecutar_suite(tamanos=[20], repeticiones=1, calentamiento=0)
+        
+        self.assertEqual(set(ejecucion["resultados"]),
+                         {f"{caso}/20" for caso in benchmark_parser.CASOS})
+        json.dumps(ejecucion)
+        
+        # El caso por lotes cuenta oraciones, no llamadas, y no tiene latencias
+        lote = ejecucion["resultados"]["analizar_lote/20"]
+        self.assertIsNone(lote["p50_ns"])
+        palabras = sum(len(texto.split()) for texto in benchmark_parser.generar_corpus(20))
+        self.assertAlmostEqual(lote["ns_por_oracion"] * 20 / (lote["ns_por_token"] * palabras), 1)
+        self.assertIsNotNone(ejecucion["resultados"]["analizar/20"]["p50_ns"])
+        
+        base = json.loads(json.dumps(ejecucion))
+        for resultado in base["resultados"].values():
+            resultado["ns_por_token"] /= 2
+        comparacion = benchmark_parser.comparar(ejecucion, base, tolerancia=0.5)
+        
+        self.assertEqual(len(comparacion), len(benchmark_parser.CASOS))
+        self.assertTrue(all(entrada["regresion"] for entrada in comparacion))
+        self.assertFalse(any(entrada["regresion"] for entrada in
+                             benchmark_parser.comparar(ejecucion, ejecucion)))
+
+
+class TestGeneradorCorpus(unittest.TestCase):
+    """Tests del generador de corpus sintéticos"""
+    
+    def test_reproducible(self):
+        """Test que la misma semilla genera el mismo corpus"""
+        generador = GeneradorCorpus(semilla=7)
+        self.assertEqual(list(generador.muestras(500)), list(generador.muestras(500)))
+        self.assertNotEqual(list(generador.oraciones(500)),
+                            list(GeneradorCorpus(semilla=8).oraciones(500)))
+    
+    def test_etiquetas_coinciden_con_el_parser(self):
+        """Test que cada oración es válida si y solo si no se le introdujo un error"""
+        generador = GeneradorCorpus(semilla=1, errores={tipo: 0.15 for tipo in
+                                                        generador_corpus.TIPOS_ERROR})
+        parser = MiniParser()
+        vistos = set()
+        for texto, error in generador.muestras(3000):
+            resultado = parser.analizar(texto)
+            self.assertEqual(resultado["valido"], error is None, texto)
+            if error == generador_corpus.PALABRA_DESCONOCIDA:
+                self.assertEqual(resultado["fase"], "léxico", texto)
+            elif error is not None:
+                self.assertEqual(resultado["fase"], "sintáctico", texto)
+            vistos.add(error)
+        
+        self.assertEqual(vistos, {None, *generador_corpus.TIPOS_ERROR})
+    
+    def test_posiciones_adjetivo_extra(self):
+        """Test que el adjetivo extra aparece en todas las posiciones posibles"""
+        generador = GeneradorCorpus(semilla=3, errores={generador_corpus.ADJETIVO_EXTRA: 1.0})
+        lexico = AnalizadorLexico()
+        posiciones = set()
+        for texto in generador.oraciones(500):
+            tipos = [token.tipo for token in lexico.tokenizar(texto)[:-1]]
+            verbo = tipos.index(TipoToken.VERBO)
+            if tipos[0] == TipoToken.ADJETIVO:
+                posiciones.add("inicio")
+            elif tipos[verbo + 1] == TipoToken.ADJETIVO:
+                posiciones.add("tras_verbo")
+            elif verbo == 4:
+                posiciones.add("sujeto")
+            else:
+                self.assertEqual(len(tipos) - verbo, 5, texto)
+                posiciones.add("complemento")
+        
+        self.assertEqual(posiciones, {"inicio", "tras_verbo", "sujeto", "complemento"})
+    
+    def test_palabras_desconocidas(self):
+        """Test que las palabras de los errores léxicos no están en el vocabulario"""
+        self.assertTrue(generador_corpus.PALABRAS_DESCONOCIDAS)
+        for palabra in generador_corpus.PALABRAS_DESCONOCIDAS:
+            self.assertNotIn(palabra, LEXICO)
+    
+    def test_longitudes_y_proporciones(self):
+        """Test que se respetan la distribución de longitudes y las proporciones"""
+        solo_siete = GeneradorCorpus(errores={}, longitudes={7: 1})
+        self.assertTrue(all(len(texto.split()) == 7 for texto in solo_siete.oraciones(200)))
+        
+        todas_con_error = GeneradorCorpus(errores={generador_corpus.FALTA_ARTICULO: 1.0})
+        self.assertTrue(all(error == generador_corpus.FALTA_ARTICULO
+                            for _, error in todas_con_error.muestras(200)))
+    
+    def test_generacion_perezosa(self):
+        """Test que sin cantidad el generador no tiene límite"""
+        oraciones = GeneradorCorpus().oraciones()
+        self.assertEqual(len(list(itertools.islice(oraciones, 10))), 10)
+        self.assertIsInstance(next(oraciones), str)
+    
+    def test_configuracion_invalida(self):
+        """Test que se rechazan errores y longitudes desconocidos"""
+        with self.assertRaises(ValueError):
+            GeneradorCorpus(errores={"sin_verbo": 0.1})
+        with self.assertRaises(ValueError):
+            GeneradorCorpus(errores={generador_corpus.FALTA_ARTICULO: 0.6,
+                                     generador_corpus.ORDEN_INCORRECTO: 0.6})
+        with self.assertRaises(ValueError):
+            GeneradorCorpus(longitudes={4: 1})
+
+
+class TestInstrumentacion(unittest.TestCase):
+    """Tests de la medición de tiempos por fase"""
+    
+    def test_desactivada_por_defecto(self):
+        """Test que sin instrumentación analizar() es el método de la clase"""
+        parser = MiniParser()
+        self.assertIsNone(parser.metricas)
+        self.assertNotIn("analizar", vars(parser))
+    
+    def test_mismos_resultados(self):
+        """Test que la versión instrumentada da los mismos resultados"""
+        oraciones = TestAnalisisLote.ORACIONES
+        for motor in MiniParser.MOTORES:
+            for opciones in ({}, {"tamano_cache": 4}, {"tamano_cache_formas": 0}):
+                normal = MiniParser(motor=motor, **opciones)
+                instrumentado = MiniParser(motor=motor, instrumentar=True, **opciones)
+                for texto in oraciones * 2:
+                    for arbol in (False, True):
+                        with self.subTest(motor=motor, opciones=opciones, texto=texto,
+                                          arbol=arbol):
+                            esperado = normal.analizar(texto, arbol=arbol)
+                            obtenido = instrumentado.analizar(texto, arbol=arbol)
+                            self.assertEqual(set(obtenido), set(esperado))
+                            for clave in ("valido", "fase", "texto", "tokens"):
+                                self.assertEqual(obtenido[clave], esperado[clave])
+                            self.assertEqual(list(obtenido["errores"]), list(esperado["errores"]))
+    
+    def test_conteo_por_fase(self):
+        """Test que cada fase registra una muestra por análisis que la ejecuta"""
+        parser = MiniParser(instrumentar=True)
+        fases = [parser.analizar(texto)["fase"] for texto in TestAnalisisLote.ORACIONES]
+        estadisticas = parser.metricas.estadisticas()
+        total = len(fases)
+        
+        self.assertEqual(estadisticas["total"]["cantidad"], total)
+        self.assertEqual(estadisticas["lexico"]["cantidad"], total)
+        self.assertEqual(estadisticas["resultado"]["cantidad"], total)
+        self.assertEqual(estadisticas["sintactico"]["cantidad"], fases.count("sintáctico"))
+        self.assertEqual(estadisticas["cache"]["cantidad"], 0)
+        for fase in ("lexico", "total"):
+            resumen = estadisticas[fase]
+            self.assertTrue(resumen["min_ns"] <= resumen["p50_ns"] <= resumen["p95_ns"]
+                            <= resumen["p99_ns"] <= resumen["max_ns"])
+        
+        parser.metricas.limpiar()
+        self.assertEqual(parser.metricas.estadisticas()["total"]["cantidad"], 0)
+    
+    def test_cache_de_resultados(self):
+        """Test que las consultas a la caché se registran aparte"""
+        parser = MiniParser(instrumentar=True, tamano_cache=8)
+        for _ in range(3):
+            parser.analizar("el perro come un hueso")
+        
+        estadisticas = parser.metricas.estadisticas()
+        self.assertEqual(estadisticas["cache"]["cantidad"], 3)
+        self.assertEqual(estadisticas["total"]["cantidad"], 1)
+    
+    def test_hilos(self):
+        """Test que no se pierden mediciones con varios hilos"""
+        parser = MiniParser(instrumentar=True)
+        oraciones = TestAnalisisLote.ORACIONES * 100
+        with ThreadPoolExecutor(max_workers=8) as hilos:
+            list(hilos.map(parser.analizar, oraciones))
+        self.assertEqual(parser.metricas.estadisticas()["total"]["cantidad"], len(oraciones))
+    
+    def test_histograma(self):
+        """Test de las cubetas y percentiles del histograma"""
+        for valor in itertools.chain(range(2000), (10**6, 10**9 + 7)):
+            inferior, superior = HistogramaTiempos.limites(HistogramaTiempos.cubeta(valor))
+            self.assertTrue(inferior <= valor <= superior)
+        
+        histograma = HistogramaTiempos()
+        for valor in range(1, 1001):
+            histograma.agregar(valor)
+        resumen = histograma.resumen()
+        
+        self.assertEqual(resumen["cantidad"], 1000)
+        self.assertEqual(resumen["media_ns"], 500.5)
+        self.assertEqual((resumen["min_ns"], resumen["max_ns"]), (1, 1000))
+        for p in (50, 95, 99):
+            self.assertAlmostEqual(histograma.percentil(p), 10 * p, delta=0.07 * 10 * p)
+
+
+class TestComparador(unittest.TestCase):
+    """Tests de la comparación con el backend local (sin spaCy)"""
+    
+    def setUp(self):
+        self.nlp = AnalizadorNLPModerno(BackendLocal())
+    
+    def test_etiquetas_del_backend_local(self):
+        """Test de las etiquetas POS y dependencias deterministas"""
+        resultado = self.nlp.analizar("el perro grande come un hueso")
+        
+        self.assertEqual([t["pos"] for t in resultado["tokens"]],
+                         ["DET", "NOUN", "ADJ", "VERB", "DET", "NOUN"])
+        self.assertEqual([t["dep"] for t in resultado["tokens"]],
+                         ["det", "nsubj", "amod", "ROOT", "det", "obj"])
+        self.assertTrue(resultado["estructura_svo"])
+        
+        sin_objeto = self.nlp.analizar("el perro come")
+        self.assertTrue(sin_objeto["tiene_sujeto"] and sin_objeto["tiene_verbo"])
+        self.assertFalse(sin_objeto["estructura_svo"])
+        self.assertEqual(self.nlp.analizar("python es genial")["tokens"][0]["pos"], "X")
+    
+    def test_lote_igual_a_individual(self):
+        """Test que el análisis por lotes da los mismos veredictos, en orden"""
+        oraciones = TestAnalisisLote.ORACIONES * 3
+        lote = list(self.nlp.analizar_lote(oraciones, tamano_lote=4))
+        
+        self.assertEqual([r["texto"] for r in lote], oraciones)
+        for resultado in lote:
+            individual = self.nlp.analizar(resultado["texto"])
+            self.assertEqual(resultado["estructura_svo"], individual["estructura_svo"])
+            self.assertEqual([(t["pos"], t["dep"]) for t in resultado["tokens"]],
+                             [(t["pos"], t["dep"]) for t in individual["tokens"]])
+    
+    def test_comparar(self):
+        """Test de la comparación completa con tiempos y razón de velocidad"""
+        comparador = ComparadorParsers(BackendLocal())
+        oraciones = TestAnalisisLote.ORACIONES
+        resultados = comparador.comparar(oraciones, tamano_lote=3, repeticiones=3)
+        
+        self.assertEqual(len(resultados["casos"]), len(oraciones))
+        manual = resultados["stats_manual"]
+        self.assertEqual(manual["validos"] + manual["invalidos"], len(oraciones))
+        self.assertEqual(manual["validos"], sum(MiniParser().es_valida(o) for o in oraciones))
+        for stats in (manual, resultados["stats_nlp"]):
+            tiempos = stats["tiempos"]
+            inferior, superior = tiempos["ic95_oraciones_por_segundo"]
+            self.assertTrue(0 < tiempos["mediana_ms"] <= tiempos["p95_ms"] <= tiempos["p99_ms"])
+            self.assertTrue(inferior <= tiempos["oraciones_por_segundo"] <= superior)
+        self.assertGreater(resultados["razon_velocidad"]["valor"], 0)
+        
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            comparador.mostrar_comparacion_detallada(resultados)
+        self.assertIn("backend local", salida.getvalue())
+    
+    def test_tiempo_repartido_por_lote(self):
+        """Test que el tiempo de un lote se reparte entre sus oraciones, no recae en la primera"""
+        backend = BackendBloqueante()
+        oraciones = TestAnalisisLote.ORACIONES[:8]
+        lote = list(AnalizadorNLPModerno(backend).analizar_lote(oraciones, tamano_lote=4))
+        
+        self.assertEqual(backend.lotes, 2)
+        for resultado in lote:
+            self.assertGreaterEqual(resultado["tiempo_ms"], backend.ESPERA_MS / 4)
+        
+        resultados = ComparadorParsers(BackendBloqueante()).comparar(oraciones, tamano_lote=4,
+                                                                     repeticiones=2)
+        self.assertGreaterEqual(resultados["stats_nlp"]["tiempos"]["mediana_ms"],
+                                backend.ESPERA_MS / 4)
+        for caso in resultados["casos"]:
+            self.assertGreaterEqual(caso["nlp"]["tiempo_ms"], backend.ESPERA_MS / 4)
+    
+    def test_backend_desconocido(self):
+        """Test que un backend desconocido se rechaza"""
+        with self.assertRaises(ValueError):
+            comparacion_parsers.crear_backend("inexistente")
+
+
+class TestServidorNLP(unittest.TestCase):
+    """Tests del servidor NLP persistente con el backend local"""
+    
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        direccion = os.path.join(self.directorio.name, "nlp.sock")
+        self.servidor = servidor_nlp.ServidorNLP("local", direccion)
+        self.hilo = threading.Thread(target=self.servidor.servir, daemon=True)
+        self.hilo.start()
+        self.servidor.listo.wait(5)
+        self.remoto = servidor_nlp.BackendRemoto(direccion)
+    
+    def tearDown(self):
+        self.remoto.detener_servidor()
+        self.hilo.join(5)
+        self.directorio.cleanup()
+    
+    def test_mismo_analisis_que_el_backend_local(self):
+        """Test que el servidor responde igual que el backend que mantiene cargado"""
+        local = BackendLocal()
+        oraciones = TestAnalisisLote.ORACIONES
+        
+        self.assertEqual(self.remoto.analizar(oraciones[0]), local.analizar(oraciones[0]))
+        lote = list(self.remoto.analizar_lote(oraciones, tamano_lote=3))
+        self.assertEqual(lote, list(local.analizar_lote(oraciones)))
+        self.assertEqual(self.remoto.estado()["solicitudes"], 1 + -(-len(oraciones) // 3))
+    
+    def test_conexiones_reutilizan_el_modelo(self):
+        """Test que cada cliente nuevo usa el mismo proceso ya cargado"""
+        otro = servidor_nlp.BackendRemoto(self.remoto.direccion)
+        self.assertEqual(otro.estado()["pid"], self.remoto.estado()["pid"])
+        self.assertEqual(otro.nombre, "backend local (servidor)")
+        otro.cerrar()
+        
+        with self.assertRaises(servidor_nlp.ErrorServidor):
+            servidor_nlp._eliminar_socket_abandonado(self.remoto.direccion)
+    
+    def test_comparar_con_servidor(self):
+        """Test que la comparación reporta aparte el arranque del servidor"""
+        resultados = ComparadorParsers(self.remoto).comparar(TestAnalisisLote.ORACIONES,
+                                                             repeticiones=2)
+        self.assertIsNotNone(resultados["carga_servidor_ms"])
+        self.assertGreater(resultados["carga_ms"], 0)
+        
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            ComparadorParsers(self.remoto).mostrar_comparacion_detallada(resultados, detalle=False)
+        self.assertIn("cargado una vez por el servidor", salida.getvalue())
+    
+    def test_operacion_desconocida(self):
+        """Test que los errores del servidor llegan al cliente"""
+        with self.assertRaises(servidor_nlp.ErrorServidor):
+            self.remoto._solicitar({"operacion": "inexistente"})
+        self.assertTrue(self.remoto.analizar("el perro come un hueso"))
+    
+    def test_sin_servidor(self):
+        """Test del error al conectar sin un servidor activo"""
+        with self.assertRaises(servidor_nlp.ErrorServidor):
+            servidor_nlp.conectar(os.path.join(self.directorio.name, "otro.sock"))
+    
+    def test_iniciar_en_segundo_plano_con_salida_capturada(self):
+        """Test que la comparación termina aunque su salida esté capturada y el servidor siga activo"""
+        direccion = os.path.join(self.directorio.name, "segundo_plano.sock")
+        codigo = ("import comparacion_parsers\n"
+                  f"comparacion_parsers.main(['--backend', 'local', '--servidor', '--direccion', "
+                  f"{direccion!r}, '--solo-resumen', '--repeticiones', '1'])")
+        try:
+            resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True,
+                                       text=True, timeout=60,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)))
+            self.assertEqual(resultado.returncode, 0, resultado.stderr)
+            self.assertIn("Conectado al servidor NLP", resultado.stdout)
+            with open(servidor_nlp.archivo_registro(direccion), encoding="utf-8") as registro:
+                self.assertIn("escuchando en", registro.read())
+        finally:
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                servidor_nlp.main(["--direccion", direccion, "--detener"])
+
+
+class BackendBloqueante(BackendLocal):
+    """Backend local que, como nlp.pipe, se bloquea una vez al comenzar cada lote"""
+    
+    ESPERA_MS = 20
+    
+    def __init__(self):
+        self.lotes = 0
+    
+    def analizar_lote(self, textos, tamano_lote=64, procesos=1):
+        textos = iter(textos)
+        while True:
+            lote = list(itertools.islice(textos, tamano_lote))
+            if not lote:
+                return
+            self.lotes += 1
+            time.sleep(self.ESPERA_MS / 1000)
+            for texto in lote:
+                yield texto, self._etiquetar(texto)
+
+
+class BackendContado(BackendLocal):
+    """Backend local que cuenta las oraciones que analiza"""
+    
+    def __init__(self):
+        self.analizadas = []
+    
+    def analizar(self, texto):
+        self.analizadas.append(texto)
+        return super().analizar(texto)
+    
+    def analizar_lote(self, textos, tamano_lote=64, procesos=1):
+        for texto, tokens in super().analizar_lote(textos, tamano_lote, procesos):
+            self.analizadas.append(texto)
+            yield texto, tokens
+
+
+class TestCacheAnalisisNLP(unittest.TestCase):
+    """Tests de la caché en disco de los análisis de NLP"""
+    
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "cache.sqlite")
+    
+    def tearDown(self):
+        self.directorio.cleanup()
+    
+    def test_solo_analiza_oraciones_nuevas(self):
+        """Test que una segunda ejecución solo ejecuta la inferencia de lo nuevo"""
+        oraciones = TestAnalisisLote.ORACIONES
+        primera = BackendCacheado(BackendContado(), self.ruta)
+        resultados = list(primera.analizar_lote(oraciones * 2, tamano_lote=4))
+        self.assertEqual(resultados, list(BackendLocal().analizar_lote(oraciones * 2)))
+        self.assertEqual(sorted(primera.backend.analizadas), sorted(set(oraciones)))
+        primera.cerrar()
+        
+        # Otra instancia (otra ejecución) sobre el mismo archivo
+        segunda = BackendCacheado(BackendContado(), self.ruta)
+        nueva = "la niña come un libro rojo"
+        list(segunda.analizar_lote(oraciones + [nueva], tamano_lote=4))
+        self.assertEqual(segunda.backend.analizadas, [nueva])
+        estadisticas = segunda.estadisticas()
+        self.assertEqual((estadisticas["aciertos"], estadisticas["fallos"]), (len(oraciones), 1))
+        self.assertEqual(estadisticas["entradas"], len(set(oraciones)) + 1)
+        segunda.cerrar()
+    
+    def test_marcas_svo_guardadas(self):
+        """Test que se guardan las marcas de sujeto, verbo y objeto"""
+        cache = BackendCacheado(BackendLocal(), self.ruta)
+        list(cache.analizar_lote(["el perro come un hueso", "el perro come"]))
+        filas = dict(cache.conexion.execute(
+            "SELECT hash, tiene_sujeto || tiene_verbo || tiene_objeto FROM analisis"))
+        self.assertEqual(filas[cache.clave("el perro come un hueso")], "111")
+        self.assertEqual(filas[cache.clave("el perro come")], "110")
+        cache.cerrar()
+    
+    def test_analisis_completo(self):
+        """Test que analizar() no usa las entradas de un lote, que no tienen todos los atributos"""
+        cache = BackendCacheado(BackendContado(), self.ruta)
+        list(cache.analizar_lote(["el perro come un hueso"]))
+        tokens = cache.analizar("el perro come un hueso")
+        self.assertIn("lemma", tokens[0])
+        self.assertEqual(cache.analizar("el perro come un hueso"), tokens)
+        self.assertEqual(len(cache.backend.analizadas), 2)
+        cache.cerrar()
+    
+    def test_version_distinta(self):
+        """Test que otra versión del modelo no reutiliza los análisis guardados"""
+        cache = BackendCacheado(BackendLocal(), self.ruta)
+        list(cache.analizar_lote(["el perro come un hueso"]))
+        cache.cerrar()
+        
+        backend = BackendContado()
+        backend.version = "otra"
+        otra = BackendCacheado(backend, self.ruta)
+        list(otra.analizar_lote(["el perro come un hueso"]))
+        self.assertEqual(backend.analizadas, ["el perro come un hueso"])
+        otra.cerrar()
+    
+    def test_comparar_con_cache(self):
+        """Test que la comparación reporta las estadísticas de la caché"""
+        cache = BackendCacheado(BackendLocal(), self.ruta)
+        resultados = ComparadorParsers(cache).comparar(TestAnalisisLote.ORACIONES, repeticiones=2)
+        self.assertGreater(resultados["cache"]["aciertos"], 0)
+        self.assertEqual(resultados["cache"]["entradas"], len(set(TestAnalisisLote.ORACIONES)))
+        cache.cerrar()
+
+
+class TestArranque(unittest.TestCase):
+    """Tests de la carga diferida de los puntos de entrada"""
+    
+    def modulos_cargados(self, codigo):
+        """Módulos presentes tras ejecutar el código en un intérprete nuevo"""
+        salida = subprocess.run([sys.executable, "-c", f"{codigo}\nimport sys\nprint(*sys.modules)"],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        return set(salida.split())
+    
+    def test_demo_sin_visualizador(self):
+        """Test que analizar una oración en la demo no carga el visualizador"""
+        modulos = self.modulos_cargados(
+            "import demo_interactiva, contextlib, io\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    demo_interactiva.main(['el perro come un hueso'])")
+        self.assertIn("mini_parser", modulos)
+        self.assertNotIn("visualizador_arbol", modulos)
+    
+    def test_analizar_sin_compilar_gramaticas(self):
+        """Test que analizar una oración no compila gramáticas ni carga el visualizador"""
+        modulos = self.modulos_cargados(
+            "from mini_parser import MiniParser, ParserLL1, ParserEarley\n"
+            "MiniParser().analizar('el perro come un hueso')\n"
+            "import mini_parser\n"
+            "assert isinstance(vars(ParserLL1)['GRAMATICA'], mini_parser._AlConsultar)\n"
+            "assert isinstance(vars(ParserEarley)['GRAMATICA'], mini_parser._AlConsultar)")
+        self.assertNotIn("visualizador_arbol", modulos)
+    
+    def test_clases_de_datos(self):
+        """Test que Token, NodoArbol y ResultadoLote siguen siendo dataclasses"""
+        token = Token(TipoToken.ARTICULO, "el", 0)
+        self.assertEqual(dataclasses.replace(token, posicion=3), Token(TipoToken.ARTICULO, "el", 3))
+        self.assertEqual(Token.__match_args__, ("tipo", "valor", "posicion"))
+        nodo = NodoArbol("ARTICULO", [], "el", 2)
+        self.assertEqual(dataclasses.asdict(nodo),
+                         {"simbolo": "ARTICULO", "hijos": [], "token": "el", "nivel": 2})
+        self.assertEqual([campo.name for campo in dataclasses.fields(ResultadoLote)],
+                         ["validos", "fases", "posiciones"])
+    
+    def test_gramaticas_al_consultar(self):
+        """Test que la gramática por defecto se compila una vez y luego es un atributo común"""
+        parser = ParserLL1()
+        self.assertIs(parser.gramatica, ParserLL1.GRAMATICA)
+        self.assertIsInstance(vars(ParserLL1)["GRAMATICA"], GramaticaLL1)
+        self.assertIs(ParserEarley().gramatica, ParserEarley().gramatica)
+    
+    def test_comparacion_sin_dependencias_pesadas(self):
+        """Test que el backend local no carga spaCy, sqlite3 ni benchmark_parser"""
+        modulos = self.modulos_cargados(
+            "import comparacion_parsers as c\n"
+            "c.AnalizadorNLPModerno(c.BackendLocal()).analizar('el perro come un hueso')")
+        for modulo in ("spacy", "sqlite3", "statistics", "estadisticas", "benchmark_parser",
+                       "generador_corpus"):
+            self.assertNotIn(modulo, modulos)
+    
+    def test_resumen_tiempos_sin_benchmark(self):
+        """Test que el resumen de tiempos de la comparación no carga benchmark_parser"""
+        modulos = self.modulos_cargados(
+            "import comparacion_parsers as c\n"
+            "c._resumen_tiempos([[1.0, 2.0], [3.0, 4.0]], [1, 1])")
+        self.assertIn("estadisticas", modulos)
+        for modulo in ("benchmark_parser", "visualizador_arbol", "generador_corpus"):
+            self.assertNotIn(modulo, modulos)
+    
+    def test_informe_importtime(self):
+        """Test de la lectura de la salida de -X importtime"""
+        informe = ("import time: self [us] | cumulative | imported package\n"
+                   "import time:       120 |        120 |     _ast\n"
+                   "import time:       300 |        420 |   ast\n"
+                   "import time:      1000 |       1420 | mini_parser\n")
+        self.assertEqual(benchmark_parser.importaciones(informe),
+                         [("_ast", 2, 120, 120), ("ast", 1, 300, 420),
+                          ("mini_parser", 0, 1000, 1420)])
+    
+    def test_medir_hilos(self):
+        """Test del escalado de un MiniParser compartido entre hilos"""
+        resultados = benchmark_parser.medir_hilos((1, 3), oraciones_por_hilo=50, repeticiones=1)
+        self.assertEqual([r["hilos"] for r in resultados], [1, 3])
+        self.assertEqual(resultados[0]["aceleracion"], 1.0)
+        self.assertTrue(all(r["oraciones_por_segundo"] > 0 for r in resultados))
+        
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            self.assertEqual(benchmark_parser.main(["--hilos", "1", "2", "--repeticiones", "1"]), 0)
+        self.assertIn("GIL", salida.getvalue())
+    
+    def test_medir_arranque(self):
+        """Test que se mide el primer resultado de un proceso nuevo"""
+        arranque = benchmark_parser.medir_arranque(benchmark_parser.ARRANQUES["mini_parser"],
+                                                   repeticiones=1)
+        self.assertTrue(0 < arranque["primer_resultado_ms"] < arranque["proceso_ms"])
+        self.assertIn("mini_parser", [modulo for modulo, *_ in arranque["importaciones"]])
 
 
 def ejecutar_suite_completa():
@@ -247,6 +1584,25 @@ def ejecutar_suite_completa():
     suite.addTests(loader.loadTestsFromTestCase(TestParserDescendenteRecursivo))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegracion))
     suite.addTests(loader.loadTestsFromTestCase(TestErrores))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnalisisLote))
+    suite.addTests(loader.loadTestsFromTestCase(TestParserAFD))
+    suite.addTests(loader.loadTestsFromTestCase(TestParserLL1))
+    suite.addTests(loader.loadTestsFromTestCase(TestParserEarley))
+    suite.addTests(loader.loadTestsFromTestCase(TestFlujoTokens))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheResultados))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheFormas))
+    suite.addTests(loader.loadTestsFromTestCase(TestValidarCorpus))
+    suite.addTests(loader.loadTestsFromTestCase(TestEsValida))
+    suite.addTests(loader.loadTestsFromTestCase(TestReentrancia))
+    suite.addTests(loader.loadTestsFromTestCase(TestArbolDerivacion))
+    suite.addTests(loader.loadTestsFromTestCase(TestArbolPlano))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmark))
+    suite.addTests(loader.loadTestsFromTestCase(TestGeneradorCorpus))
+    suite.addTests(loader.loadTestsFromTestCase(TestInstrumentacion))
+    suite.addTests(loader.loadTestsFromTestCase(TestComparador))
+    suite.addTests(loader.loadTestsFromTestCase(TestServidorNLP))
+    suite.addTests(loader.loadTestsFromTestCase(TestCacheAnalisisNLP))
+    suite.addTests(loader.loadTestsFromTestCase(TestArranque))
     
     # Ejecutar con verbosity
     runner = unittest.TextTestRunner(verbosity=2)
@@ -272,6 +1628,5 @@ def ejecutar_suite_completa():
 
 
 if __name__ == "__main__":
-    import sys
     exito = ejecutar_suite_completa()
     sys.exit(0 if exito else 1)
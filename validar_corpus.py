@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""
+Validación de Corpus por Línea de Comandos
+Valida un archivo (o la entrada estándar) línea por línea y escribe un
+registro JSON por línea (formato JSONL)
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from typing import BinaryIO, Iterator, Optional, Tuple
+from mini_parser import (MiniParser, TipoToken, CodigoError, NOMBRES_FASE,
+                         FASE_LEXICO, FASE_SINTACTICO)
+
+
+def leer_lineas(archivo: BinaryIO, primera_linea: int = 1,
+                desplazamiento: int = 0) -> Iterator[Tuple[int, int, int, str]]:
+    """
+    Lee un archivo binario línea por línea sin cargarlo completo en memoria
+    
+    Las líneas se decodifican como UTF-8 con 'surrogateescape', de modo que
+    volver a codificarlas reproduce exactamente los bytes originales.
+    
+    Args:
+        archivo: Archivo binario de entrada
+        primera_linea: Número de la primera línea (si el archivo es un bloque)
+        desplazamiento: Desplazamiento en bytes de la primera línea
+    
+    Yields:
+        Tuplas (número de línea, desplazamiento en bytes, longitud en bytes
+        incluyendo el salto de línea, texto de la línea)
+    """
+    for numero, crudo in enumerate(archivo, primera_linea):
+        texto = crudo.rstrip(b"\r\n").decode("utf-8", "surrogateescape")
+        yield numero, desplazamiento, len(crudo), texto
+        desplazamiento += len(crudo)
+
+
+def validar_linea(parser: MiniParser, numero: int, desplazamiento: int, texto: str) -> dict:
+    """
+    Valida una línea y construye su registro
+    
+    Args:
+        parser: MiniParser a usar
+        numero: Número de línea (desde 1)
+        desplazamiento: Desplazamiento en bytes de la línea en la entrada
+        texto: Texto de la línea
+    
+    Returns:
+        Registro con validez, fase y errores (código, posición de la palabra
+        y desplazamiento en bytes en la entrada)
+    """
+    flujo = parser.lexico.tokenizar_compacto(texto)
+    desconocido = TipoToken.DESCONOCIDO.codigo
+    
+    fallos = [(CodigoError.PALABRA_DESCONOCIDA, i, None)
+              for i, codigo in enumerate(flujo.tipos) if codigo == desconocido]
+    if fallos:
+        fase = FASE_LEXICO
+    else:
+        exito, fallos_sintacticos = parser.veredicto_forma(bytes(flujo.tipos))
+        fase = 0 if exito else FASE_SINTACTICO
+        fallos = [(CodigoError.TOKEN_INESPERADO if esperado else CodigoError.TOKENS_ADICIONALES,
+                   posicion, esperado)
+                  for posicion, esperado in fallos_sintacticos]
+    
+    errores = []
+    for codigo, posicion, esperado in fallos:
+        inicio = flujo.inicios[posicion]
+        error = {
+            "codigo": codigo.value,
+            "posicion": posicion,
+            "offset": desplazamiento + len(texto[:inicio].encode("utf-8", "surrogateescape")),
+        }
+        if esperado is not None:
+            error["esperado"] = esperado.value
+        errores.append(error)
+    
+    return {
+        "linea": numero,
+        "offset": desplazamiento,
+        "valido": not fase,
+        "fase": NOMBRES_FASE[fase] or None,
+        "errores": errores,
+    }
+
+
+def validar_flujo(entrada: BinaryIO, salida: BinaryIO, parser: MiniParser,
+                  primera_linea: int = 1, desplazamiento: int = 0) -> Tuple[int, int, int]:
+    """
+    Valida todas las líneas de la entrada escribiendo un registro JSON por línea
+    
+    Returns:
+        Tupla (líneas procesadas, líneas válidas, bytes leídos)
+    """
+    lineas = validas = leidos = 0
+    escribir = salida.write
+    
+    for numero, inicio, longitud, texto in leer_lineas(entrada, primera_linea, desplazamiento):
+        registro = validar_linea(parser, numero, inicio, texto)
+        escribir(json.dumps(registro, ensure_ascii=False).encode("utf-8"))
+        escribir(b"\n")
+        
+        lineas += 1
+        validas += registro["valido"]
+        leidos += longitud
+    
+    return lineas, validas, leidos
+
+
+def leer_bloques(archivo: BinaryIO, tamano_bloque: int) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Divide la entrada en bloques de líneas completas
+    
+    Yields:
+        Tuplas (número de la primera línea, desplazamiento en bytes, contenido)
+    """
+    primera_linea = 1
+    desplazamiento = 0
+    while True:
+        lineas = list(islice(archivo, tamano_bloque))
+        if not lineas:
+            return
+        contenido = b"".join(lineas)
+        yield primera_linea, desplazamiento, contenido
+        primera_linea += len(lineas)
+        desplazamiento += len(contenido)
+
+
+# Parser de cada proceso trabajador (se crea una sola vez por proceso)
+_parser_trabajador: Optional[MiniParser] = None
+
+
+def _inicializar_trabajador(motor: str):
+    """Crea el parser del proceso trabajador"""
+    global _parser_trabajador
+    _parser_trabajador = MiniParser(motor=motor)
+
+
+def _validar_bloque(bloque: Tuple[int, int, bytes]) -> Tuple[bytes, int, int, int]:
+    """Valida un bloque en un proceso trabajador y retorna sus registros ya serializados"""
+    primera_linea, desplazamiento, contenido = bloque
+    salida = io.BytesIO()
+    lineas, validas, leidos = validar_flujo(io.BytesIO(contenido), salida, _parser_trabajador,
+                                            primera_linea, desplazamiento)
+    return salida.getvalue(), lineas, validas, leidos
+
+
+def validar_en_paralelo(entrada: BinaryIO, salida: BinaryIO, motor: str = "afd",
+                        procesos: Optional[int] = None,
+                        tamano_bloque: int = 10000) -> Tuple[int, int, int]:
+    """
+    Valida la entrada repartiendo bloques de líneas entre varios procesos
+    
+    Cada proceso crea su parser una sola vez. Los resultados se escriben en
+    el orden de la entrada, y como máximo hay dos bloques pendientes por
+    proceso, por lo que la memoria no depende del tamaño de la entrada.
+    
+    Args:
+        entrada: Archivo binario de entrada
+        salida: Archivo binario de salida (JSONL)
+        motor: Motor sintáctico de los parsers
+        procesos: Número de procesos (por defecto, uno por CPU)
+        tamano_bloque: Líneas por bloque
+    
+    Returns:
+        Tupla (líneas procesadas, líneas válidas, bytes leídos)
+    
+    Raises:
+        ValueError: Si tamano_bloque es menor que 1
+    """
+    if tamano_bloque < 1:
+        raise ValueError(f"El tamaño de bloque debe ser al menos 1: {tamano_bloque}")
+    procesos = procesos or os.cpu_count() or 1
+    lineas = validas = leidos = 0
+    pendientes = deque()
+    
+    with Pool(procesos, initializer=_inicializar_trabajador, initargs=(motor,)) as pool:
+        bloques = leer_bloques(entrada, tamano_bloque)
+        while True:
+            # Mantener la cola de bloques llena sin leer toda la entrada
+            for bloque in islice(bloques, 2 * procesos - len(pendientes)):
+                pendientes.append(pool.apply_async(_validar_bloque, (bloque,)))
+            if not pendientes:
+                break
+            
+            registros, lineas_bloque, validas_bloque, leidos_bloque = pendientes.popleft().get()
+            salida.write(registros)
+            lineas += lineas_bloque
+            validas += validas_bloque
+            leidos += leidos_bloque
+    
+    return lineas, validas, leidos
+
+
+def numero_procesos(valor: str) -> int:
+    """
+    Tipo de argparse para -j: 0 (uno por CPU) o un entero positivo
+    
+    Raises:
+        argparse.ArgumentTypeError: Si el valor no es un entero o es negativo
+    """
+    try:
+        procesos = int(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"número de procesos no válido: {valor!r}") from None
+    if procesos < 0:
+        raise argparse.ArgumentTypeError(
+            f"el número de procesos debe ser 0 (uno por CPU) o positivo: {procesos}")
+    return procesos
+
+
+def entero_positivo(valor: str) -> int:
+    """
+    Tipo de argparse para --tamano-bloque: un entero mayor o igual que 1
+    
+    Raises:
+        argparse.ArgumentTypeError: Si el valor no es un entero o es menor que 1
+    """
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entero no válido: {valor!r}") from None
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"debe ser un entero positivo: {numero}")
+    return numero
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Función principal de la línea de comandos"""
+    argumentos = argparse.ArgumentParser(
+        description="Valida un corpus línea por línea y escribe un registro JSON por línea"
+    )
+    argumentos.add_argument("entrada", nargs="?", default="-",
+                            help="archivo a validar ('-' o ausente: entrada estándar)")
+    argumentos.add_argument("-o", "--salida", default="-",
+                            help="archivo JSONL de salida ('-' o ausente: salida estándar)")
+    argumentos.add_argument("--motor", choices=sorted(MiniParser.MOTORES), default="afd",
+                            help="motor sintáctico (por defecto: afd)")
+    argumentos.add_argument("-j", "--procesos", type=numero_procesos, default=1,
+                            help="procesos trabajadores (0: uno por CPU; por defecto: 1)")
+    argumentos.add_argument("--tamano-bloque", type=entero_positivo, default=10000,
+                            help="líneas por bloque en modo paralelo (por defecto: 10000)")
+    opciones = argumentos.parse_args(argv)
+    
+    entrada = sys.stdin.buffer if opciones.entrada == "-" else open(opciones.entrada, "rb")
+    salida = sys.stdout.buffer if opciones.salida == "-" else open(opciones.salida, "wb")
+    
+    inicio = time.perf_counter()
+    try:
+        if opciones.procesos == 1:
+            lineas, validas, leidos = validar_flujo(entrada, salida, MiniParser(motor=opciones.motor))
+        else:
+            lineas, validas, leidos = validar_en_paralelo(entrada, salida, opciones.motor,
+                                                          opciones.procesos or None,
+                                                          opciones.tamano_bloque)
+    finally:
+        if entrada is not sys.stdin.buffer:
+            entrada.close()
+        if salida is not sys.stdout.buffer:
+            salida.close()
+        else:
+            salida.flush()
+    duracion = time.perf_counter() - inicio
+    
+    # El resumen va a stderr para no mezclarse con los registros
+    velocidad = lineas / duracion if duracion > 0 else 0.0
+    megabytes = leidos / duracion / 1e6 if duracion > 0 else 0.0
+    print(f"{lineas} líneas ({validas} válidas) en {duracion:.3f} s: "
+          f"{velocidad:,.0f} líneas/s, {megabytes:.2f} MB/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,150 +3,125 @@ Visualizador de Árboles de Parsing
 Genera visualización del proceso de análisis sintáctico
 """
 
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from mini_parser import MiniParser, AnalizadorLexico, TipoToken
-
-
-@dataclass
-class NodoArbol:
-    """Representa un nodo en el árbol de parsing"""
-    simbolo: str
-    hijos: List['NodoArbol']
-    token: Optional[str] = None
-    nivel: int = 0
+import io
+from typing import Iterable, List, Optional, TextIO, Union
+from mini_parser import MiniParser, NodoArbol, ArbolPlano
 
 
 class VisualizadorArbol:
     """Visualiza el árbol de análisis sintáctico"""
     
-    def __init__(self):
-        self.parser = MiniParser()
-        self.lexico = AnalizadorLexico()
+    def __init__(self, parser: Optional[MiniParser] = None):
+        """
+        Args:
+            parser: Parser a usar (por ejemplo, el de quien crea el
+                    visualizador); por defecto se crea uno nuevo
+        """
+        self.parser = parser if parser is not None else MiniParser()
+        self.lexico = self.parser.lexico
     
     def construir_arbol(self, texto: str) -> Optional[NodoArbol]:
         """
         Construye el árbol de derivación para una oración
-        """
-        resultado = self.parser.analizar(texto)
-        
-        if not resultado["valido"]:
-            return None
-        
-        tokens = resultado["tokens"]
-        return self._construir_arbol_recursivo(tokens)
-    
-    def _construir_arbol_recursivo(self, tokens: List) -> NodoArbol:
-        """Construye árbol recursivamente"""
-        # Raíz
-        raiz = NodoArbol("ORACIÓN", [], nivel=0)
-        
-        # Separar sujeto y predicado
-        pos_verbo = next((i for i, t in enumerate(tokens) if t.tipo == TipoToken.VERBO), -1)
-        
-        if pos_verbo == -1:
-            return raiz
         
-        tokens_sujeto = tokens[:pos_verbo]
-        tokens_predicado = tokens[pos_verbo:]
-        
-        # Construir sujeto
-        sujeto = self._construir_sujeto(tokens_sujeto)
-        sujeto.nivel = 1
-        raiz.hijos.append(sujeto)
-        
-        # Construir predicado
-        predicado = self._construir_predicado(tokens_predicado)
-        predicado.nivel = 1
-        raiz.hijos.append(predicado)
-        
-        return raiz
+        El árbol lo arma el parser mientras reconoce la oración, así que
+        coincide con la derivación que realmente siguió.
+        """
+        arbol = self.parser.analizar(texto, arbol=True)["arbol"]
+        return arbol.a_nodos() if arbol is not None else None
     
-    def _construir_sujeto(self, tokens: List) -> NodoArbol:
-        """Construye nodo del sujeto"""
-        sujeto = NodoArbol("SUJETO", [])
-        
-        for token in tokens:
-            if token.tipo == TipoToken.FIN:
-                continue
-            
-            tipo_map = {
-                TipoToken.ARTICULO: "ARTÍCULO",
-                TipoToken.SUSTANTIVO: "SUSTANTIVO",
-                TipoToken.ADJETIVO: "ADJETIVO"
-            }
-            
-            nodo = NodoArbol(
-                tipo_map.get(token.tipo, "DESCONOCIDO"),
-                [],
-                token.valor,
-                nivel=2
-            )
-            sujeto.hijos.append(nodo)
-        
-        return sujeto
+    def visualizar_ascii(self, nodo: Union[NodoArbol, ArbolPlano], prefijo: str = "",
+                         es_ultimo: bool = True) -> str:
+        """
+        Genera representación ASCII del árbol
+        """
+        salida = io.StringIO()
+        self.escribir_ascii(nodo, salida, prefijo, es_ultimo)
+        return salida.getvalue()
     
-    def _construir_predicado(self, tokens: List) -> NodoArbol:
-        """Construye nodo del predicado"""
-        predicado = NodoArbol("PREDICADO", [])
+    def escribir_ascii(self, arbol: Union[NodoArbol, ArbolPlano], salida: TextIO,
+                       prefijo: str = "", es_ultimo: bool = True):
+        """
+        Escribe la representación ASCII del árbol en un flujo de texto
         
-        # Primero el verbo
-        if tokens and tokens[0].tipo == TipoToken.VERBO:
-            verbo = NodoArbol("VERBO", [], tokens[0].valor, nivel=2)
-            predicado.hijos.append(verbo)
-            tokens = tokens[1:]
+        Recorre los nodos del ArbolPlano en preorden con una pila de prefijos,
+        sin recursión ni cadenas intermedias por subárbol, de modo que la
+        memoria solo depende de la profundidad del árbol.
         
-        # Luego el complemento
-        if tokens:
-            complemento = NodoArbol("COMPLEMENTO", [], nivel=2)
+        Args:
+            arbol: Árbol a escribir (un NodoArbol se convierte a ArbolPlano)
+            salida: Flujo de texto de destino
+            prefijo: Prefijo de las líneas de la raíz, si no es de nivel 0
+            es_ultimo: Si la raíz es el último hijo de su padre
+        """
+        if isinstance(arbol, NodoArbol):
+            arbol = ArbolPlano.desde_nodos(arbol)
+        
+        escribir = salida.write
+        padres = arbol.padres
+        niveles = arbol.niveles
+        siguientes = arbol.siguientes
+        # Pila de (nodo, prefijo de sus hijos) de la rama actual
+        rama = []
+        
+        for nodo in range(len(arbol)):
+            padre = padres[nodo]
+            while rama and rama[-1][0] != padre:
+                rama.pop()
+            if rama:
+                prefijo_nodo = rama[-1][1]
+                ultimo = siguientes[nodo] == ArbolPlano.SIN_NODO
+            else:
+                prefijo_nodo, ultimo = prefijo, es_ultimo
             
-            for token in tokens:
-                if token.tipo == TipoToken.FIN:
-                    continue
-                
-                tipo_map = {
-                    TipoToken.ARTICULO: "ARTÍCULO",
-                    TipoToken.SUSTANTIVO: "SUSTANTIVO",
-                    TipoToken.ADJETIVO: "ADJETIVO"
-                }
-                
-                nodo = NodoArbol(
-                    tipo_map.get(token.tipo, "DESCONOCIDO"),
-                    [],
-                    token.valor,
-                    nivel=3
-                )
-                complemento.hijos.append(nodo)
+            # Símbolo del nodo
+            if nodo:
+                escribir("\n")
+            if niveles[nodo] != 0:
+                escribir(prefijo_nodo)
+                escribir("└── " if ultimo else "├── ")
+            escribir(arbol.simbolo(nodo))
+            palabra = arbol.palabra(nodo)
+            if palabra:
+                escribir(f': "{palabra}"')
             
-            predicado.hijos.append(complemento)
-        
-        return predicado
+            extension = "    " if ultimo else "│   "
+            rama.append((nodo, prefijo_nodo + extension if niveles[nodo] > 0 else ""))
     
-    def visualizar_ascii(self, nodo: NodoArbol, prefijo: str = "", es_ultimo: bool = True) -> str:
+    def escribir_arboles(self, textos: Iterable[str], salida: TextIO) -> int:
         """
-        Genera representación ASCII del árbol
-        """
-        resultado = []
+        Escribe el árbol de cada oración válida, separados por una línea en blanco
         
-        # Símbolo del nodo
-        conector = "└── " if es_ultimo else "├── "
-        simbolo = f"{nodo.simbolo}"
-        if nodo.token:
-            simbolo += f': "{nodo.token}"'
-        
-        if nodo.nivel == 0:
-            resultado.append(simbolo)
-        else:
-            resultado.append(prefijo + conector + simbolo)
-        
-        # Hijos
-        for i, hijo in enumerate(nodo.hijos):
-            es_ultimo_hijo = (i == len(nodo.hijos) - 1)
-            extension = "    " if es_ultimo else "│   "
-            nuevo_prefijo = prefijo + extension if nodo.nivel > 0 else ""
-            resultado.append(self.visualizar_ascii(hijo, nuevo_prefijo, es_ultimo_hijo))
+        Returns:
+            Número de árboles escritos
+        """
+        escritos = 0
+        for texto in textos:
+            arbol = self.parser.analizar(texto, arbol=True)["arbol"]
+            if arbol is None:
+                continue
+            if escritos:
+                salida.write("\n\n")
+            self.escribir_ascii(arbol, salida)
+            escritos += 1
+        if escritos:
+            salida.write("\n")
+        return escritos
+    
+    @staticmethod
+    def reglas_aplicadas(arbol: ArbolPlano) -> List[str]:
+        """
+        Reglas de la derivación, una por nodo interno del árbol en preorden
         
-        return "\n".join(resultado)
+        Se leen del árbol y no de una gramática fija, así que coinciden con
+        el árbol de cualquier motor (también el de la gramática extendida).
+        """
+        reglas = []
+        for nodo in range(len(arbol)):
+            hijos = " ".join(f"<{arbol.simbolo(hijo).lower()}>" for hijo in arbol.hijos(nodo))
+            if hijos:
+                reglas.append(f"<{arbol.simbolo(nodo).lower()}> → {hijos}")
+        return reglas
     
     def visualizar_pasos(self, texto: str) -> str:
         """
@@ -160,7 +135,9 @@ class VisualizadorArbol:
         # Paso 1: Tokenización
         resultado.append("\n📍 PASO 1: ANÁLISIS LÉXICO (Tokenización)")
         resultado.append("-"*70)
-        tokens = self.lexico.tokenizar(texto)
+        # Un solo análisis entrega tokens, veredicto y árbol de derivación
+        analisis = self.parser.analizar(texto, arbol=True)
+        tokens = analisis["tokens"]
         
         for i, token in enumerate(tokens[:-1]):  # Excluir token FIN
             resultado.append(f"  Token {i+1}: [{token.tipo.value:12}] → '{token.valor}'")
@@ -169,36 +146,13 @@ class VisualizadorArbol:
         resultado.append("\n📍 PASO 2: ANÁLISIS SINTÁCTICO")
         resultado.append("-"*70)
         
-        analisis = self.parser.analizar(texto)
+        arbol = analisis["arbol"]
         
         if analisis["valido"]:
             resultado.append("  ✓ La oración es sintácticamente válida")
             resultado.append("\n  Reglas aplicadas:")
-            resultado.append("  1. <oración> → <sujeto> <predicado>")
-            
-            # Detectar estructura del sujeto
-            tokens_validos = [t for t in tokens if t.tipo != TipoToken.FIN]
-            pos_verbo = next((i for i, t in enumerate(tokens_validos) if t.tipo == TipoToken.VERBO), -1)
-            
-            if pos_verbo > 0:
-                tokens_sujeto = tokens_validos[:pos_verbo]
-                tiene_adjetivo = any(t.tipo == TipoToken.ADJETIVO for t in tokens_sujeto)
-                
-                if tiene_adjetivo:
-                    resultado.append("  2. <sujeto> → <artículo> [<adjetivo>] <sustantivo>")
-                else:
-                    resultado.append("  2. <sujeto> → <artículo> <sustantivo>")
-                
-                resultado.append("  3. <predicado> → <verbo> <complemento>")
-                
-                # Detectar estructura del complemento
-                tokens_complemento = tokens_validos[pos_verbo+1:]
-                tiene_adj_comp = any(t.tipo == TipoToken.ADJETIVO for t in tokens_complemento)
-                
-                if tiene_adj_comp:
-                    resultado.append("  4. <complemento> → <artículo> [<adjetivo>] <sustantivo>")
-                else:
-                    resultado.append("  4. <complemento> → <artículo> <sustantivo>")
+            for i, regla in enumerate(self.reglas_aplicadas(arbol), 1):
+                resultado.append(f"  {i}. {regla}")
         else:
             resultado.append(f"  ✗ La oración NO es válida")
             resultado.append(f"  Fase de error: {analisis['fase']}")
@@ -210,9 +164,7 @@ class VisualizadorArbol:
         if analisis["valido"]:
             resultado.append("\n📍 PASO 3: ÁRBOL DE DERIVACIÓN")
             resultado.append("-"*70)
-            arbol = self.construir_arbol(texto)
-            if arbol:
-                resultado.append(self.visualizar_ascii(arbol))
+            resultado.append(self.visualizar_ascii(arbol))
         
         resultado.append("\n" + "="*70)
         return "\n".join(resultado)